@@ -6,6 +6,7 @@ Estrutura:
 - app/cleanup/: Limpeza e validação de dados
 - app/validation/: Validação de integridade
 - app/orchestrators/: Orquestradores de migração
+- app/monitoring/: Métricas e telemetria da migração
 """
 
 __version__ = '4.0.0'
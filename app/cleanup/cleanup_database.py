@@ -12,6 +12,7 @@ de um servidor PostgreSQL usando SQLAlchemy.
 Uso:
     python3 cleanup_database.py [--server origem|destino|ambos]
     python3 cleanup_database.py --dry-run  # Simular sem executar
+    python3 cleanup_database.py --parallel 4  # DROPs concorrentes
 
 Versão: 1.0.0
 Data: 03/10/2025
@@ -20,6 +21,7 @@ Data: 03/10/2025
 import json
 import sys
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, List, Optional
 import logging
@@ -28,6 +30,7 @@ import logging
 from sqlalchemy import create_engine, text, MetaData
 from sqlalchemy.engine import Engine
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.pool import NullPool
 import sqlalchemy
 
 # Configurar logging
@@ -37,6 +40,59 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Modo paralelo: conexões simultâneas de DROP e espera máxima por locks
+DEFAULT_DROP_WORKERS = 4
+DEFAULT_LOCK_TIMEOUT_MS = 10000
+
+# DROP DATABASE ... WITH (FORCE) existe a partir do PostgreSQL 13
+FORCE_DROP_MIN_VERSION = 130000
+
+# Varredura de dependências: bancos consultados simultaneamente
+DEFAULT_SCAN_WORKERS = 4
+# Nomes de objetos guardados por role/tipo/banco (o total é sempre contado)
+DEPENDENCY_SAMPLE_SIZE = 10
+
+# Bancos de cada role (catálogo global, uma consulta no banco conectado)
+OWNED_DATABASES_QUERY = """
+    SELECT r.rolname, d.datname
+    FROM pg_database d
+    JOIN pg_roles r ON d.datdba = r.oid
+    WHERE r.rolname = ANY(:roles)
+    AND d.datname NOT IN ('template0', 'template1')
+"""
+
+# Objetos de cada role em um banco, agrupados por role e tipo (uma consulta por banco)
+OWNED_OBJECTS_QUERY = """
+    WITH owned AS (
+        SELECT n.nspowner AS owner, 'schema' AS kind, n.nspname AS name
+        FROM pg_namespace n
+        WHERE n.nspname NOT LIKE 'pg\\_%' AND n.nspname <> 'information_schema'
+        UNION ALL
+        SELECT c.relowner, 'table', n.nspname || '.' || c.relname
+        FROM pg_class c
+        JOIN pg_namespace n ON c.relnamespace = n.oid
+        WHERE c.relkind IN ('r', 'p', 'v', 'm', 'S', 'f')
+        AND n.nspname NOT LIKE 'pg\\_%' AND n.nspname <> 'information_schema'
+        UNION ALL
+        SELECT p.proowner, 'function', n.nspname || '.' || p.proname
+        FROM pg_proc p
+        JOIN pg_namespace n ON p.pronamespace = n.oid
+        WHERE n.nspname NOT LIKE 'pg\\_%' AND n.nspname <> 'information_schema'
+    )
+    SELECT r.rolname, o.kind, count(*) AS total,
+           (array_agg(o.name ORDER BY o.name))[1:(:sample_size)] AS sample
+    FROM owned o
+    JOIN pg_roles r ON r.oid = o.owner
+    WHERE r.rolname = ANY(:roles)
+    GROUP BY r.rolname, o.kind
+"""
+
+
+def quote_ident(name: str) -> str:
+    """Identificador entre aspas duplas (aspas internas duplicadas)."""
+    return '"' + name.replace('"', '""') + '"'
+
+
 class PostgreSQLCleanup:
     """Classe para limpeza de bancos PostgreSQL."""
 
@@ -58,6 +114,9 @@ class PostgreSQLCleanup:
         config_protected_users = set(cleanup_config.get('protected_users', []))
         self.protected_users = default_protected_users.union(config_protected_users)
 
+        # Conexões simultâneas na varredura de dependências (uma por banco)
+        self.scan_workers = DEFAULT_SCAN_WORKERS
+
         logger.info(f"🛡️ Bancos protegidos: {sorted(self.protected_databases)}")
         logger.info(f"🛡️ Usuários protegidos: {sorted(self.protected_users)}")
 
@@ -160,6 +219,99 @@ class PostgreSQLCleanup:
             logger.error(f"❌ Erro ao terminar conexões de '{database}': {e}")
             return False
 
+    def terminate_all_connections(self, databases: List[str]) -> int:
+        """Termina, em uma única ida ao servidor, as conexões de todos os bancos."""
+        try:
+            with self.engine.connect() as conn:
+                terminated = conn.execute(text("""
+                    SELECT count(pg_terminate_backend(pid))
+                    FROM pg_stat_activity
+                    WHERE datname = ANY(:databases)
+                    AND pid <> pg_backend_pid()
+                """), {'databases': list(databases)}).scalar()
+
+            logger.info(f"🔌 {terminated} conexão(ões) terminadas em {len(databases)} banco(s)")
+            return terminated
+
+        except Exception as e:
+            logger.error(f"❌ Erro ao terminar conexões: {e}")
+            return 0
+
+    def supports_force_drop(self) -> bool:
+        """Se o servidor aceita DROP DATABASE ... WITH (FORCE)."""
+        try:
+            with self.engine.connect() as conn:
+                version = int(conn.execute(text("SHOW server_version_num")).scalar())
+            return version >= FORCE_DROP_MIN_VERSION
+        except Exception as e:
+            logger.warning(f"⚠️ Versão do servidor não identificada ({e}) - DROP sem FORCE")
+            return False
+
+    def drop_database_forced(self, database: str, force: bool = True,
+                             lock_timeout_ms: int = DEFAULT_LOCK_TIMEOUT_MS,
+                             engine=None) -> bool:
+        """
+        Apaga um banco cujas conexões já foram terminadas (modo paralelo).
+
+        Args:
+            database: Banco a apagar
+            force: Usar WITH (FORCE) (PostgreSQL 13+), que encerra conexões
+                abertas depois da terminação em massa
+            lock_timeout_ms: Espera máxima por locks antes de desistir do banco
+            engine: Engine a usar (padrão: self.engine)
+        """
+        option = " WITH (FORCE)" if force else ""
+        try:
+            with (engine or self.engine).connect() as conn:
+                # AUTOCOMMIT: sem transação para SET LOCAL; a conexão volta ao pool
+                conn.execute(text(f"SET lock_timeout = {int(lock_timeout_ms)}"))
+                try:
+                    conn.execute(text(f"DROP DATABASE IF EXISTS {quote_ident(database)}{option}"))
+                finally:
+                    conn.execute(text("RESET lock_timeout"))
+
+            logger.success(f"🗑️ Banco apagado: {database}")
+            return True
+
+        except Exception as e:
+            logger.error(f"❌ Erro ao apagar banco '{database}': {e}")
+            return False
+
+    def drop_databases_parallel(self, databases: List[str],
+                                workers: int = DEFAULT_DROP_WORKERS,
+                                lock_timeout_ms: int = DEFAULT_LOCK_TIMEOUT_MS) -> int:
+        """
+        Apaga bancos concorrentemente: uma terminação de conexões em massa
+        e DROPs em paralelo, limitados a `workers` conexões.
+
+        Returns:
+            Quantidade de bancos apagados
+        """
+        databases = [db for db in databases if db not in self.protected_databases]
+        if not databases:
+            return 0
+
+        force = self.supports_force_drop()
+        self.terminate_all_connections(databases)
+
+        workers = max(1, min(workers, len(databases)))
+        logger.info(f"⚡ Apagando {len(databases)} banco(s) com {workers} conexões"
+                    f"{' (WITH FORCE)' if force else ''}")
+
+        # Pool próprio com uma conexão por worker: o pool padrão de self.engine
+        # (5 + 10) faria workers excedentes esperarem até pool_timeout
+        drop_engine = create_engine(self.engine.url, isolation_level="AUTOCOMMIT",
+                                    pool_size=workers, max_overflow=0)
+        try:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="drop") as executor:
+                results = executor.map(
+                    lambda database: self.drop_database_forced(database, force,
+                                                               lock_timeout_ms, drop_engine),
+                    databases)
+                return sum(1 for dropped in results if dropped)
+        finally:
+            drop_engine.dispose()
+
     def drop_database(self, database: str, dry_run: bool = False) -> bool:
         """Apaga um banco de dados."""
         if database in self.protected_databases:
@@ -185,65 +337,95 @@ class PostgreSQLCleanup:
             logger.error(f"❌ Erro ao apagar banco '{database}': {e}")
             return False
 
-    def check_user_dependencies(self, username: str) -> Dict:
-        """Verifica dependências de um usuário antes de excluir."""
-        dependencies = {
+    @staticmethod
+    def _empty_dependencies() -> Dict:
+        return {
             'has_dependencies': False,
             'owned_databases': [],
             'owned_schemas': [],
             'owned_tables': [],
-            'granted_permissions': []
+            'owned_functions': [],
+            'owned_objects_total': 0,
+            'granted_permissions': [],
+            'unscanned_databases': []
         }
 
+    def _scan_database(self, database: str, roles: List[str]) -> List:
+        """Objetos das roles em um banco: uma consulta agrupada por role e tipo."""
+        engine = create_engine(self.engine.url.set(database=database), poolclass=NullPool)
         try:
-            with self.engine.connect() as conn:
-                # Verificar bancos de propriedade do usuário (usando catálogo direto)
-                result = conn.execute(text(f"""
-                    SELECT datname
-                    FROM pg_database d
-                    JOIN pg_authid a ON d.datdba = a.oid
-                    WHERE a.rolname = '{username}'
-                    AND datname NOT IN ('template0', 'template1')
-                """))
-                dependencies['owned_databases'] = [row[0] for row in result]
-
-                # Verificar schemas de propriedade do usuário (usando catálogo direto)
-                result = conn.execute(text(f"""
-                    SELECT nspname
-                    FROM pg_namespace n
-                    JOIN pg_authid a ON n.nspowner = a.oid
-                    WHERE a.rolname = '{username}'
-                    AND nspname NOT LIKE 'pg_%'
-                    AND nspname NOT IN ('information_schema')
-                """))
-                dependencies['owned_schemas'] = [row[0] for row in result]
-
-                # Verificar tabelas de propriedade do usuário (usando catálogo direto)
-                result = conn.execute(text(f"""
-                    SELECT n.nspname, c.relname
-                    FROM pg_class c
-                    JOIN pg_namespace n ON c.relnamespace = n.oid
-                    JOIN pg_authid a ON c.relowner = a.oid
-                    WHERE a.rolname = '{username}'
-                    AND c.relkind IN ('r', 't')  -- tabelas regulares e temporárias
-                    AND n.nspname NOT LIKE 'pg_%'
-                    AND n.nspname NOT IN ('information_schema')
-                    LIMIT 10
-                """))
-                dependencies['owned_tables'] = [f"{row[0]}.{row[1]}" for row in result]
+            with engine.connect() as conn:
+                return conn.execute(text(OWNED_OBJECTS_QUERY),
+                                    {'roles': roles,
+                                     'sample_size': DEPENDENCY_SAMPLE_SIZE}).fetchall()
+        finally:
+            engine.dispose()
 
-                # Verificar se há dependências
-                dependencies['has_dependencies'] = (
-                    len(dependencies['owned_databases']) > 0 or
-                    len(dependencies['owned_schemas']) > 0 or
-                    len(dependencies['owned_tables']) > 0
-                )
+    def scan_user_dependencies(self, usernames: List[str]) -> Dict[str, Dict]:
+        """
+        Índice role → dependências em todos os bancos do servidor.
+
+        Bancos próprios vêm do catálogo global; schemas, tabelas (e demais
+        relações) e funções vêm de uma consulta agrupada por banco,
+        executada em paralelo (até `scan_workers` conexões).
+
+        Args:
+            usernames: Roles a verificar
+
+        Returns:
+            Dependências de cada role. Bancos que não puderam ser varridos
+            ficam em 'unscanned_databases' (o DROP USER continua protegido
+            pelo próprio servidor)
+        """
+        index = {user: self._empty_dependencies() for user in usernames}
+        if not usernames:
+            return index
+        roles = list(usernames)
 
+        try:
+            with self.engine.connect() as conn:
+                for rolname, datname in conn.execute(text(OWNED_DATABASES_QUERY),
+                                                     {'roles': roles}):
+                    index[rolname]['owned_databases'].append(datname)
+                databases = [row[0] for row in conn.execute(text(
+                    "SELECT datname FROM pg_database WHERE datallowconn ORDER BY datname"))]
         except Exception as e:
-            logger.warning(f"⚠️ Erro ao verificar dependências de '{username}': {e}")
-            dependencies['has_dependencies'] = True  # Assume dependências por segurança
+            logger.warning(f"⚠️ Erro ao varrer dependências: {e}")
+            for dependencies in index.values():
+                dependencies['has_dependencies'] = True  # Assume dependências por segurança
+            return index
+
+        unscanned = []
+        workers = max(1, min(self.scan_workers, len(databases)))
+        logger.info(f"🔎 Varrendo dependências de {len(roles)} usuário(s) "
+                    f"em {len(databases)} banco(s) ({workers} conexões)")
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="scan") as executor:
+            futures = {database: executor.submit(self._scan_database, database, roles)
+                       for database in databases}
+            for database, future in futures.items():
+                try:
+                    rows = future.result()
+                except Exception as e:
+                    logger.warning(f"⚠️ Banco '{database}' não varrido: {e}")
+                    unscanned.append(database)
+                    continue
+
+                for rolname, kind, total, sample in rows:
+                    index[rolname][f"owned_{kind}s"].extend(
+                        f"{database}:{name}" for name in sample)
+                    index[rolname]['owned_objects_total'] += total
+
+        for dependencies in index.values():
+            dependencies['unscanned_databases'] = list(unscanned)
+            dependencies['has_dependencies'] = bool(
+                dependencies['owned_databases'] or dependencies['owned_objects_total'])
+
+        return index
 
-        return dependencies
+    def check_user_dependencies(self, username: str) -> Dict:
+        """Verifica dependências de um usuário antes de excluir (em todos os bancos)."""
+        return self.scan_user_dependencies([username])[username]
 
     def drop_user(self, username: str, dry_run: bool = False) -> bool:
         """Apaga um usuário (função legada - use cleanup_all_users para lógica completa)."""
@@ -274,8 +456,16 @@ class PostgreSQLCleanup:
             logger.error(f"❌ Erro ao apagar usuário '{username}': {e}")
             return False
 
-    def cleanup_all_databases(self, dry_run: bool = False) -> Dict:
-        """Apaga todos os bancos não protegidos."""
+    def cleanup_all_databases(self, dry_run: bool = False, parallel: int = 0,
+                              lock_timeout_ms: int = DEFAULT_LOCK_TIMEOUT_MS) -> Dict:
+        """
+        Apaga todos os bancos não protegidos.
+
+        Args:
+            dry_run: Apenas simular
+            parallel: Conexões simultâneas de DROP (0/1: um banco por vez)
+            lock_timeout_ms: lock_timeout de cada DROP no modo paralelo
+        """
         logger.info("🗑️ Iniciando limpeza de bancos de dados...")
 
         databases = self.list_databases()
@@ -287,10 +477,14 @@ class PostgreSQLCleanup:
 
         logger.warning(f"⚠️ Será apagado {len(target_databases)} banco(s): {target_databases}")
 
-        deleted_count = 0
-        for database in target_databases:
-            if self.drop_database(database, dry_run):
-                deleted_count += 1
+        if parallel > 1 and not dry_run:
+            deleted_count = self.drop_databases_parallel(target_databases, parallel,
+                                                         lock_timeout_ms)
+        else:
+            deleted_count = 0
+            for database in target_databases:
+                if self.drop_database(database, dry_run):
+                    deleted_count += 1
 
         result = {
             'success': deleted_count == len(target_databases),
@@ -319,9 +513,11 @@ class PostgreSQLCleanup:
         skipped_count = 0
         failed_count = 0
 
+        # Dependências de todos os usuários em uma varredura (mesmo em dry-run para informar)
+        dependency_index = self.scan_user_dependencies(target_users)
+
         for user in target_users:
-            # Verificar dependências primeiro (mesmo em dry-run para informar)
-            dependencies = self.check_user_dependencies(user)
+            dependencies = dependency_index[user]
 
             if dependencies['has_dependencies'] and not dry_run:
                 logger.warning(f"⚠️ Usuário '{user}' PULADO - possui dependências")
@@ -333,6 +529,10 @@ class PostgreSQLCleanup:
                     tables_preview = dependencies['owned_tables'][:3]
                     more = "..." if len(dependencies['owned_tables']) > 3 else ""
                     logger.warning(f"   📋 Tabelas proprietárias: {tables_preview}{more}")
+                if dependencies['owned_functions']:
+                    functions_preview = dependencies['owned_functions'][:3]
+                    more = "..." if len(dependencies['owned_functions']) > 3 else ""
+                    logger.warning(f"   ⚙️ Funções proprietárias: {functions_preview}{more}")
                 skipped_count += 1
                 continue
 
@@ -377,12 +577,13 @@ class PostgreSQLCleanup:
         logger.info(f"📊 Usuários - Apagados: {deleted_count}, Pulados: {skipped_count}, Falharam: {failed_count}")
         return result
 
-    def full_cleanup(self, dry_run: bool = False) -> Dict:
+    def full_cleanup(self, dry_run: bool = False, parallel: int = 0,
+                     lock_timeout_ms: int = DEFAULT_LOCK_TIMEOUT_MS) -> Dict:
         """Executa limpeza completa: bancos + usuários."""
         logger.info("🧹 Iniciando limpeza completa...")
 
         # Apagar bancos primeiro (usuários podem ser donos de bancos)
-        db_result = self.cleanup_all_databases(dry_run)
+        db_result = self.cleanup_all_databases(dry_run, parallel, lock_timeout_ms)
         user_result = self.cleanup_all_users(dry_run)
 
         return {
@@ -505,6 +706,7 @@ Exemplos de uso:
   %(prog)s --server origem --dry-run         # Simular limpeza
   %(prog)s --server origem --databases-only  # Só bancos
   %(prog)s --server origem --users-only      # Só usuários
+  %(prog)s --server destino --parallel 8     # Bancos apagados em paralelo
         """
     )
 
@@ -518,6 +720,14 @@ Exemplos de uso:
                        help='Apagar apenas usuários')
     parser.add_argument('--force', action='store_true',
                        help='Pular confirmação (cuidado!)')
+    parser.add_argument('--parallel', type=int, nargs='?', const=DEFAULT_DROP_WORKERS,
+                       default=0, metavar='N',
+                       help='Apagar bancos em paralelo com N conexões '
+                            f'(padrão do modo: {DEFAULT_DROP_WORKERS}); '
+                            'terminação de conexões em massa e DROP ... WITH (FORCE). '
+                            'N também limita as conexões da varredura de dependências')
+    parser.add_argument('--lock-timeout', type=float, default=DEFAULT_LOCK_TIMEOUT_MS / 1000,
+                       help='lock_timeout (segundos) de cada DROP no modo paralelo')
 
     args = parser.parse_args()
 
@@ -566,6 +776,8 @@ Exemplos de uso:
 
         # Criar instância de limpeza
         cleanup = PostgreSQLCleanup(config, server_name)
+        if args.parallel:
+            cleanup.scan_workers = args.parallel
 
         # Conectar
         if not cleanup.connect():
@@ -574,14 +786,16 @@ Exemplos de uso:
 
         try:
             # Executar limpeza baseada nas opções
+            lock_timeout_ms = int(args.lock_timeout * 1000)
             if args.databases_only:
-                result = cleanup.cleanup_all_databases(args.dry_run)
+                result = cleanup.cleanup_all_databases(args.dry_run, args.parallel,
+                                                       lock_timeout_ms)
                 success = result['success']
             elif args.users_only:
                 result = cleanup.cleanup_all_users(args.dry_run)
                 success = result['success']
             else:
-                result = cleanup.full_cleanup(args.dry_run)
+                result = cleanup.full_cleanup(args.dry_run, args.parallel, lock_timeout_ms)
                 success = result['overall_success']
 
             if not success:
@@ -0,0 +1,545 @@
+#!/usr/bin/env python3
+"""
+PostgreSQL Migration - Backend Assíncrono
+=========================================
+
+Versão asyncio das fases de usuários, bancos e privilégios do
+SQLAlchemyPostgreSQLMigrator:
+- Conexões limitadas por semáforo em cada servidor
+- Leitura da origem sobreposta às escritas no destino (fila de lotes)
+- Bancos e privilégios aplicados em paralelo, um banco por conexão
+
+Dependências (opcional):
+    pip install asyncpg
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set
+
+try:
+    import asyncpg
+except ImportError:  # backend opcional
+    asyncpg = None
+
+from app.core.sqlalchemy_migration import (DATABASE_ACL_QUERY, SOURCE_ROLES_QUERY,
+                                           SQLAlchemyPostgreSQLMigrator)
+from app.monitoring.dashboard import progress_hub
+from app.monitoring.metrics import ACTIVE_CONNECTIONS, ERRORS, OBJECTS_PROCESSED
+from components.logging_utils import configure_console_logging, get_migration_logger
+
+logger = get_migration_logger('async')
+
+# Conexões simultâneas por servidor
+DEFAULT_MAX_CONNECTIONS = 8
+
+# Bancos migráveis da origem (sem templates)
+SOURCE_DATABASES_QUERY = """
+SELECT d.datname, r.rolname AS owner, d.datconnlimit
+FROM pg_database d
+JOIN pg_roles r ON d.datdba = r.oid
+WHERE d.datallowconn AND NOT d.datistemplate
+ORDER BY d.datname
+"""
+
+# Marca o fim da fila de lotes de roles
+_END_OF_ROLES = None
+
+
+def quote_literal(value: str) -> str:
+    """Literal SQL com aspas simples escapadas (standard_conforming_strings)."""
+    return "'" + value.replace("'", "''") + "'"
+
+
+class BoundedConnections:
+    """
+    Conexões reutilizáveis para um servidor, limitadas por semáforo.
+
+    No máximo `limit` conexões ficam em uso ao mesmo tempo; conexões
+    devolvidas sem erro são reaproveitadas pelas próximas tarefas.
+    """
+
+    def __init__(self, name: str, connect: Callable[[], Awaitable[Any]],
+                 limit: int = DEFAULT_MAX_CONNECTIONS):
+        """
+        Args:
+            name: Nome do servidor (origem/destino) para mensagens
+            connect: Fábrica assíncrona de conexões
+            limit: Máximo de conexões simultâneas
+        """
+        self.name = name
+        self.limit = limit
+        self._connect = connect
+        self._semaphore = asyncio.Semaphore(limit)
+        self._idle: List[Any] = []
+        self.opened = 0
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[Any]:
+        async with self._semaphore:
+            if self._idle:
+                conn = self._idle.pop()
+            else:
+                conn = await self._connect()
+                self.opened += 1
+            ACTIVE_CONNECTIONS.inc(server=self.name)
+            try:
+                yield conn
+            except BaseException:
+                # Conexão em estado incerto: descartar
+                await conn.close()
+                raise
+            else:
+                self._idle.append(conn)
+            finally:
+                ACTIVE_CONNECTIONS.dec(server=self.name)
+
+    async def close(self) -> None:
+        while self._idle:
+            await self._idle.pop().close()
+
+
+class AsyncPostgreSQLMigrator(SQLAlchemyPostgreSQLMigrator):
+    """
+    Migração de usuários, bancos e privilégios com asyncio.
+
+    Reaproveita do migrator síncrono a configuração, as proteções, a
+    montagem dos CREATE ROLE e o plano de GRANTs; só a execução muda.
+    """
+
+    def __init__(self, max_connections: int = DEFAULT_MAX_CONNECTIONS):
+        """
+        Args:
+            max_connections: Conexões simultâneas por servidor
+        """
+        super().__init__()
+        self.max_connections = max_connections
+        self.source: Optional[BoundedConnections] = None
+        self.destination: Optional[BoundedConnections] = None
+
+    def _connect_factory(self, config: Dict) -> Callable[[], Awaitable[Any]]:
+        from components.config_normalizer import normalize_server_config
+
+        server = normalize_server_config(config)
+
+        async def connect():
+            return await asyncpg.connect(
+                host=server['host'],
+                port=server['port'],
+                user=server['user'],
+                password=server['password'],
+                database='postgres',
+                ssl=server['ssl_mode'],
+                timeout=server['connection_timeout']
+            )
+
+        return connect
+
+    def open_connections(self) -> bool:
+        """Prepara os limitadores de conexão de origem e destino."""
+        if asyncpg is None:
+            print("❌ Backend assíncrono requer asyncpg (pip install asyncpg)")
+            return False
+
+        try:
+            self.source = BoundedConnections(
+                "origem", self._connect_factory(self.source_config), self.max_connections)
+            self.destination = BoundedConnections(
+                "destino", self._connect_factory(self.dest_config), self.max_connections)
+            return True
+        except Exception as e:
+            print(f"❌ Erro ao preparar conexões: {e}")
+            return False
+
+    async def close_connections(self) -> None:
+        for server in (self.source, self.destination):
+            if server:
+                await server.close()
+
+    # ------------------------------------------------------------------
+    # Origem
+    # ------------------------------------------------------------------
+
+    async def produce_users(self, role_queue: "asyncio.Queue") -> int:
+        """Lê os roles da origem em lotes e os entrega na fila."""
+        read = 0
+        batch: List[Dict] = []
+
+        try:
+            async with self.source.acquire() as conn:
+                async with conn.transaction():
+                    async for row in conn.cursor(SOURCE_ROLES_QUERY,
+                                                 prefetch=self.role_batch_size):
+                        batch.append(dict(row))
+                        if len(batch) >= self.role_batch_size:
+                            read += len(batch)
+                            await role_queue.put(batch)
+                            batch = []
+
+            if batch:
+                read += len(batch)
+                await role_queue.put(batch)
+        finally:
+            # Libera o consumidor mesmo se a leitura falhar. Sem await: com a
+            # fila cheia (consumidor parado ou cancelamento) um put bloquearia
+            # para sempre; migrate() cancela o consumidor nesse caso
+            try:
+                role_queue.put_nowait(_END_OF_ROLES)
+            except asyncio.QueueFull:
+                pass
+
+        print(f"   ✅ Encontrados {read} usuários")
+        return read
+
+    async def fetch_databases(self) -> List[Dict]:
+        """Coleta os bancos da origem com seus owners."""
+        async with self.source.acquire() as conn:
+            rows = await conn.fetch(SOURCE_DATABASES_QUERY)
+        databases = [dict(row) for row in rows]
+        print(f"   ✅ Encontrados {len(databases)} bancos")
+        return databases
+
+    async def fetch_privileges(self) -> Dict[str, List[Dict]]:
+        """Coleta as ACLs de todos os bancos da origem (uma query)."""
+        index: Dict[str, List[Dict]] = {}
+
+        async with self.source.acquire() as conn:
+            rows = await conn.fetch(DATABASE_ACL_QUERY)
+
+        for row in rows:
+            # Ignorar usuários do sistema
+            if row['grantee'] in ['postgres', 'migration_user']:
+                index.setdefault(row['datname'], [])
+                continue
+
+            db_privileges = self._privilege_names(row['privileges'])
+            if db_privileges:
+                index.setdefault(row['datname'], []).append({
+                    'username': row['grantee'],
+                    'privileges': db_privileges
+                })
+
+        self._privilege_index = index
+        return index
+
+    # ------------------------------------------------------------------
+    # Destino
+    # ------------------------------------------------------------------
+
+    async def load_role_snapshot_async(self) -> Set[str]:
+        """Snapshot de roles do destino, carregado uma vez por execução."""
+        if self._role_snapshot is None:
+            async with self.destination.acquire() as conn:
+                rows = await conn.fetch("SELECT rolname FROM pg_roles")
+            self._role_snapshot = {row['rolname'] for row in rows}
+        return self._role_snapshot
+
+    def _create_role_literal_sql(self, user: Dict) -> str:
+        """CREATE ROLE com a senha (hash) como literal, para envio em lote."""
+        sql = f'CREATE ROLE "{user["rolname"]}" WITH {self._role_attributes(user)}'
+        if user['rolpassword']:
+            sql += f" PASSWORD {quote_literal(user['rolpassword'])}"
+        return sql
+
+    async def _create_role_async(self, conn, user: Dict) -> bool:
+        username = user['rolname']
+        try:
+            await conn.execute(self._create_role_literal_sql(user))
+            self.remember_role(username)
+            logger.debug("   ✅ Usuário %s criado", username)
+            OBJECTS_PROCESSED.inc(kind='role')
+            return True
+        except Exception as e:
+            logger.error("   ❌ Erro ao criar %s: %s", username, e)
+            ERRORS.inc(component='roles')
+            return False
+
+    async def _create_roles_batch_async(self, batch: List[Dict]) -> int:
+        """
+        Cria um lote de roles em uma transação, verificado com ANY($1).
+
+        Lote recusado pelo destino é criado um a um.
+        """
+        names = [user['rolname'] for user in batch]
+
+        async with self.destination.acquire() as conn:
+            try:
+                async with conn.transaction():
+                    await conn.execute(";\n".join(
+                        self._create_role_literal_sql(user) for user in batch))
+            except Exception as e:
+                logger.warning("   ⚠️ Lote de %d usuários recusado (%s) - criando individualmente",
+                               len(batch), e)
+                created = 0
+                for user in batch:
+                    if await self._create_role_async(conn, user):
+                        created += 1
+                progress_hub.advance('roles', len(batch), item=names[-1])
+                return created
+
+            rows = await conn.fetch(
+                "SELECT rolname FROM pg_roles WHERE rolname = ANY($1::text[])", names)
+
+        found = {row['rolname'] for row in rows}
+        for username in names:
+            if username in found:
+                self.remember_role(username)
+            else:
+                logger.error("   ❌ Usuário %s não persistido", username)
+                ERRORS.inc(component='roles')
+
+        OBJECTS_PROCESSED.inc(len(found), kind='role')
+        logger.info("   ✅ Lote: %d/%d usuários criados e verificados", len(found), len(names))
+        progress_hub.advance('roles', len(names), item=names[-1])
+        return len(found)
+
+    async def consume_users(self, role_queue: "asyncio.Queue") -> int:
+        """Cria no destino os lotes de roles à medida que chegam da origem."""
+        existing_users = await self.load_role_snapshot_async()
+        protected_users, _ = self.get_protected_items()
+        pending_batches = []
+
+        try:
+            while True:
+                batch = await role_queue.get()
+                if batch is _END_OF_ROLES:
+                    break
+
+                pending = []
+                for user in batch:
+                    username = user['rolname']
+                    if username in protected_users:
+                        logger.info("   🛡️ Usuário %s está protegido - pulando criação", username)
+                    elif username in existing_users:
+                        logger.debug("   ⚠️ Usuário %s já existe - pulando", username)
+                    else:
+                        pending.append(user)
+
+                if pending:
+                    progress_hub.add_total('roles', len(pending))
+                    pending_batches.append(
+                        asyncio.create_task(self._create_roles_batch_async(pending)))
+        except BaseException:
+            # Cancelado pelo migrate(): lotes já disparados não ficam órfãos
+            for task in pending_batches:
+                task.cancel()
+            raise
+
+        created = sum(await asyncio.gather(*pending_batches))
+        print(f"   🎯 {created} usuários criados")
+        return created
+
+    async def _create_database_async(self, db_info: Dict,
+                                     existing: Dict[str, str]) -> int:
+        db_name = db_info['datname']
+
+        progress_hub.advance('databases', item=db_name)
+        async with self.destination.acquire() as conn:
+            if db_name in existing:
+                if existing[db_name] != 'postgres':
+                    logger.info("   🔄 Alterando owner de %s: %s → postgres", db_name, existing[db_name])
+                    await conn.execute(f'ALTER DATABASE "{db_name}" OWNER TO postgres')
+                    OBJECTS_PROCESSED.inc(kind='database')
+                    return 1
+                return 0
+
+            await conn.execute(f"""
+                CREATE DATABASE "{db_name}"
+                WITH
+                    OWNER = postgres
+                    ENCODING = 'UTF8'
+                    LC_COLLATE = 'en_US.UTF-8'
+                    LC_CTYPE = 'en_US.UTF-8'
+                    TEMPLATE = template0
+                    CONNECTION LIMIT = {int(db_info['datconnlimit'])}
+            """)
+        logger.info("   ✅ Banco %s criado (owner: postgres)", db_name)
+        OBJECTS_PROCESSED.inc(kind='database')
+        return 1
+
+    async def create_databases_async(self, databases: List[Dict]) -> int:
+        """Cria os bancos no destino em paralelo (um por conexão)."""
+        _, protected_databases = self.get_protected_items()
+
+        async with self.destination.acquire() as conn:
+            rows = await conn.fetch("""
+                SELECT d.datname, r.rolname AS owner
+                FROM pg_database d JOIN pg_roles r ON d.datdba = r.oid
+            """)
+        existing = {row['datname']: row['owner'] for row in rows}
+
+        tasks = []
+        for db_info in databases:
+            if db_info['datname'] in protected_databases:
+                logger.info("   🛡️ Banco %s está protegido - pulando alteração de owner",
+                            db_info['datname'])
+                continue
+            tasks.append(self._create_database_async(db_info, existing))
+        progress_hub.set_total('databases', len(tasks))
+
+        created = 0
+        for result in await asyncio.gather(*tasks, return_exceptions=True):
+            if isinstance(result, Exception):
+                logger.error("   ❌ Erro ao criar banco: %s", result)
+                ERRORS.inc(component='databases')
+            else:
+                created += result
+
+        print(f"   🎯 {created} bancos criados/corrigidos")
+        return created
+
+    async def _apply_privileges_async(self, db_info: Dict,
+                                      existing_users: Set[str]) -> int:
+        db_name = db_info['datname']
+        grants, notes = self._database_grant_plan(db_info, existing_users)
+        applied = 0
+
+        async with self.destination.acquire() as conn:
+            async with conn.transaction():
+                for privilege, username in grants:
+                    # Cada GRANT em seu savepoint
+                    try:
+                        async with conn.transaction():
+                            await conn.execute(
+                                str(self._grant_query(db_name, privilege, username)))
+                        applied += 1
+                        OBJECTS_PROCESSED.inc(kind='grant')
+                    except Exception as e:
+                        logger.error("     ❌ Erro %s para %s em %s: %s",
+                                     privilege, username, db_name, e)
+                        ERRORS.inc(component='grants')
+
+        for note in notes:
+            logger.info("     %s", note)
+        progress_hub.advance('privileges', item=db_name)
+        return applied
+
+    async def apply_privileges_async(self, databases: List[Dict]) -> int:
+        """Aplica os privilégios de todos os bancos em paralelo."""
+        existing_users = await self.load_role_snapshot_async()
+        progress_hub.set_total('privileges', len(databases))
+        results = await asyncio.gather(
+            *(self._apply_privileges_async(db_info, existing_users)
+              for db_info in databases),
+            return_exceptions=True)
+
+        applied = 0
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error("   ❌ Erro ao aplicar privilégios: %s", result)
+                ERRORS.inc(component='grants')
+            else:
+                applied += result
+
+        print(f"   🎯 {applied} privilégios aplicados")
+        return applied
+
+    # ------------------------------------------------------------------
+    # Execução
+    # ------------------------------------------------------------------
+
+    async def migrate(self) -> Dict[str, int]:
+        """
+        Executa as três fases com leituras e escritas sobrepostas.
+
+        Roles são criados conforme os lotes chegam da origem; bancos e ACLs
+        são lidos em paralelo e os bancos criados assim que a lista chega.
+        Os privilégios esperam roles e bancos.
+        """
+        role_queue: asyncio.Queue = asyncio.Queue(maxsize=4)
+
+        producer = asyncio.create_task(self.produce_users(role_queue))
+        users_created = asyncio.create_task(self.consume_users(role_queue))
+        acl_read = asyncio.create_task(self.fetch_privileges())
+        tasks = (producer, users_created, acl_read)
+
+        # Consumidor com erro não esvazia mais a fila: parar a leitura da origem
+        users_created.add_done_callback(
+            lambda task: producer.cancel()
+            if not task.cancelled() and task.exception() is not None else None)
+
+        try:
+            databases = self.filter_protected_databases(await self.fetch_databases())
+            databases_created = await self.create_databases_async(databases)
+
+            _, users, _ = await asyncio.gather(*tasks)
+        except BaseException as error:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            # Cancelamento derivado (produtor parado pelo consumidor): propagar a causa
+            if isinstance(error, asyncio.CancelledError) and not asyncio.current_task().cancelling():
+                for task in tasks:
+                    if not task.cancelled() and task.exception() is not None:
+                        raise task.exception() from None
+            raise
+
+        privileges_applied = await self.apply_privileges_async(databases)
+
+        return {
+            'users_created': users,
+            'databases_created': databases_created,
+            'privileges_applied': privileges_applied
+        }
+
+    async def _run(self) -> Dict[str, int]:
+        try:
+            return await self.migrate()
+        finally:
+            await self.close_connections()
+
+    def run_complete_migration(self) -> bool:
+        """Executa a migração completa com o backend assíncrono."""
+        print("=" * 80)
+        print("🚀 PostgreSQL Migration - Backend Assíncrono")
+        print("=" * 80)
+        print(f"📅 Data: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}")
+        print(f"🔧 Engine: asyncio + asyncpg ({self.max_connections} conexões por servidor)")
+        print("=" * 80)
+
+        start_time = time.time()
+        configure_console_logging()
+
+        if not self.load_configs() or not self.open_connections():
+            return False
+
+        try:
+            result = asyncio.run(self._run())
+        except Exception as e:
+            print(f"❌ Erro fatal na migração assíncrona: {e}")
+            return False
+
+        print("\n" + "=" * 80)
+        print("📊 RELATÓRIO FINAL - MIGRAÇÃO ASSÍNCRONA")
+        print("=" * 80)
+        print(f"✅ Usuários criados: {result['users_created']}")
+        print(f"✅ Bancos criados/corrigidos: {result['databases_created']}")
+        print(f"🔐 Privilégios aplicados: {result['privileges_applied']}")
+        print(f"⏱️ Tempo total: {time.time() - start_time:.2f}s")
+        print("=" * 80)
+        return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migração PostgreSQL com backend assíncrono")
+    parser.add_argument("--max-connections", type=int, default=DEFAULT_MAX_CONNECTIONS,
+                        help="Conexões simultâneas por servidor")
+    parser.add_argument("--batch-size", type=int, default=500,
+                        help="Roles por lote de criação")
+    args = parser.parse_args()
+
+    migrator = AsyncPostgreSQLMigrator(max_connections=args.max_connections)
+    migrator.role_batch_size = args.batch_size
+    return 0 if migrator.run_complete_migration() else 1
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        print("\n⚠️ Migração assíncrona interrompida")
+        sys.exit(130)
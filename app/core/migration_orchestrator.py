@@ -10,6 +10,7 @@ Consolida todos os componentes em um sistema robusto e reutilizável.
 from app.core.modules.script_generator import SQLScriptGenerator
 from app.core.modules.migration_executor import ControlledMigrationExecutor
 from app.core.modules.data_extractor import WF004DataExtractor
+from app.monitoring.tracing import start_tracing, stop_tracing, traced
 import argparse
 import json
 import logging
@@ -125,7 +126,10 @@ class MigrationOrchestrator:
                 "enabled": True,
                 "dry_run_first": True,
                 "interactive_mode": False,
-                "continue_on_error": False
+                "continue_on_error": False,
+                "parallel_workers": 4,
+                "execution_mode": "statement",
+                "batch_size": 500
             },
             "logging": {
                 "level": "INFO",
@@ -143,6 +147,7 @@ class MigrationOrchestrator:
 
         self.logger.info(f"💾 Configuração salva: {self.config_file}")
 
+    @traced(category="phase")
     def phase_1_extraction(self, output_file: Optional[str] = None) -> str:
         """
         Fase 1: Extração de dados do servidor origem.
@@ -179,12 +184,14 @@ class MigrationOrchestrator:
             if self.extractor:
                 self.extractor.close_connection()
 
-    def phase_2_generation(self, json_file: str) -> bool:
+    @traced(category="phase")
+    def phase_2_generation(self, json_file: str, force: bool = False) -> bool:
         """
         Fase 2: Geração de scripts SQL.
 
         Args:
             json_file: Arquivo JSON com dados extraídos
+            force: Se True, ignora o cache e regenera os scripts
 
         Returns:
             True se bem-sucedido, False caso contrário
@@ -194,13 +201,14 @@ class MigrationOrchestrator:
         self.logger.info("="*60)
 
         try:
-            self.generator = SQLScriptGenerator(json_file)
+            self.generator = SQLScriptGenerator(
+                json_file, generation_config=self.config['generation'])
 
             # Configurar diretório de saída
             output_dir = self.config['generation']['output_dir']
             self.generator.output_dir = output_dir
 
-            scripts = self.generator.run_generation()
+            scripts = self.generator.run_generation(force=force)
 
             if scripts:
                 self.logger.info(
@@ -214,20 +222,32 @@ class MigrationOrchestrator:
             self.logger.error(f"❌ Erro na Fase 2: {e}")
             return False
 
+    @traced(category="phase")
     def phase_3_execution(self, dry_run: bool = False,
-                          interactive: bool = False) -> bool:
+                          interactive: bool = False,
+                          force: bool = False,
+                          resume: bool = False,
+                          simulate: bool = False) -> bool:
         """
         Fase 3: Execução controlada da migração.
 
         Args:
             dry_run: Se True, simula execução sem alterar dados
             interactive: Se True, pede confirmação para cada script
+            force: Se True, reexecuta scripts já aplicados no destino
+            resume: Se True, retoma scripts interrompidos pelo journal
+            simulate: Se True, executa no destino e desfaz com ROLLBACK
 
         Returns:
             True se bem-sucedido, False caso contrário
         """
         self.logger.info("\n" + "="*60)
-        phase_name = "🔍 FASE 3: DRY RUN" if dry_run else "🚀 FASE 3: EXECUÇÃO"
+        if dry_run:
+            phase_name = "🔍 FASE 3: DRY RUN"
+        elif simulate:
+            phase_name = "🧪 FASE 3: SIMULAÇÃO"
+        else:
+            phase_name = "🚀 FASE 3: EXECUÇÃO"
         self.logger.info(phase_name)
         self.logger.info("="*60)
 
@@ -238,10 +258,20 @@ class MigrationOrchestrator:
             # Configurar diretório de scripts
             scripts_dir = self.config['generation']['output_dir']
             self.executor.scripts_dir = scripts_dir
+            execution_config = self.config['execution']
+            self.executor.max_workers = execution_config.get(
+                'parallel_workers', self.executor.max_workers)
+            self.executor.execution_mode = execution_config.get(
+                'execution_mode', self.executor.execution_mode)
+            self.executor.batch_size = execution_config.get(
+                'batch_size', self.executor.batch_size)
 
             success = self.executor.run_migration(
                 dry_run=dry_run,
-                interactive=interactive
+                interactive=interactive,
+                force=force,
+                resume=resume,
+                simulate=simulate
             )
 
             if success:
@@ -259,9 +289,12 @@ class MigrationOrchestrator:
             if self.executor:
                 self.executor.close_connection()
 
+    @traced(category="pipeline")
     def run_complete_migration(self, extraction_file: Optional[str] = None,
                                dry_run_first: bool = True,
-                               interactive: bool = False) -> bool:
+                               interactive: bool = False,
+                               force: bool = False,
+                               resume: bool = False) -> bool:
         """
         Executa migração completa (todas as 3 fases).
 
@@ -269,6 +302,8 @@ class MigrationOrchestrator:
             extraction_file: Arquivo específico para extração
             dry_run_first: Se True, executa dry run antes da migração real
             interactive: Modo interativo
+            force: Se True, ignora cache de scripts e registro de aplicados
+            resume: Se True, retoma scripts interrompidos pelo journal
 
         Returns:
             True se bem-sucedido, False caso contrário
@@ -294,7 +329,7 @@ class MigrationOrchestrator:
 
             # Fase 2: Geração
             if self.config['generation']['enabled']:
-                if not self.phase_2_generation(json_file):
+                if not self.phase_2_generation(json_file, force=force):
                     return False
 
             # Fase 3: Execução
@@ -308,7 +343,10 @@ class MigrationOrchestrator:
                         return False
 
                 # Execução real
-                if not self.phase_3_execution(dry_run=False, interactive=interactive):
+                if not self.phase_3_execution(dry_run=False,
+                                              interactive=interactive,
+                                              force=force,
+                                              resume=resume):
                     return False
 
             # Sucesso!
@@ -401,12 +439,20 @@ Exemplos de uso:
                         help='Modo interativo')
     parser.add_argument('--no-dry-run-first', action='store_true',
                         help='Pular dry run automático antes da execução')
+    parser.add_argument('--force', action='store_true',
+                        help='Ignorar cache de scripts e reexecutar scripts já aplicados')
+    parser.add_argument('--resume', action='store_true',
+                        help='Retomar scripts interrompidos a partir do journal')
+    parser.add_argument('--simulate', action='store_true',
+                        help='Executar no destino e desfazer com ROLLBACK (previsão)')
 
     # Debug e relatórios
     parser.add_argument('--verbose', action='store_true',
                         help='Saída detalhada')
     parser.add_argument('--report', action='store_true',
                         help='Gerar relatório ao final')
+    parser.add_argument('--trace', action='store_true',
+                        help='Gravar spans (fases, conexões, SQL) em reports/trace_<sessão>.json')
 
     args = parser.parse_args()
 
@@ -418,13 +464,18 @@ Exemplos de uso:
 
     success = False
 
+    if args.trace:
+        start_tracing()
+
     try:
         if args.complete:
             # Migração completa
             success = orchestrator.run_complete_migration(
                 extraction_file=args.input,
                 dry_run_first=not args.no_dry_run_first,
-                interactive=args.interactive
+                interactive=args.interactive,
+                force=args.force,
+                resume=args.resume
             )
 
         elif args.extract:
@@ -439,13 +490,17 @@ Exemplos de uso:
             if not args.input:
                 print("❌ --input é obrigatório para geração")
                 sys.exit(1)
-            success = orchestrator.phase_2_generation(args.input)
+            success = orchestrator.phase_2_generation(args.input,
+                                                      force=args.force)
 
         elif args.execute:
             # Apenas execução
             success = orchestrator.phase_3_execution(
                 dry_run=args.dry_run,
-                interactive=args.interactive
+                interactive=args.interactive,
+                force=args.force,
+                resume=args.resume,
+                simulate=args.simulate
             )
 
         else:
@@ -470,6 +525,11 @@ Exemplos de uso:
     except Exception as e:
         print(f"\n💥 Erro inesperado: {e}")
         sys.exit(1)
+    finally:
+        if args.trace:
+            trace_file = stop_tracing(
+                Path("reports") / f"trace_{orchestrator.session_id}.json")
+            print(f"🔥 Trace (chrome://tracing, Perfetto): {trace_file}")
 
 
 if __name__ == "__main__":
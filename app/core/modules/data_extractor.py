@@ -9,6 +9,9 @@ from typing import Any, Dict, List, Optional
 
 import psycopg2
 
+from app.monitoring.traced_connection import TracedConnection
+from app.monitoring.tracing import traced
+
 
 class WF004DataExtractor:
     """Extrator de dados do servidor PostgreSQL WF004."""
@@ -64,7 +67,8 @@ class WF004DataExtractor:
                 port=self.config['port'],
                 database='postgres',
                 user=self.config['user'],
-                password=self.config['password']
+                password=self.config['password'],
+                connection_factory=TracedConnection
             )
 
             print(f"✅ Conectado ao {self.config['host']}:{self.config['port']}")
@@ -84,6 +88,7 @@ class WF004DataExtractor:
             print(f"❌ Erro conectando: {e}")
             return False
 
+    @traced(category="extraction")
     def extract_users(self) -> bool:
         """Extrai usuários do servidor."""
         try:
@@ -125,6 +130,7 @@ class WF004DataExtractor:
             print(f"❌ Erro extraindo usuários: {e}")
             return False
 
+    @traced(category="extraction")
     def extract_databases(self) -> bool:
         """Extrai bases de dados do servidor."""
         try:
@@ -178,6 +184,7 @@ class WF004DataExtractor:
                 pass
             return False
 
+    @traced(category="extraction")
     def extract_grants(self) -> bool:
         """Extrai grants das bases de dados."""
         try:
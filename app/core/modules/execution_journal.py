@@ -0,0 +1,163 @@
+"""
+Módulo de Journal de Execução
+Registra cada statement executado na Fase 3 para permitir retomar scripts
+interrompidos a partir do primeiro statement não aplicado
+"""
+
+import hashlib
+import json
+import os
+import re
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+from app.core.modules.script_cache import ScriptCache
+from app.core.modules.sql_lexer import SQLStatement
+
+# Resultados registrados por statement
+APPLIED = "applied"
+TOLERATED = "tolerated"
+FAILED = "failed"
+
+
+def statement_hash(sql: str) -> str:
+    """SHA-256 do texto do statement."""
+    return hashlib.sha256(sql.encode("utf-8")).hexdigest()
+
+
+class ExecutionJournal:
+    """
+    Journal (JSON lines) dos statements de um script em um destino.
+
+    A primeira linha identifica o script pelo hash do conteúdo; as demais
+    registram posição, linha, hash e resultado de cada statement, na ordem
+    de execução. Se o script mudar, o journal anterior é descartado.
+    """
+
+    JOURNAL_DIR = "journal"
+
+    def __init__(self, scripts_dir: str, destination: str, script_file: str):
+        """
+        Inicializa o journal.
+
+        Args:
+            scripts_dir: Diretório dos scripts gerados
+            destination: Destino no formato host:porta
+            script_file: Script relativo a scripts_dir
+        """
+        safe_name = re.sub(r'[^A-Za-z0-9_.-]', '_', f"{destination}__{script_file}")
+        self.path = os.path.join(scripts_dir, self.JOURNAL_DIR, f"{safe_name}.jsonl")
+        self.script_path = os.path.join(scripts_dir, script_file)
+        self.script_file = script_file
+        self._file = None
+
+    def _read_entries(self) -> Iterator[Dict[str, Any]]:
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    # Última linha truncada por interrupção
+                    return
+
+    def resume_point(self) -> Optional[Dict[str, Any]]:
+        """
+        Retorna o último statement concluído (aplicado ou tolerado).
+
+        Returns:
+            Registro do statement, com 'applied_count', ou None se não houver
+            journal válido para o conteúdo atual do script
+        """
+        entries = self._read_entries()
+        header = next(entries, None)
+        if not header or header.get('type') != 'header':
+            return None
+        if header.get('script_hash') != ScriptCache.hash_file(self.script_path):
+            return None
+
+        last_done = None
+        done_count = 0
+        for entry in entries:
+            if entry.get('outcome') in (APPLIED, TOLERATED):
+                last_done = entry
+                done_count += 1
+
+        if last_done is None:
+            return None
+        return dict(last_done, applied_count=done_count)
+
+    def start(self, resume: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Abre o journal para escrita.
+
+        Args:
+            resume: Se True, mantém o journal existente (quando válido) e
+                retorna o ponto de retomada; caso contrário começa do zero
+
+        Returns:
+            Ponto de retomada (ver resume_point) ou None
+        """
+        point = self.resume_point() if resume else None
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        if point:
+            self._file = open(self.path, 'a', encoding='utf-8')
+        else:
+            self._file = open(self.path, 'w', encoding='utf-8')
+            self._write({
+                'type': 'header',
+                'script': self.script_file,
+                'script_hash': ScriptCache.hash_file(self.script_path),
+                'started_at': datetime.now().isoformat()
+            })
+        return point
+
+    def _write(self, entry: Dict[str, Any]) -> None:
+        self._file.write(json.dumps(entry) + "\n")
+        self._file.flush()
+
+    def record(self, statement: SQLStatement, outcome: str) -> None:
+        """Registra o resultado de um statement."""
+        self.record_many([statement], outcome)
+
+    def record_many(self, statements: Iterable[SQLStatement], outcome: str) -> None:
+        """Registra o mesmo resultado para statements consecutivos."""
+        lines = [json.dumps({
+            'offset': statement.offset,
+            'line': statement.line,
+            'sha256': statement_hash(statement.sql),
+            'outcome': outcome
+        }) + "\n" for statement in statements]
+        self._file.write("".join(lines))
+        self._file.flush()
+
+    def close(self) -> None:
+        """Grava em disco e fecha o journal."""
+        if self._file:
+            os.fsync(self._file.fileno())
+            self._file.close()
+            self._file = None
+
+
+def skip_applied(statements: Iterable[SQLStatement],
+                 point: Dict[str, Any]) -> Iterator[SQLStatement]:
+    """
+    Descarta os statements até o ponto de retomada (inclusive).
+
+    Raises:
+        ValueError: Se o statement no ponto de retomada não tiver o hash
+            registrado no journal
+    """
+    for statement in statements:
+        if statement.offset <= point['offset']:
+            if statement.copy_data is not None:
+                statement.copy_data.close()
+            if (statement.offset == point['offset']
+                    and statement_hash(statement.sql) != point['sha256']):
+                raise ValueError(
+                    f"Statement na linha {statement.line} difere do journal - "
+                    "retomada cancelada")
+            continue
+        yield statement
@@ -3,11 +3,36 @@ Módulo de Execução Controlada de Migração
 Executa scripts SQL gerados com controle completo e validação
 """
 
+import contextvars
 import json
 import os
-from typing import List, Optional, Tuple
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional, Tuple
 
 import psycopg2
+from psycopg2.pool import ThreadedConnectionPool
+
+from app.core.modules.execution_journal import (APPLIED, FAILED, TOLERATED,
+                                                ExecutionJournal, skip_applied)
+from app.core.modules.script_cache import ScriptCache
+from app.core.modules.simulation import SimulationReport
+from app.core.modules.sql_lexer import SQLStatement, iter_file_statements
+from app.core.modules.statement_batcher import (DEFAULT_BATCH_SIZE,
+                                                is_batchable, is_transactional,
+                                                iter_batches, terminated)
+from app.core.modules.statement_profiler import StatementProfiler
+from app.monitoring.metrics import BYTES_COPIED, ERRORS, ROWS_COPIED
+from app.monitoring.traced_connection import TracedConnection
+from app.monitoring.tracing import span
+
+
+def _copy_data_size(data) -> int:
+    """Tamanho (bytes) dos dados de um COPY, sem consumir o arquivo."""
+    data.seek(0, os.SEEK_END)
+    size = data.tell()
+    data.seek(0)
+    return size
 
 
 class ControlledMigrationExecutor:
@@ -34,6 +59,22 @@ class ControlledMigrationExecutor:
             "04_validate_migration.sql"
         ]
 
+        # Scripts somente-leitura: sempre executados, mesmo se já aplicados
+        self.always_run = {"04_validate_migration.sql"}
+
+        # Conexões simultâneas para estágios paralelos (shards por base)
+        self.max_workers = 4
+
+        # "statement": um statement por ida ao servidor
+        # "pipeline": lotes de statements por ida ao servidor
+        # "savepoint": lotes em uma transação, com SAVEPOINT por statement
+        self.execution_mode = "statement"
+        self.batch_size = DEFAULT_BATCH_SIZE
+
+        # Perfil de latência por statement (relatório em reports/)
+        self.profiler: Optional[StatementProfiler] = None
+        self.reports_dir = "reports"
+
     def load_config(self) -> bool:
         """Carrega configuração do servidor de destino."""
         try:
@@ -56,16 +97,22 @@ class ControlledMigrationExecutor:
             print(f"❌ Erro carregando configuração: {e}")
             return False
 
+    def _connection_params(self) -> Dict[str, Any]:
+        """Parâmetros de conexão à base administrativa do destino."""
+        return {
+            'host': self.config['host'],
+            'port': self.config['port'],
+            'database': 'postgres',  # Conectar à base administrativa
+            'user': self.config['user'],
+            'password': self.config['password'],
+            # Spans de conexão e de cada ida ao servidor (--trace)
+            'connection_factory': TracedConnection
+        }
+
     def connect_to_destination(self) -> bool:
         """Conecta ao servidor de destino."""
         try:
-            self.connection = psycopg2.connect(
-                host=self.config['host'],
-                port=self.config['port'],
-                database='postgres',  # Conectar à base administrativa
-                user=self.config['user'],
-                password=self.config['password']
-            )
+            self.connection = psycopg2.connect(**self._connection_params())
 
             self.connection.autocommit = True  # Importante para DDL
 
@@ -84,8 +131,19 @@ class ControlledMigrationExecutor:
             print(f"❌ Erro conectando: {e}")
             return False
 
-    def execute_script(self, script_file: str, dry_run: bool = False) -> bool:
-        """Executa um script SQL específico statement por statement."""
+    def execute_script(self, script_file: str, dry_run: bool = False,
+                       connection=None, resume: bool = False) -> bool:
+        """
+        Executa um script SQL específico statement por statement.
+
+        Args:
+            script_file: Script relativo a scripts_dir
+            dry_run: Se True, apenas simula a execução
+            connection: Conexão a usar (padrão: conexão principal)
+            resume: Se True, continua após o último statement registrado
+                no journal deste script/destino
+        """
+        connection = connection or self.connection
         script_path = os.path.join(self.scripts_dir, script_file)
 
         if not os.path.exists(script_path):
@@ -93,63 +151,69 @@ class ControlledMigrationExecutor:
             return False
 
         try:
-            # Ler script
-            with open(script_path, 'r', encoding='utf-8') as f:
-                script_content = f.read()
-
             print(f"📜 Executando: {script_file}")
 
             if dry_run:
-                char_count = len(script_content)
-                print(f"   🔍 DRY RUN - Script seria executado ({char_count} chars)")
+                # Percorre o script com o lexer: valida literais e comentários
+                statement_count = 0
+                for statement in iter_file_statements(script_path):
+                    statement_count += 1
+                    if statement.copy_data is not None:
+                        statement.copy_data.close()
+                file_size = os.path.getsize(script_path)
+                print(f"   🔍 DRY RUN - Script seria executado "
+                      f"({statement_count} statements, {file_size:,} bytes)")
                 return True
 
-            # Dividir script em statements SQL completos (termina com ;)
-            statements = []
-            current_statement = []
+            # Statements lidos em streaming (scripts grandes não vão para memória)
+            statements = iter_file_statements(script_path)
 
-            for line in script_content.split('\\n'):
-                line = line.strip()
-                if line and not line.startswith('--'):
-                    current_statement.append(line)
-                    if line.endswith(';'):
-                        # Statement completo
-                        statements.append(' '.join(current_statement))
-                        current_statement = []
+            journal = None
+            if self.config:
+                journal = ExecutionJournal(
+                    self.scripts_dir, ScriptCache.destination_key(self.config),
+                    script_file)
+                point = journal.start(resume)
+                if point:
+                    print(f"   ⏩ Retomando após a linha {point['line']} "
+                          f"({point['applied_count']} statements já concluídos)")
+                    statements = skip_applied(statements, point)
 
-            # Se sobrou algo sem ';', adicionar também
-            if current_statement:
-                statements.append(' '.join(current_statement))
+            if self.profiler:
+                self.profiler.set_script(script_file)
 
-            # Executar cada statement completo
             executed_count = 0
-            with self.connection.cursor() as cursor:
-                for statement in statements:
-                    if statement.strip():
+            try:
+                with span(script_file, "script", mode=self.execution_mode), \
+                        connection.cursor() as cursor:
+                    if self.execution_mode == "pipeline":
+                        for batch in iter_batches(statements, self.batch_size):
+                            executed_count += self._execute_batch(
+                                cursor, batch, journal)
+                    elif self.execution_mode == "savepoint":
+                        for batch in iter_batches(statements, self.batch_size):
+                            executed_count += self._execute_savepoint_batch(
+                                cursor, batch, journal)
+                    else:
+                        for statement in statements:
+                            executed_count += self._execute_statement(
+                                cursor, statement, journal)
+
+                    # Para scripts de validação, buscar resultados
+                    if script_file.startswith('04_'):
                         try:
-                            cursor.execute(statement)
-                            executed_count += 1
-                        except Exception as stmt_error:
-                            # Para DDL, alguns erros são OK
-                            error_msg = str(stmt_error).lower()
-                            if "already exists" in error_msg:
-                                print(f"   ⚠️  {stmt_error}")
-                                continue
-                            else:
-                                raise stmt_error
-
-                # Para scripts de validação, buscar resultados
-                if script_file.startswith('04_'):
-                    try:
-                        query = "SELECT 'Validação' AS status, current_timestamp"
-                        cursor.execute(query)
-                        results = cursor.fetchall()
-                        if results:
-                            print("   ✅ Validação:")
-                            for row in results:
-                                print(f"      {row}")
-                    except Exception:
-                        pass
+                            query = "SELECT 'Validação' AS status, current_timestamp"
+                            cursor.execute(query)
+                            results = cursor.fetchall()
+                            if results:
+                                print("   ✅ Validação:")
+                                for row in results:
+                                    print(f"      {row}")
+                        except Exception:
+                            pass
+            finally:
+                if journal:
+                    journal.close()
 
             print(f"   ✅ {executed_count} statements executados com sucesso!")
             return True
@@ -158,6 +222,254 @@ class ControlledMigrationExecutor:
             print(f"   ❌ Erro executando script: {e}")
             return False
 
+    def _profile(self, statements: List[SQLStatement], start: float,
+                 cursor=None, error: Optional[BaseException] = None) -> None:
+        """Registra no profiler uma ida ao servidor iniciada em `start`."""
+        if not self.profiler:
+            return
+        rowcount = getattr(cursor, 'rowcount', None) if cursor else None
+        if rowcount is not None and rowcount < 0:
+            rowcount = None
+        self.profiler.record(statements, time.perf_counter() - start,
+                             rowcount, error)
+
+    def _profile_overhead(self, label: str, start: float,
+                          error: Optional[BaseException] = None) -> None:
+        if self.profiler:
+            self.profiler.record_overhead(label, time.perf_counter() - start, error)
+
+    def _execute_overhead(self, cursor, sql: str) -> None:
+        """Executa controle de transação (BEGIN, COMMIT...) medindo o tempo."""
+        start = time.perf_counter()
+        try:
+            cursor.execute(sql)
+        except Exception as error:
+            self._profile_overhead(sql.split()[0], start, error)
+            raise
+        self._profile_overhead(sql.split()[0], start)
+
+    def _execute_statement(self, cursor, statement: SQLStatement,
+                           journal: Optional[ExecutionJournal] = None) -> int:
+        """
+        Executa um statement isolado.
+
+        Returns:
+            1 se executado, 0 se o erro foi tolerado ("already exists")
+        """
+        start = time.perf_counter()
+        copy_bytes = None
+        try:
+            if statement.copy_data is not None:
+                try:
+                    copy_bytes = _copy_data_size(statement.copy_data)
+                    cursor.copy_expert(statement.sql, statement.copy_data)
+                finally:
+                    statement.copy_data.close()
+            else:
+                cursor.execute(statement.sql)
+        except Exception as stmt_error:
+            self._profile([statement], start, error=stmt_error)
+            # Para DDL, alguns erros são OK
+            error_msg = str(stmt_error).lower()
+            if "already exists" in error_msg:
+                print(f"   ⚠️  linha {statement.line}: {stmt_error}")
+                if journal:
+                    journal.record(statement, TOLERATED)
+                return 0
+            print(f"   ❌ linha {statement.line}: {statement.sql[:200]}")
+            ERRORS.inc(component='executor')
+            if journal:
+                journal.record(statement, FAILED)
+            raise
+
+        if copy_bytes is not None:
+            ROWS_COPIED.inc(max(getattr(cursor, 'rowcount', 0) or 0, 0))
+            BYTES_COPIED.inc(copy_bytes)
+        self._profile([statement], start, cursor)
+        if journal:
+            journal.record(statement, APPLIED)
+        return 1
+
+    def _execute_batch(self, cursor, batch: List[SQLStatement],
+                       journal: Optional[ExecutionJournal] = None) -> int:
+        """
+        Executa um lote de statements em uma única ida ao servidor.
+
+        O servidor executa o lote em uma transação implícita: se algum
+        statement falha, o lote inteiro é desfeito e reexecutado statement
+        a statement, com a mesma tolerância do modo statement. Em uma
+        reexecução em que tudo já existe, isso custa n + 1 idas ao servidor
+        (dividir o lote ao meio sucessivamente custaria até 2n - 1).
+
+        Returns:
+            Quantidade de statements executados
+        """
+        if len(batch) == 1:
+            return self._execute_statement(cursor, batch[0], journal)
+
+        start = time.perf_counter()
+        try:
+            cursor.execute("\n".join(terminated(stmt.sql) for stmt in batch))
+        except Exception as batch_error:
+            self._profile_overhead("LOTE DESFEITO", start, batch_error)
+            if cursor.connection.closed:
+                raise
+        else:
+            self._profile(batch, start, cursor)
+            if journal:
+                journal.record_many(batch, APPLIED)
+            return len(batch)
+
+        return sum(self._execute_statement(cursor, statement, journal)
+                   for statement in batch)
+
+    def _execute_savepoint_batch(self, cursor, batch: List[SQLStatement],
+                                 journal: Optional[ExecutionJournal] = None) -> int:
+        """
+        Executa um lote em uma única transação, com SAVEPOINT por statement.
+
+        Erros tolerados ("already exists") desfazem apenas o próprio
+        savepoint; qualquer outro erro desfaz o lote inteiro. O lote faz um
+        único COMMIT.
+
+        Returns:
+            Quantidade de statements executados
+        """
+        if len(batch) == 1 and not is_batchable(batch[0]):
+            # CREATE DATABASE e afins não rodam dentro de transação
+            return self._execute_statement(cursor, batch[0], journal)
+
+        outcomes = []
+        self._execute_overhead(cursor, "BEGIN")
+        try:
+            for statement in batch:
+                start = time.perf_counter()
+                try:
+                    cursor.execute(f"SAVEPOINT migration_stmt; "
+                                   f"{terminated(statement.sql)} "
+                                   f"RELEASE SAVEPOINT migration_stmt")
+                    self._profile([statement], start, cursor)
+                    outcomes.append((statement, APPLIED))
+                except Exception as stmt_error:
+                    self._profile([statement], start, error=stmt_error)
+                    error_msg = str(stmt_error).lower()
+                    if "already exists" not in error_msg:
+                        print(f"   ❌ linha {statement.line}: {statement.sql[:200]}")
+                        if journal:
+                            journal.record(statement, FAILED)
+                        raise
+                    print(f"   ⚠️  linha {statement.line}: {stmt_error}")
+                    self._execute_overhead(cursor, "ROLLBACK TO SAVEPOINT migration_stmt; "
+                                                   "RELEASE SAVEPOINT migration_stmt")
+                    outcomes.append((statement, TOLERATED))
+
+            self._execute_overhead(cursor, "COMMIT")
+        except Exception:
+            if not cursor.connection.closed:
+                self._execute_overhead(cursor, "ROLLBACK")
+            print(f"   ↩️  Lote de {len(batch)} statements desfeito")
+            raise
+
+        # Registrar só depois do COMMIT: o lote é atômico
+        if journal:
+            for statement, outcome in outcomes:
+                journal.record(statement, outcome)
+
+        return sum(1 for _, outcome in outcomes if outcome == APPLIED)
+
+    def load_execution_plan(self) -> List[Dict[str, Any]]:
+        """
+        Carrega os estágios de execução em ordem de dependência.
+
+        Usa os estágios declarados no manifesto gerado na Fase 2; sem
+        manifesto, cada script de execution_order vira um estágio serial.
+        """
+        stages = ScriptCache(self.scripts_dir).load_stages()
+        if not stages:
+            stages = []
+            previous = []
+            for script in self.execution_order:
+                stages.append({"name": script, "scripts": [script],
+                               "depends_on": previous})
+                previous = [script]
+
+        return self.order_stages(stages)
+
+    @staticmethod
+    def order_stages(stages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Ordena os estágios topologicamente pelo campo depends_on.
+
+        Raises:
+            ValueError: Se houver dependência desconhecida ou ciclo
+        """
+        by_name = {stage['name']: stage for stage in stages}
+        for stage in stages:
+            unknown = set(stage.get('depends_on', [])) - set(by_name)
+            if unknown:
+                raise ValueError(f"Estágio '{stage['name']}' depende de "
+                                 f"estágios inexistentes: {sorted(unknown)}")
+
+        ordered = []
+        done = set()
+        while len(ordered) < len(stages):
+            ready = [stage for stage in stages
+                     if stage['name'] not in done
+                     and set(stage.get('depends_on', [])) <= done]
+            if not ready:
+                pending = [s['name'] for s in stages if s['name'] not in done]
+                raise ValueError(f"Dependência circular entre estágios: {pending}")
+            for stage in ready:
+                ordered.append(stage)
+                done.add(stage['name'])
+
+        return ordered
+
+    def execute_parallel(self, scripts: List[str],
+                         resume: bool = False) -> Dict[str, bool]:
+        """
+        Executa scripts independentes em paralelo, um por conexão do pool.
+
+        Args:
+            scripts: Scripts sem dependência entre si (ex.: shards por base)
+            resume: Se True, retoma cada script a partir do seu journal
+
+        Returns:
+            Resultado de cada script
+        """
+        workers = max(1, min(self.max_workers, len(scripts)))
+        print(f"   ⚡ {len(scripts)} scripts em paralelo ({workers} conexões)")
+
+        pool = ThreadedConnectionPool(1, workers, **self._connection_params())
+
+        def run(script: str) -> bool:
+            conn = pool.getconn()
+            try:
+                conn.autocommit = True  # Importante para DDL
+                return self.execute_script(script, connection=conn,
+                                           resume=resume)
+            finally:
+                pool.putconn(conn)
+
+        results = {}
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                # Cada tarefa herda o span corrente (pai no trace)
+                futures = {executor.submit(contextvars.copy_context().run,
+                                           run, script): script
+                           for script in scripts}
+                for future in as_completed(futures):
+                    script = futures[future]
+                    try:
+                        results[script] = future.result()
+                    except Exception as e:
+                        print(f"   ❌ Erro executando {script}: {e}")
+                        results[script] = False
+        finally:
+            pool.closeall()
+
+        return results
+
     def verify_users_created(self) -> bool:
         """Verifica se usuários foram criados."""
         try:
@@ -268,14 +580,170 @@ class ControlledMigrationExecutor:
             print(f"❌ Erro verificando grants: {e}")
             return False
 
+    def _run_stages(self, plan: List[Dict[str, Any]], dry_run: bool,
+                    interactive: bool, force: bool, resume: bool) -> bool:
+        """
+        Executa os estágios do plano em ordem.
+
+        Returns:
+            False se o usuário interromper após uma falha
+        """
+        cache = ScriptCache(self.scripts_dir)
+        destination = ScriptCache.destination_key(self.config)
+
+        for i, stage in enumerate(plan, 1):
+            print(f"\n{'='*20} FASE {i}/{len(plan)}: {stage['name']} {'='*20}")
+
+            pending = []
+            for script in stage['scripts']:
+                if (not force and script not in self.always_run
+                        and cache.is_applied(destination, script)):
+                    print(f"⏭️ {script} já aplicado em {destination} "
+                          "(hash inalterado) - pulando")
+                    continue
+                pending.append(script)
+
+            if interactive and pending:
+                label = pending[0] if len(pending) == 1 else \
+                    f"estágio {stage['name']} ({len(pending)} scripts)"
+                response = input(f"Executar {label}? (s/N): ")
+                if response.lower() not in ['s', 'sim', 'y', 'yes']:
+                    print("⏭️ Script pulado")
+                    continue
+
+            with span(stage['name'], "stage", scripts=len(pending)):
+                if stage.get('parallel') and len(pending) > 1 and not dry_run:
+                    results = self.execute_parallel(pending, resume=resume)
+                else:
+                    results = {script: self.execute_script(script, dry_run,
+                                                           resume=resume)
+                               for script in pending}
+
+            failed = []
+            for script in pending:
+                success = results.get(script, False)
+                if success and not dry_run and script not in self.always_run:
+                    cache.mark_applied(destination, script)
+                if not success:
+                    failed.append(script)
+
+            if failed:
+                print(f"❌ Falha na execução de: {', '.join(failed)}")
+                if not dry_run:
+                    response = input("Continuar mesmo assim? (s/N): ")
+                    if response.lower() not in ['s', 'sim', 'y', 'yes']:
+                        return False
+
+        return True
+
+    def _template_size(self) -> Optional[int]:
+        """Tamanho do template0 no destino (base do custo de CREATE DATABASE)."""
+        try:
+            with self.connection.cursor() as cursor:
+                cursor.execute("SELECT pg_database_size('template0')")
+                return cursor.fetchone()[0]
+        except Exception:
+            return None
+
+    def simulate_plan(self, plan: List[Dict[str, Any]]) -> bool:
+        """
+        Executa o plano no destino dentro de uma única transação e a desfaz.
+
+        Tudo que pode rodar em transação (roles, grants, ALTERs) é executado
+        de verdade, com SAVEPOINT por statement para que erros não abortem a
+        simulação. Statements não transacionais (CREATE DATABASE...) não são
+        executados: entram no relatório com custo estimado. Locks adquiridos
+        ficam retidos até o ROLLBACK final.
+
+        Returns:
+            True se não houver erros além dos tolerados/esperados
+        """
+        self.profiler = StatementProfiler()
+        try:
+            rtt = self.profiler.calibrate(self.connection)
+        except Exception as e:
+            print(f"⚠️ Não foi possível medir o RTT: {e}")
+            rtt = 0.0
+
+        report = SimulationReport(rtt=rtt, batch_size=self.batch_size)
+        template_size = self._template_size()
+
+        with self.connection.cursor() as cursor:
+            self._execute_overhead(cursor, "BEGIN")
+            try:
+                for i, stage in enumerate(plan, 1):
+                    print(f"\n{'='*20} SIMULAÇÃO {i}/{len(plan)}: "
+                          f"{stage['name']} {'='*20}")
+                    for script in stage['scripts']:
+                        self._simulate_script(cursor, script, report,
+                                              template_size)
+            finally:
+                self._execute_overhead(cursor, "ROLLBACK")
+                print("↩️  Simulação desfeita (ROLLBACK)")
+
+        report.write(self.profiler.summary(), self.reports_dir)
+        return not report.errors
+
+    def _simulate_script(self, cursor, script_file: str,
+                         report: SimulationReport,
+                         template_size: Optional[int]) -> None:
+        """Simula um script dentro da transação aberta por simulate_plan."""
+        print(f"🧪 Simulando: {script_file}")
+        self.profiler.set_script(script_file)
+        script_path = os.path.join(self.scripts_dir, script_file)
+
+        for statement in iter_file_statements(script_path):
+            if not is_transactional(statement):
+                report.add_non_transactional(script_file, statement, template_size)
+                continue
+
+            start = time.perf_counter()
+            try:
+                if statement.copy_data is not None:
+                    try:
+                        cursor.execute("SAVEPOINT migration_sim")
+                        cursor.copy_expert(statement.sql, statement.copy_data)
+                        cursor.execute("RELEASE SAVEPOINT migration_sim")
+                    finally:
+                        statement.copy_data.close()
+                else:
+                    cursor.execute(f"SAVEPOINT migration_sim; "
+                                   f"{terminated(statement.sql)} "
+                                   f"RELEASE SAVEPOINT migration_sim")
+            except Exception as stmt_error:
+                if cursor.connection.closed:
+                    raise
+                self._profile([statement], start, error=stmt_error)
+                report.add_error(script_file, statement, stmt_error)
+                cursor.execute("ROLLBACK TO SAVEPOINT migration_sim; "
+                               "RELEASE SAVEPOINT migration_sim")
+                continue
+
+            self._profile([statement], start, cursor)
+            report.add_simulated()
+
     def run_migration(self, dry_run: bool = False,
-                     interactive: bool = False) -> bool:
-        """Executa migração completa."""
+                     interactive: bool = False, force: bool = False,
+                     resume: bool = False, simulate: bool = False) -> bool:
+        """
+        Executa migração completa.
+
+        Args:
+            dry_run: Se True, simula execução sem alterar dados
+            interactive: Se True, pede confirmação para cada script
+            force: Se True, reexecuta scripts já aplicados neste destino
+            resume: Se True, scripts interrompidos continuam a partir do
+                primeiro statement não aplicado (journal de execução)
+            simulate: Se True, executa no destino dentro de uma transação
+                desfeita ao final (ver simulate_plan)
+        """
         print("🚀 INICIANDO MIGRAÇÃO CONTROLADA")
         print("=" * 60)
 
         if dry_run:
             print("🔍 MODO DRY RUN - Nenhuma alteração será feita")
+        elif simulate:
+            print("🧪 MODO SIMULAÇÃO - Execução real desfeita com ROLLBACK")
 
         # Carregar config e conectar
         if not self.load_config():
@@ -284,9 +752,16 @@ class ControlledMigrationExecutor:
         if not self.connect_to_destination():
             return False
 
+        try:
+            plan = self.load_execution_plan()
+        except ValueError as e:
+            print(f"❌ Plano de execução inválido: {e}")
+            return False
+
         # Verificar scripts
+        all_scripts = [script for stage in plan for script in stage['scripts']]
         missing_scripts = []
-        for script in self.execution_order:
+        for script in all_scripts:
             script_path = os.path.join(self.scripts_dir, script)
             if not os.path.exists(script_path):
                 missing_scripts.append(script)
@@ -295,27 +770,27 @@ class ControlledMigrationExecutor:
             print(f"❌ Scripts faltando: {missing_scripts}")
             return False
 
-        script_count = len(self.execution_order)
+        script_count = len(all_scripts)
         print(f"✅ Todos os {script_count} scripts encontrados")
 
-        # Executar scripts
-        for i, script in enumerate(self.execution_order, 1):
-            print(f"\n{'='*20} FASE {i}/{script_count} {'='*20}")
-
-            if interactive:
-                response = input(f"Executar {script}? (s/N): ")
-                if response.lower() not in ['s', 'sim', 'y', 'yes']:
-                    print("⏭️ Script pulado")
-                    continue
+        if simulate and not dry_run:
+            return self.simulate_plan(plan)
 
-            success = self.execute_script(script, dry_run)
+        # Perfil de latência por statement (só em execução real)
+        if not dry_run:
+            self.profiler = StatementProfiler()
+            try:
+                self.profiler.calibrate(self.connection)
+            except Exception as e:
+                print(f"⚠️ Não foi possível medir o RTT: {e}")
 
-            if not success:
-                print(f"❌ Falha na execução do script {script}")
-                if not dry_run:
-                    response = input("Continuar mesmo assim? (s/N): ")
-                    if response.lower() not in ['s', 'sim', 'y', 'yes']:
-                        return False
+        # Executar estágios
+        try:
+            if not self._run_stages(plan, dry_run, interactive, force, resume):
+                return False
+        finally:
+            if self.profiler and self.profiler.round_trips:
+                self.profiler.write_report(self.reports_dir)
 
         # Verificações finais (só se não for dry run)
         if not dry_run:
@@ -359,15 +834,36 @@ if __name__ == "__main__":
     config_default = 'secrets/postgresql_destination_config.json'
     parser.add_argument('--config', default=config_default,
                        help='Arquivo de configuração do destino')
+    parser.add_argument('--force', action='store_true',
+                       help='Reexecutar scripts já aplicados neste destino')
+    parser.add_argument('--workers', type=int, default=4,
+                       help='Conexões simultâneas para estágios paralelos')
+    parser.add_argument('--mode', choices=['statement', 'pipeline', 'savepoint'],
+                       default='statement',
+                       help='Um statement por ida ao servidor, lotes (pipeline) '
+                            'ou lotes transacionais com savepoints')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                       help='Statements por lote nos modos pipeline e savepoint')
+    parser.add_argument('--resume', action='store_true',
+                       help='Retomar scripts interrompidos pelo journal de execução')
+    parser.add_argument('--simulate', action='store_true',
+                       help='Executar no destino e desfazer com ROLLBACK '
+                            '(previsão de duração e erros)')
 
     args = parser.parse_args()
 
     executor = ControlledMigrationExecutor(args.config)
+    executor.max_workers = args.workers
+    executor.execution_mode = args.mode
+    executor.batch_size = args.batch_size
 
     try:
         success = executor.run_migration(
             dry_run=args.dry_run,
-            interactive=args.interactive
+            interactive=args.interactive,
+            force=args.force,
+            resume=args.resume,
+            simulate=args.simulate
         )
 
         if success:
@@ -0,0 +1,155 @@
+"""
+Módulo de Cache de Scripts SQL
+Cache endereçado por conteúdo para os scripts gerados na Fase 2 e registro
+dos scripts já aplicados em cada destino na Fase 3
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+
+class ScriptCache:
+    """Manifesto de hashes dos scripts gerados e aplicados."""
+
+    MANIFEST_FILE = "manifest.json"
+    APPLIED_FILE = "applied_scripts.json"
+
+    def __init__(self, output_dir: str):
+        """
+        Inicializa o cache de scripts.
+
+        Args:
+            output_dir: Diretório onde ficam os scripts gerados
+        """
+        self.output_dir = output_dir
+        self.manifest_path = os.path.join(output_dir, self.MANIFEST_FILE)
+        self.applied_path = os.path.join(output_dir, self.APPLIED_FILE)
+
+    @staticmethod
+    def hash_file(path: str) -> str:
+        """Calcula SHA-256 de um arquivo em blocos (memória constante)."""
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    @staticmethod
+    def compute_input_hash(json_file: str, generator_version: str,
+                           generator_config: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Calcula o hash da entrada da geração.
+
+        Combina o conteúdo do JSON extraído, a versão do gerador e a
+        configuração de geração: se nenhum dos três mudar, os scripts
+        gerados seriam idênticos (exceto pelo carimbo de data).
+        """
+        digest = hashlib.sha256()
+        digest.update(ScriptCache.hash_file(json_file).encode())
+        digest.update(generator_version.encode())
+        config_blob = json.dumps(generator_config or {}, sort_keys=True, default=str)
+        digest.update(config_blob.encode())
+        return digest.hexdigest()
+
+    def _read_json(self, path: str) -> Dict[str, Any]:
+        if not os.path.exists(path):
+            return {}
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_json(self, path: str, data: Dict[str, Any]) -> None:
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def load_manifest(self) -> Dict[str, Any]:
+        """Carrega o manifesto atual (vazio se não existir)."""
+        return self._read_json(self.manifest_path)
+
+    def cached_scripts(self, input_hash: str) -> List[str]:
+        """
+        Retorna os scripts em cache se ainda forem válidos para a entrada.
+
+        Returns:
+            Lista de caminhos dos scripts, ou lista vazia se for necessário
+            regenerar (hash de entrada diferente, arquivo ausente ou alterado)
+        """
+        manifest = self.load_manifest()
+        if not manifest or manifest.get('input_hash') != input_hash:
+            return []
+
+        scripts = []
+        for name, expected_hash in manifest.get('files', {}).items():
+            path = os.path.join(self.output_dir, name)
+            if not os.path.exists(path) or self.hash_file(path) != expected_hash:
+                return []
+            scripts.append(path)
+
+        return scripts
+
+    def write_manifest(self, input_hash: str, scripts: List[str],
+                       generator_version: str,
+                       stages: Optional[List[Dict[str, Any]]] = None) -> None:
+        """
+        Grava o manifesto com o hash de cada script gerado.
+
+        Args:
+            input_hash: Hash da entrada da geração
+            scripts: Caminhos dos scripts gerados
+            generator_version: Versão do gerador
+            stages: Estágios de execução com dependências (depends_on)
+        """
+        files = {}
+        for script in scripts:
+            name = os.path.relpath(script, self.output_dir)
+            files[name] = self.hash_file(script)
+
+        manifest = {
+            'input_hash': input_hash,
+            'generator_version': generator_version,
+            'generated_at': datetime.now().isoformat(),
+            'files': files
+        }
+        if stages:
+            manifest['stages'] = stages
+
+        self._write_json(self.manifest_path, manifest)
+
+    def load_stages(self) -> List[Dict[str, Any]]:
+        """Retorna os estágios de execução do manifesto (vazio se ausentes)."""
+        return self.load_manifest().get('stages', [])
+
+    @staticmethod
+    def destination_key(config: Dict[str, Any]) -> str:
+        """Identifica o destino por host:porta."""
+        return f"{config['host']}:{config['port']}"
+
+    def is_applied(self, destination: str, script_name: str) -> bool:
+        """Verifica se o script, com o conteúdo atual, já foi aplicado no destino."""
+        applied = self._read_json(self.applied_path)
+        recorded = applied.get(destination, {}).get(script_name)
+        if not recorded:
+            return False
+
+        path = os.path.join(self.output_dir, script_name)
+        if not os.path.exists(path):
+            return False
+
+        return recorded.get('hash') == self.hash_file(path)
+
+    def mark_applied(self, destination: str, script_name: str) -> None:
+        """Registra que o script foi aplicado com sucesso no destino."""
+        path = os.path.join(self.output_dir, script_name)
+        applied = self._read_json(self.applied_path)
+        applied.setdefault(destination, {})[script_name] = {
+            'hash': self.hash_file(path),
+            'applied_at': datetime.now().isoformat()
+        }
+        self._write_json(self.applied_path, applied)
@@ -5,25 +5,32 @@ Gera scripts SQL a partir dos dados extraídos do JSON
 
 import json
 import os
+import re
 from datetime import datetime
 from pathlib import Path
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.modules.script_cache import ScriptCache
 
 
 class SQLScriptGenerator:
     """Gerador de scripts SQL a partir de dados extraídos."""
 
-    def __init__(self, json_file: str):
+    def __init__(self, json_file: str,
+                 generation_config: Optional[Dict[str, Any]] = None):
         """
         Inicializa o gerador de scripts.
 
         Args:
             json_file: Caminho para arquivo JSON com dados extraídos
+            generation_config: Configuração de geração (entra no hash do cache)
         """
         self.json_file = json_file
+        self.generation_config = generation_config or {}
         self.data = None
         self.output_dir = "generated_scripts"
-        self.version = "4.0.0"
+        self.grant_shards_dir = "03_grants"
+        self.version = "4.1.0"
 
     def load_extracted_data(self) -> bool:
         """Carrega dados extraídos do JSON."""
@@ -117,7 +124,7 @@ class SQLScriptGenerator:
         # Salvar script
         script_file = f"{self.output_dir}/01_create_users.sql"
         with open(script_file, 'w', encoding='utf-8') as f:
-            f.write('\\n'.join(script_lines))
+            f.write('\n'.join(script_lines))
 
         print(f"   ✅ Script salvo: {script_file}")
         return script_file
@@ -174,11 +181,44 @@ class SQLScriptGenerator:
         # Salvar script
         script_file = f"{self.output_dir}/02_create_databases.sql"
         with open(script_file, 'w', encoding='utf-8') as f:
-            f.write('\\n'.join(script_lines))
+            f.write('\n'.join(script_lines))
 
         print(f"   ✅ Script salvo: {script_file}")
         return script_file
 
+    def _user_database_grants(self) -> List[Tuple[str, List[Dict[str, Any]]]]:
+        """Retorna (base, grants) apenas das bases de usuário."""
+        system_dbs = {db['datname'] for db in self.data['databases']
+                      if db['is_system']}
+        return [(db_name, db_grants)
+                for db_name, db_grants in self.data['grants'].items()
+                if db_name not in system_dbs]
+
+    def _database_grant_lines(self, db_name: str,
+                              db_grants: List[Dict[str, Any]]) -> List[str]:
+        """Gera os comandos GRANT de uma base."""
+        grant_lines = []
+
+        for grant in db_grants:
+            grantee = grant['grantee']
+
+            # Pular usuários do sistema e root
+            if grantee in ['postgres', 'migration_user', 'root']:
+                continue
+
+            # Limpar aspas duplas já existentes no grantee
+            clean_grantee = grantee.strip('"')
+
+            for privilege in grant['privileges']:
+                if clean_grantee == 'public':
+                    grant_lines.append(f"GRANT {privilege} ON DATABASE "
+                                       f"\"{db_name}\" TO public;")
+                else:
+                    grant_lines.append(f"GRANT {privilege} ON DATABASE "
+                                       f"\"{db_name}\" TO \"{clean_grantee}\";")
+
+        return grant_lines
+
     def generate_grants_script(self) -> str:
         """Gera script de aplicação de grants."""
         print("🔐 Gerando script de grants...")
@@ -200,12 +240,9 @@ class SQLScriptGenerator:
 
         grants_count = 0
 
-        for db_name, db_grants in self.data['grants'].items():
-            # Pular bases do sistema
-            db_info = next((db for db in self.data['databases']
-                          if db['datname'] == db_name), None)
-            if db_info and db_info['is_system']:
-                continue
+        for db_name, db_grants in self._user_database_grants():
+            grant_lines = self._database_grant_lines(db_name, db_grants)
+            grants_count += len(grant_lines)
 
             script_lines.extend([
                 "-- =====================================================",
@@ -213,31 +250,7 @@ class SQLScriptGenerator:
                 "-- =====================================================",
                 ""
             ])
-
-            # Aplicar grants específicos
-            for grant in db_grants:
-                grantee = grant['grantee']
-                privileges = grant['privileges']
-
-                # Pular usuários do sistema e root
-                if grantee in ['postgres', 'migration_user', 'root']:
-                    continue
-
-                # Limpar aspas duplas já existentes no grantee
-                clean_grantee = grantee.strip('"')
-
-                # Gerar comando GRANT
-                for privilege in privileges:
-                    if clean_grantee == 'public':
-                        grant_cmd = (f"GRANT {privilege} ON DATABASE "
-                                   f"\"{db_name}\" TO public;")
-                    else:
-                        grant_cmd = (f"GRANT {privilege} ON DATABASE "
-                                   f"\"{db_name}\" TO \"{clean_grantee}\";")
-
-                    script_lines.append(grant_cmd)
-                    grants_count += 1
-
+            script_lines.extend(grant_lines)
             script_lines.append("")
 
         script_lines.extend([
@@ -249,11 +262,80 @@ class SQLScriptGenerator:
         # Salvar script
         script_file = f"{self.output_dir}/03_apply_grants.sql"
         with open(script_file, 'w', encoding='utf-8') as f:
-            f.write('\\n'.join(script_lines))
+            f.write('\n'.join(script_lines))
 
         print(f"   ✅ Script salvo: {script_file}")
         return script_file
 
+    def generate_grant_shards(self) -> List[str]:
+        """
+        Gera um script de grants por base de dados.
+
+        Os shards são independentes entre si (cada um só toca a própria
+        base) e podem ser executados em paralelo pelo executor. O script
+        monolítico 03_apply_grants.sql continua sendo gerado para o psql.
+
+        Returns:
+            Lista de caminhos dos shards gerados
+        """
+        print("🧩 Gerando shards de grants por base...")
+
+        shard_dir = os.path.join(self.output_dir, self.grant_shards_dir)
+        Path(shard_dir).mkdir(exist_ok=True)
+
+        # Remover shards de gerações anteriores (bases que deixaram de existir)
+        for old_shard in Path(shard_dir).glob("*.sql"):
+            old_shard.unlink()
+
+        shard_files = []
+        for index, (db_name, db_grants) in enumerate(
+                self._user_database_grants(), 1):
+            grant_lines = self._database_grant_lines(db_name, db_grants)
+            if not grant_lines:
+                continue
+
+            script_lines = [
+                "-- =====================================================",
+                f"-- GRANTS PARA BASE: {db_name}",
+                f"-- Gerado em: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+                f"-- Total: {len(grant_lines)} grants",
+                f"-- Gerador: SQLScriptGenerator v{self.version}",
+                "-- =====================================================",
+                ""
+            ]
+            script_lines.extend(grant_lines)
+
+            safe_name = re.sub(r'[^A-Za-z0-9_.-]', '_', db_name)
+            shard_file = os.path.join(shard_dir, f"{index:04d}_{safe_name}.sql")
+            with open(shard_file, 'w', encoding='utf-8') as f:
+                f.write('\n'.join(script_lines))
+
+            shard_files.append(shard_file)
+
+        print(f"   ✅ {len(shard_files)} shards salvos em: {shard_dir}/")
+        return shard_files
+
+    def build_execution_plan(self, grant_shards: List[str]) -> List[Dict[str, Any]]:
+        """
+        Monta os estágios de execução com suas dependências.
+
+        Ordem: usuários → bases → grants (shards paralelos) → validação.
+        """
+        shard_names = [os.path.relpath(shard, self.output_dir)
+                       for shard in grant_shards]
+
+        return [
+            {"name": "users", "scripts": ["01_create_users.sql"],
+             "depends_on": []},
+            {"name": "databases", "scripts": ["02_create_databases.sql"],
+             "depends_on": ["users"]},
+            {"name": "grants", "scripts": shard_names,
+             "depends_on": ["databases"], "parallel": True,
+             "replaces": "03_apply_grants.sql"},
+            {"name": "validation", "scripts": ["04_validate_migration.sql"],
+             "depends_on": ["grants"]}
+        ]
+
     def generate_validation_script(self) -> str:
         """Gera script de validação pós-migração."""
         print("🔍 Gerando script de validação...")
@@ -308,7 +390,7 @@ class SQLScriptGenerator:
         # Salvar script
         script_file = f"{self.output_dir}/04_validate_migration.sql"
         with open(script_file, 'w', encoding='utf-8') as f:
-            f.write('\\n'.join(script_lines))
+            f.write('\n'.join(script_lines))
 
         print(f"   ✅ Script de validação salvo: {script_file}")
         return script_file
@@ -348,16 +430,39 @@ class SQLScriptGenerator:
         # Salvar script
         script_file = f"{self.output_dir}/00_master_migration.sql"
         with open(script_file, 'w', encoding='utf-8') as f:
-            f.write('\\n'.join(script_lines))
+            f.write('\n'.join(script_lines))
 
         print(f"   ✅ Script master salvo: {script_file}")
         return script_file
 
-    def run_generation(self) -> List[str]:
-        """Executa geração completa de scripts."""
+    def run_generation(self, force: bool = False) -> List[str]:
+        """
+        Executa geração completa de scripts.
+
+        Args:
+            force: Se True, ignora o cache e regenera todos os scripts
+
+        Returns:
+            Lista de scripts gerados (ou reaproveitados do cache)
+        """
         print("🚀 INICIANDO GERAÇÃO DE SCRIPTS SQL")
         print("=" * 50)
 
+        cache = ScriptCache(self.output_dir)
+        input_hash = None
+        try:
+            input_hash = ScriptCache.compute_input_hash(
+                self.json_file, self.version, self.generation_config)
+        except OSError as e:
+            print(f"⚠️ Não foi possível calcular hash da entrada: {e}")
+
+        if input_hash and not force:
+            cached = cache.cached_scripts(input_hash)
+            if cached:
+                print(f"♻️ Entrada inalterada (hash {input_hash[:12]}) - "
+                      f"reutilizando {len(cached)} scripts em {self.output_dir}/")
+                return cached
+
         if not self.load_extracted_data():
             return []
 
@@ -370,6 +475,7 @@ class SQLScriptGenerator:
         scripts_generated.append(self.generate_databases_script())
         scripts_generated.append(self.generate_grants_script())
         scripts_generated.append(self.generate_validation_script())
+        grant_shards = self.generate_grant_shards()
 
         print(f"\n✅ GERAÇÃO CONCLUÍDA!")
         print(f"📁 {len(scripts_generated)} scripts gerados em {self.output_dir}/")
@@ -378,6 +484,14 @@ class SQLScriptGenerator:
         for script in scripts_generated:
             file_size = os.path.getsize(script)
             print(f"   📄 {os.path.basename(script)} ({file_size:,} bytes)")
+        print(f"   🧩 {len(grant_shards)} shards em {self.grant_shards_dir}/")
+
+        scripts_generated.extend(grant_shards)
+
+        if input_hash:
+            cache.write_manifest(input_hash, scripts_generated, self.version,
+                                 stages=self.build_execution_plan(grant_shards))
+            print(f"🧾 Manifesto atualizado: {cache.manifest_path}")
 
         return scripts_generated
 
@@ -386,12 +500,12 @@ if __name__ == "__main__":
     import sys
 
     if len(sys.argv) < 2:
-        print("Uso: python script_generator.py <json_file>")
+        print("Uso: python script_generator.py <json_file> [--force]")
         sys.exit(1)
 
     json_file = sys.argv[1]
     generator = SQLScriptGenerator(json_file)
-    scripts = generator.run_generation()
+    scripts = generator.run_generation(force='--force' in sys.argv[2:])
 
     if scripts:
         print(f"\n🎯 PRÓXIMO PASSO: Executar scripts em {generator.output_dir}/")
@@ -0,0 +1,163 @@
+"""
+Módulo de Simulação da Fase 3
+Consolida o resultado de uma execução real no destino desfeita com ROLLBACK:
+tempos medidos, erros encontrados e custo estimado dos statements que não
+podem rodar dentro de transação (CREATE DATABASE e afins)
+"""
+
+import json
+import math
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from app.core.modules.sql_lexer import SQLStatement
+from app.core.modules.statement_profiler import error_class, statement_type
+
+# CREATE DATABASE: custo fixo (checkpoint, catálogo) + cópia do template
+CREATE_DATABASE_BASE_SECONDS = 0.5
+TEMPLATE_COPY_MB_PER_SECOND = 200.0
+
+# Demais statements não transacionais sem estimativa própria
+OTHER_NON_TRANSACTIONAL_SECONDS = 0.1
+
+# SQLSTATE de base inexistente: consequência de CREATE DATABASE não simulado
+_INVALID_CATALOG_NAME = "3D000"
+
+
+def estimate_non_transactional_seconds(statement: SQLStatement, rtt: float,
+                                       template_size_bytes: Optional[int]) -> float:
+    """
+    Estima o custo de um statement que a simulação não executa.
+
+    Args:
+        statement: Statement não transacional
+        rtt: Latência de ida e volta medida (segundos)
+        template_size_bytes: Tamanho do template0 no destino (se conhecido)
+    """
+    if statement_type(statement.sql) == "CREATE DATABASE":
+        template_mb = (template_size_bytes or 8 * 1024 * 1024) / (1024 * 1024)
+        return (rtt + CREATE_DATABASE_BASE_SECONDS
+                + template_mb / TEMPLATE_COPY_MB_PER_SECOND)
+    return rtt + OTHER_NON_TRANSACTIONAL_SECONDS
+
+
+class SimulationReport:
+    """Resultado da simulação transacional da Fase 3."""
+
+    def __init__(self, rtt: float = 0.0, batch_size: int = 500):
+        """
+        Inicializa o relatório.
+
+        Args:
+            rtt: Latência de ida e volta medida (segundos)
+            batch_size: Tamanho de lote usado na previsão do modo pipeline
+        """
+        self.rtt = rtt
+        self.batch_size = batch_size
+        self.simulated = 0
+        self.tolerated: List[Dict[str, Any]] = []
+        self.blocked: List[Dict[str, Any]] = []
+        self.errors: List[Dict[str, Any]] = []
+        self.non_transactional: List[Dict[str, Any]] = []
+
+    @staticmethod
+    def _entry(script: str, statement: SQLStatement) -> Dict[str, Any]:
+        return {
+            'script': script,
+            'line': statement.line,
+            'type': statement_type(statement.sql),
+            'sql': statement.sql[:200]
+        }
+
+    def add_simulated(self) -> None:
+        self.simulated += 1
+
+    def add_error(self, script: str, statement: SQLStatement,
+                  error: BaseException) -> None:
+        """
+        Classifica um erro da simulação.
+
+        "already exists" é tolerado como na execução real; base inexistente
+        após CREATE DATABASE pulado é esperado (bloqueado); o resto é erro.
+        """
+        entry = dict(self._entry(script, statement),
+                     error=error_class(error),
+                     message=str(error).strip().splitlines()[0] if str(error) else "")
+
+        if "already exists" in str(error).lower():
+            self.tolerated.append(entry)
+        elif (getattr(error, 'pgcode', None) == _INVALID_CATALOG_NAME
+              and self.non_transactional):
+            self.blocked.append(entry)
+        else:
+            self.errors.append(entry)
+
+    def add_non_transactional(self, script: str, statement: SQLStatement,
+                              template_size_bytes: Optional[int]) -> None:
+        """Registra statement não simulado com seu custo estimado."""
+        estimate = estimate_non_transactional_seconds(
+            statement, self.rtt, template_size_bytes)
+        self.non_transactional.append(
+            dict(self._entry(script, statement),
+                 estimated_seconds=round(estimate, 3)))
+
+    def summary(self, profile: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Consolida a simulação com o perfil de latência medido.
+
+        Args:
+            profile: Resultado de StatementProfiler.summary()
+        """
+        estimated = sum(item['estimated_seconds']
+                        for item in self.non_transactional)
+        measured = profile.get('total_seconds', 0.0)
+        server = profile.get('server_seconds', 0.0)
+        batches = math.ceil(self.simulated / self.batch_size) if self.batch_size else 0
+
+        return {
+            'simulated_statements': self.simulated,
+            'measured_seconds': measured,
+            'non_transactional_estimated_seconds': round(estimated, 3),
+            'forecast_seconds': round(measured + estimated, 3),
+            'forecast_pipeline_seconds': round(
+                server + batches * self.rtt + estimated, 3),
+            'tolerated': self.tolerated,
+            'blocked_by_non_transactional': self.blocked,
+            'errors': self.errors,
+            'non_transactional': self.non_transactional,
+            'profile': profile
+        }
+
+    def write(self, profile: Dict[str, Any], reports_dir: str = "reports") -> str:
+        """
+        Grava o relatório da simulação em reports/ e imprime o resumo.
+
+        Returns:
+            Caminho do relatório gerado
+        """
+        summary = self.summary(profile)
+        report_dir = Path(reports_dir)
+        report_dir.mkdir(parents=True, exist_ok=True)
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        report_file = report_dir / f"simulation_{timestamp}.json"
+
+        with open(report_file, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2, ensure_ascii=False)
+
+        print("\n🧪 RESULTADO DA SIMULAÇÃO (tudo desfeito com ROLLBACK)")
+        print(f"   ✅ {summary['simulated_statements']} statements simulados "
+              f"em {summary['measured_seconds']:.2f}s")
+        print(f"   🏗️ {len(self.non_transactional)} statements não transacionais "
+              f"(estimativa: {summary['non_transactional_estimated_seconds']:.2f}s)")
+        print(f"   ⚠️  {len(self.tolerated)} já existentes | "
+              f"🔒 {len(self.blocked)} dependem de bases não criadas | "
+              f"❌ {len(self.errors)} erros")
+        for entry in self.errors[:10]:
+            print(f"      ❌ {entry['script']}:{entry['line']} "
+                  f"{entry['error']}: {entry['message']}")
+        print(f"   ⏱️ Previsão: {summary['forecast_seconds']:.2f}s "
+              f"(pipeline: {summary['forecast_pipeline_seconds']:.2f}s)")
+        print(f"   📄 Relatório: {report_file}")
+
+        return str(report_file)
@@ -0,0 +1,341 @@
+"""
+Módulo de Análise Léxica de Scripts SQL
+Divide scripts SQL em statements a partir de um stream, com memória limitada
+"""
+
+import re
+import tempfile
+from typing import IO, Iterator, List, NamedTuple, Optional
+
+# Tamanho do bloco lido do arquivo a cada iteração
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+# Dados de COPY ... FROM stdin acima deste tamanho vão para disco
+COPY_SPOOL_SIZE = 16 * 1024 * 1024
+
+# NAMEDATALEN do PostgreSQL: tags de dollar quote cabem nisso
+_MAX_DOLLAR_TAG = 66
+
+_NORMAL_STOP = re.compile(r"[-/'\"$;\\]")
+_ESCAPE_STRING_STOP = re.compile(r"['\\]")
+_BLOCK_COMMENT = re.compile(r"/\*|\*/")
+_IDENT_CHAR = re.compile(r"[A-Za-z0-9_$\u0080-\uffff]")
+_DOLLAR_TAG = re.compile(
+    r"\$(?:[A-Za-z_\u0080-\uffff][A-Za-z0-9_\u0080-\uffff]*)?\$")
+_COPY_FROM_STDIN = re.compile(r"^COPY\b.*\bFROM\s+STDIN\b", re.I | re.S)
+
+
+class SQLLexerError(ValueError):
+    """Script SQL malformado (string, identificador ou comentário aberto)."""
+
+
+class SQLStatement(NamedTuple):
+    """Statement SQL completo extraído do script."""
+    sql: str
+    line: int
+    offset: int
+    copy_data: Optional[IO[str]] = None
+
+
+class SQLLexer:
+    """
+    Lexer incremental de scripts SQL do PostgreSQL.
+
+    Reconhece comentários (-- e /* */ aninhados), strings ('...' e E'...'),
+    identificadores entre aspas duplas e dollar quotes ($$ e $tag$), de modo
+    que ';' dentro de funções e blocos DO não encerra o statement.
+    Meta-comandos do psql (linhas iniciadas por \\) são ignorados e os dados
+    de COPY ... FROM stdin são anexados ao statement em arquivo temporário.
+
+    Apenas o bloco corrente e o statement em construção ficam em memória.
+    """
+
+    def __init__(self, stream: IO[str], chunk_size: int = DEFAULT_CHUNK_SIZE):
+        """
+        Inicializa o lexer.
+
+        Args:
+            stream: Arquivo (modo texto) com o script SQL
+            chunk_size: Quantidade de caracteres lida por vez
+        """
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self._buf = ""
+        self._pos = 0
+        self._consumed = 0
+        self._eof = False
+        self._line = 1
+        self._has_content = False
+        self._start = (0, 1)
+
+    def __iter__(self) -> Iterator[SQLStatement]:
+        while True:
+            statement = self._next_statement()
+            if statement is None:
+                return
+            yield statement
+
+    # ------------------------------------------------------------------
+    # Buffer
+    # ------------------------------------------------------------------
+
+    def _fill(self, need: int) -> bool:
+        """Garante `need` caracteres disponíveis a partir da posição atual."""
+        while len(self._buf) - self._pos < need and not self._eof:
+            chunk = self.stream.read(self.chunk_size)
+            if not chunk:
+                self._eof = True
+                break
+            self._consumed += self._pos
+            self._buf = self._buf[self._pos:] + chunk
+            self._pos = 0
+        return len(self._buf) - self._pos >= need
+
+    def _fill_more(self) -> bool:
+        """Lê mais dados além do que já está no buffer."""
+        return self._fill(len(self._buf) - self._pos + 1)
+
+    def _advance(self, count: int) -> str:
+        text = self._buf[self._pos:self._pos + count]
+        self._pos += len(text)
+        self._line += text.count("\n")
+        return text
+
+    def _offset(self) -> int:
+        return self._consumed + self._pos
+
+    def _start_statement(self) -> None:
+        if not self._has_content:
+            self._has_content = True
+            self._start = (self._offset(), self._line)
+
+    # ------------------------------------------------------------------
+    # Statements
+    # ------------------------------------------------------------------
+
+    def _next_statement(self) -> Optional[SQLStatement]:
+        parts: List[str] = []
+        self._has_content = False
+
+        while self._fill(1):
+            match = _NORMAL_STOP.search(self._buf, self._pos)
+            end = match.start() if match else len(self._buf)
+            if end > self._pos:
+                self._take_normal(parts, end - self._pos)
+                continue
+
+            char = self._buf[self._pos]
+
+            if char == ";":
+                self._advance(1)
+                if self._has_content:
+                    parts.append(";")
+                    return self._finish(parts)
+                continue
+
+            if char == "-":
+                self._fill(2)
+                if self._buf.startswith("--", self._pos):
+                    self._skip_line(keep_newline=True)
+                else:
+                    self._take_normal(parts, 1)
+                continue
+
+            if char == "/":
+                self._fill(2)
+                if self._buf.startswith("/*", self._pos):
+                    self._skip_block_comment()
+                    if self._has_content:
+                        parts.append(" ")
+                else:
+                    self._take_normal(parts, 1)
+                continue
+
+            if char == "'":
+                escape = self._is_escape_string(parts)
+                self._start_statement()
+                parts.append(self._read_quoted("'", escape))
+                continue
+
+            if char == '"':
+                self._start_statement()
+                parts.append(self._read_quoted('"', False))
+                continue
+
+            if char == "$":
+                self._fill(_MAX_DOLLAR_TAG)
+                tag = _DOLLAR_TAG.match(self._buf, self._pos)
+                if tag and not self._follows_identifier(parts):
+                    self._start_statement()
+                    parts.append(self._read_dollar_quoted(tag.group(0)))
+                else:
+                    self._take_normal(parts, 1)
+                continue
+
+            # char == "\\": meta-comando do psql fora de statement
+            if not self._has_content:
+                self._skip_line(keep_newline=False)
+            else:
+                self._take_normal(parts, 1)
+
+        if self._has_content:
+            return self._finish(parts)
+        return None
+
+    def _finish(self, parts: List[str]) -> SQLStatement:
+        sql = "".join(parts).strip()
+        offset, line = self._start
+        copy_data = None
+        if _COPY_FROM_STDIN.match(sql):
+            copy_data = self._read_copy_data()
+        return SQLStatement(sql, line, offset, copy_data)
+
+    def _take_normal(self, parts: List[str], count: int) -> None:
+        """Consome texto comum, descartando espaços antes do statement."""
+        if not self._has_content:
+            text = self._buf[self._pos:self._pos + count]
+            stripped = text.lstrip()
+            self._advance(count - len(stripped))
+            if not stripped:
+                return
+            count = len(stripped)
+            self._start_statement()
+        parts.append(self._advance(count))
+
+    @staticmethod
+    def _tail(parts: List[str], size: int) -> str:
+        return "".join(parts[-size:])[-size:]
+
+    def _follows_identifier(self, parts: List[str]) -> bool:
+        """'$' colado a um identificador (ex.: col$1) não abre dollar quote."""
+        tail = self._tail(parts, 1)
+        return bool(tail) and bool(_IDENT_CHAR.match(tail))
+
+    def _is_escape_string(self, parts: List[str]) -> bool:
+        """Detecta o prefixo E de strings com escapes estilo C (E'...')."""
+        tail = self._tail(parts, 2)
+        if not tail or tail[-1] not in "eE":
+            return False
+        return len(tail) == 1 or not _IDENT_CHAR.match(tail[0])
+
+    # ------------------------------------------------------------------
+    # Literais e comentários
+    # ------------------------------------------------------------------
+
+    def _read_quoted(self, quote: str, escape: bool) -> str:
+        """Lê '...', E'...' ou "..." tratando aspas duplicadas."""
+        line = self._line
+        out = [self._advance(1)]
+        stop = _ESCAPE_STRING_STOP if escape else re.compile(re.escape(quote))
+
+        while True:
+            if not self._fill(1):
+                raise SQLLexerError(
+                    f"Literal {quote}...{quote} sem fechamento iniciado na linha {line}")
+
+            match = stop.search(self._buf, self._pos)
+            if not match:
+                out.append(self._advance(len(self._buf) - self._pos))
+                continue
+
+            out.append(self._advance(match.start() - self._pos))
+            self._fill(2)
+
+            if self._buf[self._pos] == "\\":
+                out.append(self._advance(2))
+                continue
+
+            if self._buf.startswith(quote * 2, self._pos):
+                out.append(self._advance(2))
+                continue
+
+            out.append(self._advance(1))
+            return "".join(out)
+
+    def _read_dollar_quoted(self, tag: str) -> str:
+        """Lê o corpo de $tag$ ... $tag$ sem interpretar o conteúdo."""
+        line = self._line
+        out = [self._advance(len(tag))]
+
+        while True:
+            index = self._buf.find(tag, self._pos)
+            if index >= 0:
+                out.append(self._advance(index + len(tag) - self._pos))
+                return "".join(out)
+
+            keep_from = max(self._pos, len(self._buf) - len(tag) + 1)
+            out.append(self._advance(keep_from - self._pos))
+            if not self._fill_more():
+                raise SQLLexerError(
+                    f"Dollar quote {tag} sem fechamento iniciado na linha {line}")
+
+    def _skip_block_comment(self) -> None:
+        """Descarta /* ... */ (comentários aninhados são permitidos)."""
+        line = self._line
+        self._advance(2)
+        depth = 1
+
+        while depth:
+            match = _BLOCK_COMMENT.search(self._buf, self._pos)
+            if match:
+                self._advance(match.end() - self._pos)
+                depth += 1 if match.group(0) == "/*" else -1
+                continue
+
+            keep_from = max(self._pos, len(self._buf) - 1)
+            self._advance(keep_from - self._pos)
+            if not self._fill_more():
+                raise SQLLexerError(
+                    f"Comentário /* sem fechamento iniciado na linha {line}")
+
+    def _skip_line(self, keep_newline: bool) -> None:
+        """Descarta até o fim da linha (comentário -- ou meta-comando)."""
+        while self._fill(1):
+            index = self._buf.find("\n", self._pos)
+            if index >= 0:
+                self._advance(index - self._pos + (0 if keep_newline else 1))
+                return
+            self._advance(len(self._buf) - self._pos)
+
+    def _read_line(self) -> str:
+        out = []
+        while self._fill(1):
+            index = self._buf.find("\n", self._pos)
+            if index >= 0:
+                out.append(self._advance(index + 1 - self._pos))
+                break
+            out.append(self._advance(len(self._buf) - self._pos))
+        return "".join(out)
+
+    def _read_copy_data(self) -> IO[str]:
+        """Lê os dados de COPY ... FROM stdin até a linha '\\.'."""
+        line = self._line
+        self._read_line()  # resto da linha do COPY
+
+        data = tempfile.SpooledTemporaryFile(
+            max_size=COPY_SPOOL_SIZE, mode="w+", encoding="utf-8")
+        while True:
+            row = self._read_line()
+            if not row:
+                data.close()
+                raise SQLLexerError(
+                    f"Dados de COPY sem terminador \\. iniciados na linha {line}")
+            if row.rstrip("\r\n") == "\\.":
+                break
+            data.write(row)
+
+        data.seek(0)
+        return data
+
+
+def iter_statements(stream: IO[str],
+                    chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[SQLStatement]:
+    """Itera os statements de um stream SQL."""
+    return iter(SQLLexer(stream, chunk_size))
+
+
+def iter_file_statements(path: str, encoding: str = "utf-8",
+                         chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[SQLStatement]:
+    """Itera os statements de um arquivo SQL sem carregá-lo inteiro."""
+    with open(path, "r", encoding=encoding) as stream:
+        yield from SQLLexer(stream, chunk_size)
@@ -0,0 +1,86 @@
+"""
+Módulo de Agrupamento de Statements SQL
+Agrupa statements em lotes enviados em uma única ida ao servidor
+"""
+
+import re
+from typing import Iterable, Iterator, List
+
+from app.core.modules.sql_lexer import SQLStatement
+
+# Statements por lote e tamanho máximo (caracteres) de cada lote
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_BATCH_MAX_CHARS = 1024 * 1024
+
+# Não podem rodar dentro do bloco de transação implícito de um lote
+_OWN_TRANSACTION = re.compile(
+    r"^(?:"
+    r"(?:CREATE|DROP)\s+(?:DATABASE|TABLESPACE|SUBSCRIPTION)\b"
+    r"|ALTER\s+SYSTEM\b"
+    r"|ALTER\s+DATABASE\b.*\bSET\s+TABLESPACE\b"
+    r"|VACUUM\b|CLUSTER\b|CALL\b"
+    r"|(?:CREATE\s+(?:UNIQUE\s+)?|DROP\s+)INDEX\s+CONCURRENTLY\b"
+    r"|REINDEX\b.*\bCONCURRENTLY\b"
+    r"|(?:BEGIN|START|COMMIT|END|ROLLBACK|ABORT|SAVEPOINT|RELEASE|PREPARE)\b"
+    r")",
+    re.I | re.S)
+
+
+def is_transactional(statement: SQLStatement) -> bool:
+    """Indica se o statement pode rodar dentro de um bloco de transação."""
+    return not _OWN_TRANSACTION.match(statement.sql)
+
+
+def is_batchable(statement: SQLStatement) -> bool:
+    """
+    Indica se o statement pode ir em lote com outros.
+
+    Um lote é enviado como uma única query e o servidor o executa em uma
+    transação implícita; DDL não transacional (CREATE DATABASE, VACUUM...),
+    controle de transação e COPY precisam ir sozinhos.
+    """
+    if statement.copy_data is not None:
+        return False
+    return is_transactional(statement)
+
+
+def terminated(sql: str) -> str:
+    """Garante o ';' final ao concatenar statements."""
+    return sql if sql.endswith(";") else sql + ";"
+
+
+def iter_batches(statements: Iterable[SQLStatement],
+                 batch_size: int = DEFAULT_BATCH_SIZE,
+                 max_chars: int = DEFAULT_BATCH_MAX_CHARS) -> Iterator[List[SQLStatement]]:
+    """
+    Agrupa statements consecutivos em lotes, preservando a ordem.
+
+    Statements que não podem ir em lote saem sozinhos, encerrando o lote
+    corrente antes deles.
+
+    Args:
+        statements: Statements na ordem do script
+        batch_size: Máximo de statements por lote
+        max_chars: Máximo de caracteres de SQL por lote
+    """
+    batch: List[SQLStatement] = []
+    batch_chars = 0
+
+    for statement in statements:
+        if not is_batchable(statement):
+            if batch:
+                yield batch
+                batch, batch_chars = [], 0
+            yield [statement]
+            continue
+
+        if batch and (len(batch) >= batch_size
+                      or batch_chars + len(statement.sql) > max_chars):
+            yield batch
+            batch, batch_chars = [], 0
+
+        batch.append(statement)
+        batch_chars += len(statement.sql)
+
+    if batch:
+        yield batch
@@ -0,0 +1,234 @@
+"""
+Módulo de Perfil de Execução de Statements
+Mede tempo, linhas afetadas e erros de cada statement da Fase 3 e separa o
+tempo gasto em idas e voltas na rede do tempo de servidor
+"""
+
+import heapq
+import itertools
+import json
+import re
+import statistics
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from app.core.modules.sql_lexer import SQLStatement
+
+# Limites superiores (ms) das faixas do histograma de latência
+HISTOGRAM_BUCKETS_MS = (1, 5, 10, 50, 100, 500, 1000, 5000)
+
+_TYPED_DDL = re.compile(
+    r"^(CREATE|ALTER|DROP)\s+(?:OR\s+REPLACE\s+)?(?:UNIQUE\s+)?"
+    r"(?:TEMP(?:ORARY)?\s+)?(?:MATERIALIZED\s+)?([A-Za-z]+)", re.I)
+_FIRST_WORD = re.compile(r"^([A-Za-z]+)")
+
+
+def statement_type(sql: str) -> str:
+    """Classifica o statement: 'CREATE ROLE', 'GRANT', 'CREATE DATABASE'..."""
+    match = _TYPED_DDL.match(sql)
+    if match:
+        return f"{match.group(1).upper()} {match.group(2).upper()}"
+    match = _FIRST_WORD.match(sql)
+    return match.group(1).upper() if match else "OUTRO"
+
+
+def error_class(error: BaseException) -> str:
+    """Nome da classe do erro e SQLSTATE (quando disponível)."""
+    pgcode = getattr(error, 'pgcode', None)
+    name = type(error).__name__
+    return f"{name} ({pgcode})" if pgcode else name
+
+
+def _bucket_label(elapsed_ms: float) -> str:
+    for limit in HISTOGRAM_BUCKETS_MS:
+        if elapsed_ms <= limit:
+            return f"<={limit}ms"
+    return f">{HISTOGRAM_BUCKETS_MS[-1]}ms"
+
+
+class StatementProfiler:
+    """
+    Coletor de latência por statement.
+
+    Cada chamada a record() corresponde a uma ida ao servidor (um statement
+    ou um lote). A latência de rede é estimada pelo tempo de um SELECT 1
+    medido em calibrate(); o restante é atribuído ao servidor.
+    Thread-safe: os shards paralelos registram no mesmo profiler.
+    """
+
+    def __init__(self, top_n: int = 20):
+        """
+        Inicializa o profiler.
+
+        Args:
+            top_n: Quantidade de statements mais lentos mantidos no relatório
+        """
+        self.top_n = top_n
+        self.rtt = 0.0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._sequence = itertools.count()
+        self._slowest: List[Any] = []
+        self._by_type: Dict[str, Dict[str, Any]] = {}
+        self._errors: Counter = Counter()
+        self.round_trips = 0
+        self.statement_count = 0
+        self.total_time = 0.0
+        self.network_time = 0.0
+
+    def calibrate(self, connection, samples: int = 5) -> float:
+        """
+        Mede a latência de ida e volta com SELECT 1 (mediana das amostras).
+
+        Returns:
+            RTT estimado em segundos
+        """
+        timings = []
+        with connection.cursor() as cursor:
+            for _ in range(samples):
+                start = time.perf_counter()
+                cursor.execute("SELECT 1")
+                cursor.fetchall()
+                timings.append(time.perf_counter() - start)
+
+        self.rtt = statistics.median(timings)
+        print(f"   📡 RTT estimado: {self.rtt * 1000:.2f} ms")
+        return self.rtt
+
+    def set_script(self, script: str) -> None:
+        """Define o script em execução na thread atual."""
+        self._local.script = script
+
+    def record(self, statements: List[SQLStatement], elapsed: float,
+               rowcount: Optional[int] = None,
+               error: Optional[BaseException] = None) -> None:
+        """
+        Registra uma ida ao servidor com um ou mais statements.
+
+        Em lotes o tempo é dividido igualmente entre os statements e as
+        linhas afetadas não são atribuídas (o cursor só informa o último).
+        """
+        if not statements:
+            return
+
+        share = elapsed / len(statements)
+        if len(statements) > 1:
+            rowcount = None
+        script = getattr(self._local, 'script', None)
+        error_name = error_class(error) if error else None
+
+        with self._lock:
+            self._count_round_trip(elapsed)
+            self.statement_count += len(statements)
+            if error_name:
+                self._errors[error_name] += 1
+
+            for statement in statements:
+                self._add_to_type(statement_type(statement.sql), share)
+                entry = (share, next(self._sequence), {
+                    'script': script,
+                    'line': statement.line,
+                    'type': statement_type(statement.sql),
+                    'elapsed_ms': round(share * 1000, 3),
+                    'rowcount': rowcount,
+                    'error': error_name,
+                    'batched': len(statements) > 1,
+                    'sql': statement.sql[:200]
+                })
+                if len(self._slowest) < self.top_n:
+                    heapq.heappush(self._slowest, entry)
+                elif share > self._slowest[0][0]:
+                    heapq.heapreplace(self._slowest, entry)
+
+    def record_overhead(self, label: str, elapsed: float,
+                        error: Optional[BaseException] = None) -> None:
+        """Registra idas ao servidor que não são statements do script (BEGIN, COMMIT...)."""
+        with self._lock:
+            self._count_round_trip(elapsed)
+            self._add_to_type(label, elapsed)
+            if error:
+                self._errors[error_class(error)] += 1
+
+    def _count_round_trip(self, elapsed: float) -> None:
+        self.round_trips += 1
+        self.total_time += elapsed
+        self.network_time += min(elapsed, self.rtt)
+
+    def _add_to_type(self, kind: str, elapsed: float) -> None:
+        stats = self._by_type.setdefault(kind, {
+            'count': 0, 'total_ms': 0.0, 'max_ms': 0.0,
+            'histogram': {label: 0 for label in self._bucket_labels()}
+        })
+        elapsed_ms = elapsed * 1000
+        stats['count'] += 1
+        stats['total_ms'] += elapsed_ms
+        stats['max_ms'] = max(stats['max_ms'], elapsed_ms)
+        stats['histogram'][_bucket_label(elapsed_ms)] += 1
+
+    @staticmethod
+    def _bucket_labels() -> List[str]:
+        labels = [f"<={limit}ms" for limit in HISTOGRAM_BUCKETS_MS]
+        labels.append(f">{HISTOGRAM_BUCKETS_MS[-1]}ms")
+        return labels
+
+    def summary(self) -> Dict[str, Any]:
+        """Consolida os dados coletados."""
+        with self._lock:
+            by_type = {}
+            for kind, stats in sorted(self._by_type.items(),
+                                      key=lambda item: -item[1]['total_ms']):
+                by_type[kind] = dict(
+                    stats,
+                    total_ms=round(stats['total_ms'], 3),
+                    max_ms=round(stats['max_ms'], 3),
+                    avg_ms=round(stats['total_ms'] / stats['count'], 3))
+
+            server_time = max(self.total_time - self.network_time, 0.0)
+            return {
+                'statements': self.statement_count,
+                'round_trips': self.round_trips,
+                'rtt_ms': round(self.rtt * 1000, 3),
+                'total_seconds': round(self.total_time, 3),
+                'network_seconds': round(self.network_time, 3),
+                'server_seconds': round(server_time, 3),
+                'network_share': (round(self.network_time / self.total_time, 3)
+                                  if self.total_time else 0.0),
+                'slowest': [entry for _, _, entry in
+                            sorted(self._slowest, reverse=True)],
+                'by_type': by_type,
+                'errors': dict(self._errors)
+            }
+
+    def write_report(self, reports_dir: str = "reports") -> str:
+        """
+        Grava o relatório JSON em reports/ e imprime o resumo.
+
+        Returns:
+            Caminho do relatório gerado
+        """
+        summary = self.summary()
+        report_dir = Path(reports_dir)
+        report_dir.mkdir(parents=True, exist_ok=True)
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        report_file = report_dir / f"statement_profile_{timestamp}.json"
+
+        with open(report_file, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2, ensure_ascii=False)
+
+        print(f"\n⏱️ PERFIL DE EXECUÇÃO ({summary['statements']} statements, "
+              f"{summary['round_trips']} idas ao servidor)")
+        print(f"   📡 Rede: {summary['network_seconds']:.2f}s | "
+              f"🖥️ Servidor: {summary['server_seconds']:.2f}s "
+              f"({summary['network_share']:.0%} do tempo em rede)")
+        for kind, stats in list(summary['by_type'].items())[:5]:
+            print(f"   📊 {kind}: {stats['count']} x {stats['avg_ms']:.2f} ms "
+                  f"(máx {stats['max_ms']:.2f} ms)")
+        for error_name, count in summary['errors'].items():
+            print(f"   ⚠️  {error_name}: {count}")
+        print(f"   📄 Relatório: {report_file}")
+
+        return str(report_file)
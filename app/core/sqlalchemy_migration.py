@@ -15,26 +15,121 @@ Dependências:
 """
 
 import json
+import queue
 import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 from sqlalchemy import MetaData, create_engine, inspect, text
 from sqlalchemy.engine import Engine
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app.monitoring.dashboard import progress_hub
+from app.monitoring.metrics import ERRORS, OBJECTS_PROCESSED, instrument_engine
+from app.monitoring.tracing import trace_engine
+from components.logging_utils import configure_console_logging, get_migration_logger
+
+# Mensagens por item (usuário, banco, GRANT) vão para o logger com
+# formatação preguiçosa; cabeçalhos e resumos continuam em stdout
+logger = get_migration_logger('sqlalchemy')
+
+
+# Roles da origem (pg_authid, sem roles internos e administrativos)
+SOURCE_ROLES_QUERY = """
+SELECT
+    rolname,
+    rolsuper,
+    rolinherit,
+    rolcreaterole,
+    rolcreatedb,
+    rolcanlogin,
+    rolreplication,
+    rolconnlimit,
+    rolpassword,
+    rolvaliduntil
+FROM pg_authid
+WHERE rolname NOT LIKE 'pg_%'
+  AND rolname NOT IN ('postgres', 'migration_user')
+ORDER BY rolname
+"""
+
+# Volume da origem para a previsão de duração, com os mesmos filtros de
+# get_users_from_source e dos bancos de usuário de get_databases_with_owners
+SOURCE_WORKLOAD_QUERY = """
+SELECT
+    (SELECT count(*) FROM pg_roles
+     WHERE rolname NOT LIKE 'pg_%'
+       AND rolname NOT IN ('postgres', 'migration_user')) AS roles,
+    count(*) AS databases,
+    COALESCE(sum(CASE WHEN has_database_privilege(d.datname, 'CONNECT')
+                      THEN pg_database_size(d.datname) ELSE 0 END), 0) AS bytes
+FROM pg_database d
+WHERE d.datallowconn AND NOT d.datistemplate AND d.datname <> 'postgres'
+"""
+
+# ACLs de todos os bancos em uma consulta (aclexplode sobre pg_database);
+# bancos sem ACL explícita usam o acldefault do owner
+DATABASE_ACL_QUERY = """
+SELECT
+    d.datname,
+    COALESCE(r.rolname, 'public') AS grantee,
+    array_agg(DISTINCT a.privilege_type) AS privileges
+FROM pg_database d
+CROSS JOIN LATERAL aclexplode(
+    COALESCE(d.datacl, acldefault('d', d.datdba))) AS a
+LEFT JOIN pg_roles r ON r.oid = a.grantee
+WHERE d.datname NOT LIKE 'template%'
+  AND (d.datacl IS NOT NULL OR a.grantee = d.datdba)
+GROUP BY d.datname, r.rolname
+ORDER BY d.datname, grantee
+"""
 
 
 class SQLAlchemyPostgreSQLMigrator:
-    def __init__(self):
+    def __init__(self, source_config: Optional[Dict] = None,
+                 dest_config: Optional[Dict] = None):
+        """
+        Args:
+            source_config: Configuração da origem (padrão: secrets/)
+            dest_config: Configuração do destino (padrão: secrets/)
+        """
         self.source_engine: Optional[Engine] = None
         self.dest_engine: Optional[Engine] = None
-        self.source_config = None
-        self.dest_config = None
+        self.source_config = source_config
+        self.dest_config = dest_config
+        self._configs_provided = bool(source_config and dest_config)
+
+        # Tamanho dos pools de conexão (create_engines)
+        self.pool_size = 5
+        self.max_overflow = 10
+
+        # Contadores da última migração (migrate_all_users)
+        self.last_result: Dict[str, int] = {}
+
+        # Snapshot de roles do destino (carregado uma vez por execução)
+        self._role_snapshot: Optional[Set[str]] = None
+        self._role_lock = threading.Lock()
+
+        # Criação de roles em lotes (uma transação e verificação por lote)
+        self.bulk_role_creation = True
+        self.role_batch_size = 500
+
+        # ACLs dos bancos da origem indexadas por banco (uma query por execução)
+        self._privilege_index: Optional[Dict[str, List[Dict]]] = None
+
+        # Workers (conexões persistentes) para aplicação de privilégios
+        self.privilege_workers = 4
 
     def load_configs(self):
         """Carrega configurações usando o sistema centralizado."""
+        if self._configs_provided:
+            return True
+
         try:
             from components.config_manager import get_db_config_path
 
@@ -60,8 +155,8 @@ class SQLAlchemyPostgreSQLMigrator:
 
             self.source_engine = create_engine(
                 source_url,
-                pool_size=5,
-                max_overflow=10,
+                pool_size=self.pool_size,
+                max_overflow=self.max_overflow,
                 pool_timeout=30,
                 echo=False  # Set True for SQL debugging
             )
@@ -71,12 +166,20 @@ class SQLAlchemyPostgreSQLMigrator:
 
             self.dest_engine = create_engine(
                 dest_url,
-                pool_size=5,
-                max_overflow=10,
+                pool_size=self.pool_size,
+                max_overflow=self.max_overflow,
                 pool_timeout=30,
                 echo=False
             )
 
+            # Conexões em uso por servidor (métricas Prometheus)
+            instrument_engine(self.source_engine)
+            instrument_engine(self.dest_engine)
+
+            # Spans de conexão e de cada statement (--trace)
+            trace_engine(self.source_engine)
+            trace_engine(self.dest_engine)
+
             # Testar conexões
             with self.source_engine.connect() as conn:
                 conn.execute(text("SELECT 1"))
@@ -127,7 +230,7 @@ class SQLAlchemyPostgreSQLMigrator:
         for user in users:
             username = user['rolname']
             if username in protected_users:
-                print(f"   🛡️ Usuário {username} está protegido - pulando migração")
+                logger.info("   🛡️ Usuário %s está protegido - pulando migração", username)
                 skipped_count += 1
             else:
                 filtered_users.append(user)
@@ -145,7 +248,7 @@ class SQLAlchemyPostgreSQLMigrator:
         for db in databases:
             db_name = db['datname']
             if db_name in protected_databases:
-                print(f"   🛡️ Banco {db_name} está protegido - pulando migração")
+                logger.info("   🛡️ Banco %s está protegido - pulando migração", db_name)
                 skipped_count += 1
             else:
                 filtered_databases.append(db)
@@ -157,23 +260,7 @@ class SQLAlchemyPostgreSQLMigrator:
         """Coleta usuários usando SQLAlchemy."""
         print("👥 Coletando usuários do servidor origem...")
 
-        query = text("""
-            SELECT
-                rolname,
-                rolsuper,
-                rolinherit,
-                rolcreaterole,
-                rolcreatedb,
-                rolcanlogin,
-                rolreplication,
-                rolconnlimit,
-                rolpassword,
-                rolvaliduntil
-            FROM pg_authid
-            WHERE rolname NOT LIKE 'pg_%'
-              AND rolname NOT IN ('postgres', 'migration_user')
-            ORDER BY rolname
-        """)
+        query = text(SOURCE_ROLES_QUERY)
 
         try:
             with self.source_engine.connect() as conn:
@@ -202,6 +289,26 @@ class SQLAlchemyPostgreSQLMigrator:
             print(f"❌ Erro SQLAlchemy ao coletar usuários: {e}")
             return []
 
+    def get_source_workload(self) -> Dict[str, int]:
+        """
+        Volume da origem (roles, bancos de usuário e bytes) em uma consulta
+        agregada, com uma conexão avulsa apenas à origem.
+
+        Returns:
+            {'roles': ..., 'databases': ..., 'bytes': ...}
+        """
+        from components.config_normalizer import get_sqlalchemy_url
+
+        engine = create_engine(get_sqlalchemy_url(self.source_config), poolclass=NullPool)
+        try:
+            with engine.connect() as conn:
+                row = conn.execute(text(SOURCE_WORKLOAD_QUERY)).one()
+        finally:
+            engine.dispose()
+
+        return {'roles': int(row.roles), 'databases': int(row.databases),
+                'bytes': int(row.bytes)}
+
     def get_databases_with_owners(self) -> List[Dict]:
         """Coleta bancos com owners usando SQLAlchemy."""
         print("🏗️ Coletando bancos e owners do servidor origem...")
@@ -245,7 +352,7 @@ class SQLAlchemyPostgreSQLMigrator:
                 for row in debug_result:
                     all_databases.append(row)
                     template_status = " (template)" if row.datistemplate else ""
-                    print(f"      - {row.datname} (owner: {row.owner}){template_status}")
+                    logger.debug("      - %s (owner: %s)%s", row.datname, row.owner, template_status)
 
                 print(f"   📊 Total de bancos encontrados: {len(all_databases)}")
 
@@ -280,7 +387,7 @@ class SQLAlchemyPostgreSQLMigrator:
                     print("   📋 Bancos de usuário encontrados:")
                     for db in user_databases:
                         size_mb = db['size_bytes'] / (1024 * 1024) if db['size_bytes'] > 0 else 0
-                        print(f"      - {db['datname']} ({size_mb:.2f} MB, owner: {db['owner']})")
+                        logger.info("      - %s (%.2f MB, owner: %s)", db['datname'], size_mb, db['owner'])
 
                 # Retornar todos os bancos (sistema + usuário) para análise completa
                 return databases
@@ -289,170 +396,220 @@ class SQLAlchemyPostgreSQLMigrator:
             print(f"❌ Erro SQLAlchemy ao coletar bancos: {e}")
             return []
 
-    def get_database_privileges(self, db_name: str) -> List[Dict]:
-        """Coleta privilégios de um banco usando a abordagem do pgAdmin - queries ACL simples."""
-        privileges = []
+    @staticmethod
+    def _privilege_names(privilege_types: List[str]) -> List[str]:
+        """Converte os privilege_type do aclexplode na lista usada nos GRANTs."""
+        granted = set(privilege_types or [])
+        if {'CONNECT', 'TEMPORARY', 'CREATE'} <= granted:
+            return ['ALL']
+        return [name for name in ('CONNECT', 'TEMPORARY', 'CREATE') if name in granted]
 
-        # Query similar ao pgAdmin para buscar ACLs de banco
-        acl_query = text("""
-            SELECT
-                d.datname as deftype,
-                CASE WHEN aclitem IS NULL THEN 'datacl' ELSE 'datacl' END as deftype,
-                split_part(aclitem::text, '=', 1) as grantee,
-                split_part(split_part(aclitem::text, '=', 2), '/', 2) as grantor,
-                split_part(split_part(aclitem::text, '=', 2), '/', 1) as privileges
-            FROM pg_database d, unnest(COALESCE(d.datacl, ARRAY[]::aclitem[])) as aclitem
-            WHERE d.datname = :db_name
-              AND d.datname NOT LIKE 'template%'
-
-            UNION ALL
-
-            -- Adicionar owner se não tem ACL explícita
-            SELECT
-                d.datname as deftype,
-                'datacl' as deftype,
-                r.rolname as grantee,
-                r.rolname as grantor,
-                'CTc' as privileges
-            FROM pg_database d
-            JOIN pg_roles r ON d.datdba = r.oid
-            WHERE d.datname = :db_name
-              AND d.datname NOT LIKE 'template%'
-              AND (d.datacl IS NULL OR NOT EXISTS (
-                  SELECT 1 FROM unnest(d.datacl) as acl
-                  WHERE split_part(acl::text, '=', 1) = r.rolname
-              ))
-        """)
+    def prefetch_database_privileges(self) -> Dict[str, List[Dict]]:
+        """
+        Coleta as ACLs de todos os bancos da origem em uma única query.
 
-        try:
-            with self.source_engine.connect() as conn:
-                result = conn.execute(acl_query, {"db_name": db_name})
+        Usa aclexplode sobre pg_database (bancos sem ACL explícita usam o
+        acldefault do owner) e indexa o resultado por banco, para que a
+        aplicação no destino não volte à origem a cada banco.
 
-                print(f"     🔍 DEBUG: Coletando ACLs para {db_name}...")
+        Raises:
+            SQLAlchemyError: Se as ACLs não puderem ser lidas (o índice
+                continua None; sem ele nenhum privilégio seria aplicado)
+        """
+        acl_query = text(DATABASE_ACL_QUERY)
 
-                # Processar resultados como o pgAdmin faz
-                for row in result:
-                    grantee = row.grantee if row.grantee else 'public'
-                    priv_codes = row.privileges or ''
+        index: Dict[str, List[Dict]] = {}
 
+        try:
+            with self.source_engine.connect() as conn:
+                for row in conn.execute(acl_query):
                     # Ignorar usuários do sistema
-                    if grantee in ['postgres', 'migration_user']:
+                    if row.grantee in ['postgres', 'migration_user']:
+                        index.setdefault(row.datname, [])
                         continue
 
-                    # Converter códigos de privilégio para nomes (baseado no pgAdmin)
-                    db_privileges = []
-                    if 'C' in priv_codes:  # CONNECT
-                        db_privileges.append('CONNECT')
-                    if 'T' in priv_codes:  # TEMPORARY
-                        db_privileges.append('TEMPORARY')
-                    if 'c' in priv_codes:  # CREATE
-                        db_privileges.append('CREATE')
-
-                    # Se tem todos os códigos principais, é ALL
-                    if priv_codes == 'CTc':
-                        db_privileges = ['ALL']
-
+                    db_privileges = self._privilege_names(row.privileges)
                     if db_privileges:
-                        privileges.append({
-                            'username': grantee,
+                        index.setdefault(row.datname, []).append({
+                            'username': row.grantee,
                             'privileges': db_privileges
                         })
-                        print(f"     🔍 DEBUG: {grantee} tem {', '.join(db_privileges)} no banco {db_name}")
-
-                print(f"     📊 Total de privilégios coletados para {db_name}: {len(privileges)}")
 
         except SQLAlchemyError as e:
-            print(f"   ⚠️ Erro ao coletar privilégios de {db_name}: {e}")
+            print(f"   ❌ Erro ao coletar privilégios dos bancos: {e}")
+            raise
+
+        total = sum(len(entries) for entries in index.values())
+        print(f"   📊 {total} privilégios coletados da origem para {len(index)} bancos")
+
+        self._privilege_index = index
+        return index
+
+    def get_database_privileges(self, db_name: str) -> List[Dict]:
+        """Privilégios de um banco, a partir do índice de ACLs da origem."""
+        if self._privilege_index is None:
+            self.prefetch_database_privileges()
+        return self._privilege_index.get(db_name, [])
+
+    @staticmethod
+    def _role_attributes(user: Dict) -> str:
+        """Monta os atributos do CREATE ROLE a partir de pg_authid."""
+        attributes = []
+        if user['rolcanlogin']:
+            attributes.append("LOGIN")
+        if user['rolsuper']:
+            attributes.append("SUPERUSER")
+        if user['rolinherit']:
+            attributes.append("INHERIT")
+        if user['rolcreaterole']:
+            attributes.append("CREATEROLE")
+        if user['rolcreatedb']:
+            attributes.append("CREATEDB")
+        if user['rolreplication']:
+            attributes.append("REPLICATION")
+        if user['rolconnlimit'] != -1:
+            attributes.append(f"CONNECTION LIMIT {user['rolconnlimit']}")
+        return " ".join(attributes)
+
+    def _create_role_sql(self, user: Dict, password_param: str = "password") -> str:
+        """SQL do CREATE ROLE; a senha vai como parâmetro nomeado."""
+        username = user['rolname']
+        attrs_str = self._role_attributes(user)
+        if user['rolpassword']:
+            return f'CREATE ROLE "{username}" WITH {attrs_str} PASSWORD :{password_param}'
+        return f'CREATE ROLE "{username}" WITH {attrs_str}'
+
+    def _create_role_individually(self, conn, user: Dict) -> bool:
+        """Cria um role com commit e verificação próprios (modo por usuário)."""
+        username = user['rolname']
+
+        # Executar CREATE ROLE com commit explícito
+        try:
+            create_query = text(self._create_role_sql(user))
+            if user['rolpassword']:
+                conn.execute(create_query, {"password": user['rolpassword']})
+            else:
+                conn.execute(create_query)
+
+            # CRÍTICO: Commit explícito para persistir usuário
+            conn.commit()
 
-        return privileges
+            # Verificação imediata de criação
+            verify_query = text(
+                "SELECT rolname FROM pg_roles WHERE rolname = :username"
+            )
+            verify_result = conn.execute(
+                verify_query, {"username": username}
+            )
+            if verify_result.fetchone():
+                logger.debug("   ✅ Usuário %s criado e verificado", username)
+                self.remember_role(username)
+                OBJECTS_PROCESSED.inc(kind='role')
+                return True
+
+            logger.error("   ❌ Usuário %s não persistido", username)
+
+        except Exception as e:
+            conn.rollback()
+            logger.error("   ❌ Erro ao criar %s: %s", username, e)
+
+        ERRORS.inc(component='roles')
+        return False
+
+    def _create_roles_batch(self, conn, batch: List[Dict]) -> int:
+        """
+        Cria um lote de roles em uma transação e uma única ida ao servidor.
+
+        A verificação é uma consulta com ANY(:names) por lote; se o destino
+        recusar o lote (ex.: SUPERUSER sem permissão), ele é desfeito e os
+        roles são criados um a um.
+        """
+        statements = []
+        params: Dict[str, Any] = {}
+        for index, user in enumerate(batch):
+            password_param = f"password_{index}"
+            statements.append(self._create_role_sql(user, password_param))
+            if user['rolpassword']:
+                params[password_param] = user['rolpassword']
+
+        try:
+            conn.execute(text(";\n".join(statements)), params)
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            logger.warning("   ⚠️ Lote de %d usuários recusado (%s) - criando individualmente",
+                           len(batch), e)
+            return sum(1 for user in batch if self._create_role_individually(conn, user))
+
+        names = [user['rolname'] for user in batch]
+        verify_query = text("SELECT rolname FROM pg_roles WHERE rolname = ANY(:names)")
+        found = {row.rolname for row in conn.execute(verify_query, {"names": names})}
+
+        for username in names:
+            if username in found:
+                self.remember_role(username)
+            else:
+                logger.error("   ❌ Usuário %s não persistido", username)
+                ERRORS.inc(component='roles')
+
+        OBJECTS_PROCESSED.inc(len(found), kind='role')
+        logger.info("   ✅ Lote: %d/%d usuários criados e verificados", len(found), len(names))
+        return len(found)
 
     def create_users_in_destination(self, users: List[Dict]) -> int:
-        """Cria usuários no destino usando SQLAlchemy."""
-        print("🔧 Criando usuários no servidor destino...")
+        """
+        Cria usuários no destino usando SQLAlchemy.
 
-        # Verificar usuários existentes
-        existing_query = text("SELECT rolname FROM pg_roles")
+        Em modo bulk (padrão) os roles são criados em lotes de
+        role_batch_size, cada lote em uma transação com verificação única.
+        """
+        print("🔧 Criando usuários no servidor destino...")
 
         try:
             with self.dest_engine.connect() as conn:
-                result = conn.execute(existing_query)
-                existing_users = {row.rolname for row in result}
+                # Verificar usuários existentes (snapshot da execução)
+                existing_users = self.load_role_snapshot(conn)
 
                 created_count = 0
 
                 # Obter listas de proteção
                 protected_users, _ = self.get_protected_items()
 
+                pending = []
                 for user in users:
                     username = user['rolname']
 
                     # Verificação adicional de proteção
                     if username in protected_users:
-                        print(f"   🛡️ Usuário {username} está protegido - pulando criação")
+                        logger.info("   🛡️ Usuário %s está protegido - pulando criação", username)
                         continue
 
                     if username in existing_users:
-                        print(f"   ⚠️ Usuário {username} já existe - pulando")
+                        logger.debug("   ⚠️ Usuário %s já existe - pulando", username)
                         continue
 
-                    # Construir comando CREATE ROLE com parâmetros seguros
-                    attributes = []
-                    if user['rolcanlogin']:
-                        attributes.append("LOGIN")
-                    if user['rolsuper']:
-                        attributes.append("SUPERUSER")
-                    if user['rolinherit']:
-                        attributes.append("INHERIT")
-                    if user['rolcreaterole']:
-                        attributes.append("CREATEROLE")
-                    if user['rolcreatedb']:
-                        attributes.append("CREATEDB")
-                    if user['rolreplication']:
-                        attributes.append("REPLICATION")
-                    if user['rolconnlimit'] != -1:
-                        attributes.append(f"CONNECTION LIMIT {user['rolconnlimit']}")
-
-                    attrs_str = " ".join(attributes)
-
-                    # Executar CREATE ROLE com commit explícito
-                    try:
-                        if user['rolpassword']:
-                            # Com senha
-                            create_query = text(f"""
-                                CREATE ROLE "{username}"
-                                WITH {attrs_str}
-                                PASSWORD :password
-                            """)
-                            conn.execute(create_query, {"password": user['rolpassword']})
-                        else:
-                            # Sem senha
-                            create_query = text(f'CREATE ROLE "{username}" WITH {attrs_str}')
-                            conn.execute(create_query)
-
-                        # CRÍTICO: Commit explícito para persistir usuário
-                        conn.commit()
-
-                        # Verificação imediata de criação
-                        verify_query = text(
-                            "SELECT rolname FROM pg_roles WHERE rolname = :username"
-                        )
-                        verify_result = conn.execute(
-                            verify_query, {"username": username}
-                        )
-                        if verify_result.fetchone():
-                            print(f"   ✅ Usuário {username} criado e verificado")
-                            created_count += 1
-                        else:
-                            print(f"   ❌ Usuário {username} não persistido")
+                    pending.append(user)
+
+                conn.commit()
+                progress_hub.set_total('roles', len(pending))
 
-                    except Exception as e:
-                        print(f"   ❌ Erro ao criar {username}: {e}")
+                if self.bulk_role_creation:
+                    for start in range(0, len(pending), self.role_batch_size):
+                        batch = pending[start:start + self.role_batch_size]
+                        created_count += self._create_roles_batch(conn, batch)
+                        progress_hub.advance('roles', len(batch), item=batch[-1]['rolname'])
+                else:
+                    for user in pending:
+                        if self._create_role_individually(conn, user):
+                            created_count += 1
+                        progress_hub.advance('roles', item=user['rolname'])
 
                 print(f"   🎯 {created_count} usuários criados")
                 return created_count
 
         except SQLAlchemyError as e:
             print(f"❌ Erro SQLAlchemy ao criar usuários: {e}")
+            ERRORS.inc(component='roles')
             return 0
 
     def create_databases_with_postgres_owner(self, databases: List[Dict]) -> int:
@@ -471,17 +628,19 @@ class SQLAlchemyPostgreSQLMigrator:
 
                 # Obter listas de proteção
                 _, protected_databases = self.get_protected_items()
+                progress_hub.set_total('databases', len(databases))
 
                 for db_info in databases:
                     db_name = db_info['datname']
+                    progress_hub.advance('databases', item=db_name)
 
                     # Verificação adicional de proteção para bancos existentes
                     if db_name in protected_databases:
-                        print(f"   🛡️ Banco {db_name} está protegido - pulando alteração de owner")
+                        logger.info("   🛡️ Banco %s está protegido - pulando alteração de owner", db_name)
                         continue
 
                     if db_name in existing_dbs:
-                        print(f"   ⚠️ Banco {db_name} já existe - verificando owner")
+                        logger.debug("   ⚠️ Banco %s já existe - verificando owner", db_name)
 
                         # Verificar e corrigir owner
                         owner_query = text("""
@@ -495,12 +654,13 @@ class SQLAlchemyPostgreSQLMigrator:
                         current_owner_row = owner_result.fetchone()
 
                         if current_owner_row and current_owner_row.rolname != 'postgres':
-                            print(f"   🔄 Alterando owner: {current_owner_row.rolname} → postgres")
+                            logger.info("   🔄 Alterando owner: %s → postgres", current_owner_row.rolname)
                             alter_query = text(f'ALTER DATABASE "{db_name}" OWNER TO postgres')
                             conn.execute(alter_query)
                             created_count += 1
+                            OBJECTS_PROCESSED.inc(kind='database')
                         else:
-                            print(f"   ✅ Owner já é postgres - OK")
+                            logger.debug("   ✅ Owner já é postgres - OK")
                         continue
 
                     # Criar banco com owner postgres
@@ -519,104 +679,197 @@ class SQLAlchemyPostgreSQLMigrator:
                     """)
 
                     conn.execute(create_query, {"conn_limit": db_info['datconnlimit']})
-                    print(f"   ✅ Banco {db_name} criado (owner: postgres)")
+                    logger.info("   ✅ Banco %s criado (owner: postgres)", db_name)
                     created_count += 1
+                    OBJECTS_PROCESSED.inc(kind='database')
 
                 print(f"   🎯 {created_count} bancos criados/corrigidos")
                 return created_count
 
         except SQLAlchemyError as e:
             print(f"❌ Erro SQLAlchemy ao criar bancos: {e}")
+            ERRORS.inc(component='databases')
             return 0
 
-    def apply_database_privileges(self, databases: List[Dict]) -> int:
-        """Aplica privilégios usando estratégia de comando individual para evitar transações abortadas."""
-        print("🔐 Aplicando privilégios nos bancos...")
+    def load_role_snapshot(self, conn=None) -> Set[str]:
+        """
+        Carrega (uma vez por execução) o conjunto de roles do destino.
+
+        O snapshot é mantido atualizado incrementalmente por
+        remember_role() conforme novos roles são criados.
+        """
+        if self._role_snapshot is None:
+            query = text("SELECT rolname FROM pg_roles")
+            if conn is not None:
+                roles = {row.rolname for row in conn.execute(query)}
+            else:
+                with self.dest_engine.connect() as snapshot_conn:
+                    roles = {row.rolname for row in snapshot_conn.execute(query)}
+            with self._role_lock:
+                self._role_snapshot = roles
+        return self._role_snapshot
+
+    def remember_role(self, rolname: str) -> None:
+        """Adiciona ao snapshot um role recém-criado no destino."""
+        with self._role_lock:
+            if self._role_snapshot is not None:
+                self._role_snapshot.add(rolname)
+
+    def reset_role_snapshot(self) -> None:
+        """Descarta o snapshot (próxima leitura consulta pg_roles)."""
+        with self._role_lock:
+            self._role_snapshot = None
+
+    @staticmethod
+    def _grant_query(db_name: str, privilege: str, username: str):
+        # Usar aspas apenas para identificadores que precisam
+        if username == "public":
+            return text(f'GRANT {privilege} ON DATABASE "{db_name}" TO public')
+        return text(f'GRANT {privilege} ON DATABASE "{db_name}" TO "{username}"')
+
+    def _apply_privilege(self, conn, db_name: str, privilege: str,
+                         username: str) -> bool:
+        """Aplica um privilégio isolado por SAVEPOINT na conexão do worker."""
+        try:
+            with conn.begin_nested():
+                conn.execute(self._grant_query(db_name, privilege, username))
+            OBJECTS_PROCESSED.inc(kind='grant')
+            return True
+        except Exception as e:
+            logger.error("     ❌ Erro %s para %s: %s", privilege, username, e)
+            ERRORS.inc(component='grants')
+            return False
 
-        privileges_applied = 0
-
-        def get_existing_users():
-            """Busca usuários existentes sempre atualizado (não usa cache)."""
-            try:
-                if not self.dest_engine:
-                    return set()
-                with self.dest_engine.connect() as conn:
-                    result = conn.execute(text("SELECT rolname FROM pg_roles"))
-                    users = {row.rolname for row in result}
-                    return users
-            except Exception as e:
-                print(f"     ❌ Erro ao buscar usuários: {e}")
-                return set()
-
-        def apply_privilege_safely(db_name: str, privilege: str, username: str) -> bool:
-            """Aplica um privilégio em conexão isolada."""
-            try:
-                if not self.dest_engine:
-                    return False
-                with self.dest_engine.connect() as conn:
-                    conn = conn.execution_options(autocommit=True)
-                    # Usar aspas apenas para identificadores que precisam
-                    if username == "public":
-                        grant_query = text(f'GRANT {privilege} ON DATABASE "{db_name}" TO public')
-                    else:
-                        grant_query = text(f'GRANT {privilege} ON DATABASE "{db_name}" TO "{username}"')
-                    conn.execute(grant_query)
-                    return True
-            except Exception as e:
-                print(f"     ❌ Erro {privilege} para {username}: {e}")
-                return False
+    def _database_grant_plan(self, db_info: Dict,
+                             existing_users: Set[str]) -> Tuple[List[Tuple[str, str]], List[str]]:
+        """
+        Lista os GRANTs de um banco, na ordem de aplicação.
+
+        Compartilhado pelos backends síncrono e assíncrono.
+
+        Returns:
+            Tupla (lista de (privilégio, usuário), avisos a exibir)
+        """
+        db_name = db_info['datname']
+        original_owner = db_info['owner']
+        notes: List[str] = []
 
+        # Privilégios padrão PUBLIC
+        grants = [("CONNECT", "public"), ("TEMPORARY", "public")]
+
+        # Privilégios para owner original
+        if original_owner != 'postgres' and original_owner != 'migration_user':
+            if original_owner in existing_users:
+                grants.append(("ALL", original_owner))
+            else:
+                notes.append(f"⚠️ Usuário {original_owner} não existe - pulando privilégios")
+
+        # Privilégios específicos da origem
         try:
-            # Buscar usuários existentes (sempre atualizado)
-            existing_users = get_existing_users()
-
-            for db_info in databases:
-                db_name = db_info['datname']
-                original_owner = db_info['owner']
-
-                print(f"   🔧 Configurando privilégios para {db_name}")
-
-                # Atualizar lista de usuários para cada banco
-                existing_users = get_existing_users()
-
-                # Privilégios padrão PUBLIC (aplicar separadamente)
-                if apply_privilege_safely(db_name, "CONNECT", "public"):
-                    privileges_applied += 1
-                if apply_privilege_safely(db_name, "TEMPORARY", "public"):
-                    privileges_applied += 1
-
-                # Privilégios para owner original
-                if original_owner != 'postgres' and original_owner != 'migration_user':
-                    if original_owner in existing_users:
-                        if apply_privilege_safely(db_name, "ALL", original_owner):
-                            print(f"     ✅ ALL → {original_owner}")
-                            privileges_applied += 1
-                    else:
-                        print(f"     ⚠️ Usuário {original_owner} não existe - pulando privilégios")
-
-                # Coletar e aplicar privilégios específicos da origem
-                try:
-                    db_privileges = self.get_database_privileges(db_name)
-                    skipped_users = 0
+            skipped_users = 0
+            for priv_info in self.get_database_privileges(db_name):
+                username = priv_info['username']
+
+                # Verificar se usuário existe (silenciosamente ignorar se não existe)
+                if username not in existing_users:
+                    skipped_users += 1
+                    continue
+
+                for privilege in priv_info['privileges']:
+                    grants.append((privilege, username))
 
-                    for priv_info in db_privileges:
-                        username = priv_info['username']
+            if skipped_users > 0:
+                notes.append(f"ℹ️ {skipped_users} usuários inexistentes ignorados")
 
-                        # Verificar se usuário existe (silenciosamente ignorar se não existe)
-                        if username not in existing_users:
-                            skipped_users += 1
-                            continue
+        except Exception as e:
+            notes.append(f"⚠️ Erro ao coletar privilégios específicos para {db_name}: {e}")
+
+        return grants, notes
+
+    def _apply_privileges_for_database(self, conn, db_info: Dict,
+                                       existing_users: Set[str]) -> int:
+        """Aplica os privilégios de um banco em uma transação (commit único)."""
+        db_name = db_info['datname']
+        applied = 0
+
+        logger.debug("   🔧 Configurando privilégios para %s", db_name)
+        grants, notes = self._database_grant_plan(db_info, existing_users)
 
-                        for privilege in priv_info['privileges']:
-                            if apply_privilege_safely(db_name, privilege, username):
-                                print(f"     ✅ {privilege} → {username}")
-                                privileges_applied += 1
+        with conn.begin():
+            # Cada GRANT em seu savepoint
+            for privilege, username in grants:
+                if self._apply_privilege(conn, db_name, privilege, username):
+                    if username != "public":
+                        logger.debug("     ✅ %s → %s", privilege, username)
+                    applied += 1
 
-                    if skipped_users > 0:
-                        print(f"     ℹ️ {skipped_users} usuários inexistentes ignorados")
+        for note in notes:
+            logger.info("     %s", note)
 
+        return applied
+
+    def _privileges_worker(self, db_queue: "queue.Queue[Dict]",
+                           existing_users: Set[str]) -> int:
+        """Worker com uma conexão persistente que consome bancos da fila."""
+        applied = 0
+        conn = self.dest_engine.connect()
+        try:
+            while True:
+                try:
+                    db_info = db_queue.get_nowait()
+                except queue.Empty:
+                    return applied
+
+                try:
+                    applied += self._apply_privileges_for_database(
+                        conn, db_info, existing_users)
                 except Exception as e:
-                    print(f"     ⚠️ Erro ao coletar privilégios específicos para {db_name}: {e}")
+                    logger.error("     ❌ Erro aplicando privilégios em %s: %s", db_info['datname'], e)
+                    if conn.invalidated or conn.closed:
+                        conn.close()
+                        conn = self.dest_engine.connect()
+                progress_hub.advance('privileges', item=db_info['datname'])
+        finally:
+            conn.close()
+
+    def apply_database_privileges(self, databases: List[Dict]) -> int:
+        """
+        Aplica privilégios dos bancos com conexões persistentes por worker.
+
+        Cada worker mantém uma conexão aberta durante toda a fase; cada GRANT
+        roda em seu SAVEPOINT (falhas não abortam a transação do banco) e
+        cada banco faz um único commit. Os roles existentes vêm do snapshot
+        da execução e as ACLs da origem são lidas antes das escritas, sem
+        consultas por banco.
+        """
+        print("🔐 Aplicando privilégios nos bancos...")
+
+        if not self.dest_engine:
+            return 0
+
+        # Normalmente já coletadas antes da fase 1 (migrate_all_users)
+        if self._privilege_index is None:
+            self.prefetch_database_privileges()
+
+        try:
+            existing_users = self.load_role_snapshot()
+        except Exception as e:
+            print(f"     ❌ Erro ao buscar usuários: {e}")
+            existing_users = set()
+
+        db_queue: "queue.Queue[Dict]" = queue.Queue()
+        for db_info in databases:
+            db_queue.put(db_info)
+        progress_hub.set_total('privileges', len(databases))
+
+        workers = max(1, min(self.privilege_workers, len(databases)))
+
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = [executor.submit(self._privileges_worker,
+                                           db_queue, existing_users)
+                           for _ in range(workers)]
+                privileges_applied = sum(future.result() for future in futures)
 
             print(f"   🎯 {privileges_applied} privilégios aplicados")
             return privileges_applied
@@ -628,6 +881,11 @@ class SQLAlchemyPostgreSQLMigrator:
     def migrate_all_users(self) -> bool:
         """Método para migração completa: usuários, bancos e permissões (usado pelo orquestrador)."""
         print("� Executando migração completa: usuários, bancos e permissões...")
+        configure_console_logging()
+
+        # Snapshot de roles e índice de ACLs de uma execução anterior não valem para esta
+        self.reset_role_snapshot()
+        self._privilege_index = None
 
         try:
             # 1. Carregar configurações e criar engines
@@ -640,10 +898,11 @@ class SQLAlchemyPostgreSQLMigrator:
                 print("❌ Falha ao criar engines de conexão")
                 return False
 
-            # 2. Coletar dados da origem
+            # 2. Coletar dados da origem (ACLs antes de qualquer escrita no destino)
             print("\n📊 Coletando dados da origem...")
             users = self.get_users_from_source()
             databases = self.get_databases_with_owners()
+            self.prefetch_database_privileges()
 
             # 2.1 Aplicar proteções de segurança
             print("\n🛡️ Aplicando filtros de proteção...")
@@ -693,6 +952,14 @@ class SQLAlchemyPostgreSQLMigrator:
             else:
                 print("⚠️ Nenhum privilégio para aplicar")
 
+            self.last_result = {
+                'users_found': len(users),
+                'users_created': users_created,
+                'databases_found': len(databases),
+                'databases_created': databases_created,
+                'privileges_applied': privileges_applied
+            }
+
             # Relatório final
             print(f"\n📊 RESUMO DA MIGRAÇÃO COMPLETA:")
             print(f"   👥 Usuários criados: {users_created}")
@@ -717,6 +984,11 @@ class SQLAlchemyPostgreSQLMigrator:
         print("="*80)
 
         start_time = time.time()
+        configure_console_logging()
+
+        # Snapshot de roles e índice de ACLs de uma execução anterior não valem para esta
+        self.reset_role_snapshot()
+        self._privilege_index = None
 
         try:
             # 1. Configurações e engines
@@ -727,9 +999,10 @@ class SQLAlchemyPostgreSQLMigrator:
             if not self.create_engines():
                 return False
 
-            # 2. Coletar dados da origem
+            # 2. Coletar dados da origem (ACLs antes de qualquer escrita no destino)
             users = self.get_users_from_source()
             databases = self.get_databases_with_owners()
+            self.prefetch_database_privileges()
 
             if not users or not databases:
                 print("❌ Dados insuficientes da origem")
@@ -0,0 +1 @@
+"""Monitoring components (métricas e telemetria da migração)."""
@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+"""
+Dashboard - Progresso ao vivo via server-sent events
+====================================================
+
+Servidor HTTP leve (porta 8080) com:
+- /        página que acompanha a migração no navegador
+- /events  stream SSE com transições de passos, progresso por fase
+           (roles, bancos, privilégios), vazão e ETA
+- /status  estado atual em JSON
+
+Os migrators só atualizam contadores no ProgressHub; uma única thread
+agrupa as mudanças a cada `flush_interval` segundos e envia um evento por
+intervalo a cada cliente, mantendo o custo de CPU baixo mesmo com milhares
+de objetos por segundo.
+
+Uso:
+    from app.monitoring.dashboard import progress_hub, start_dashboard_server
+
+    start_dashboard_server(8080)
+    progress_hub.set_total('databases', 120)
+    progress_hub.advance('databases', item='app_db')
+"""
+
+import json
+import queue
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+from app.monitoring.eta import remaining_seconds
+from app.monitoring.metrics import BYTES_COPIED, OBJECTS_PROCESSED, ROWS_COPIED
+
+DEFAULT_DASHBOARD_PORT = 8080
+DEFAULT_FLUSH_INTERVAL = 0.5
+HEARTBEAT_SECONDS = 15
+
+_PAGE = """<!DOCTYPE html>
+<html lang="pt-BR"><head><meta charset="utf-8"><title>Migração PostgreSQL</title>
+<style>body{font-family:sans-serif;margin:2em}td{padding:2px 12px}
+progress{width:300px}</style></head>
+<body><h2>Migração PostgreSQL</h2><p id="summary">Aguardando eventos...</p>
+<h3>Fases</h3><table id="phases"></table><h3>Passos</h3><table id="steps"></table>
+<script>
+// Nomes de bancos e passos vêm do servidor de origem: sempre como texto
+function fill(id, rows) {
+  const table = document.getElementById(id);
+  table.replaceChildren(...rows.map((cells) => {
+    const tr = document.createElement("tr");
+    for (const value of cells) {
+      const td = document.createElement("td");
+      if (value instanceof Node) td.appendChild(value); else td.textContent = value;
+      tr.appendChild(td);
+    }
+    return tr;
+  }));
+}
+const source = new EventSource("/events");
+source.addEventListener("progress", (e) => {
+  const s = JSON.parse(e.data);
+  const eta = s.eta_seconds == null ? "-" : Math.round(s.eta_seconds) + "s";
+  document.getElementById("summary").textContent =
+    `Decorrido: ${Math.round(s.elapsed_seconds)}s | ETA: ${eta} | ` +
+    `Objetos/s: ${s.throughput.objects_per_second} | Linhas/s: ${s.throughput.rows_per_second}`;
+  fill("phases", Object.entries(s.phases).map(([name, p]) => {
+    const bar = document.createElement("progress");
+    bar.max = p.total;
+    bar.value = p.done;
+    return [name, bar, `${p.done}/${p.total}`, p.item || ""];
+  }));
+  fill("steps", Object.entries(s.steps).map(([name, st]) =>
+    [name, st.status, st.duration == null ? "" : st.duration.toFixed(2) + "s"]));
+});
+</script></body></html>
+"""
+
+
+class ProgressHub:
+    """Estado de progresso compartilhado entre orquestrador, migrators e dashboard."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Recomeça o acompanhamento (nova execução)."""
+        with self._lock:
+            self.started_at = time.monotonic()
+            self._steps: Dict[str, Dict[str, Any]] = {}
+            self._phases: Dict[str, Dict[str, Any]] = {}
+            self._transitions: List[Dict[str, Any]] = []
+            self._step_started: Dict[str, float] = {}
+            self._plan: Optional[Dict[str, Any]] = None
+            self.version = 0
+
+    def set_plan(self, durations: Dict[str, float],
+                 depends_on: Dict[str, List[str]]) -> None:
+        """Duração prevista dos passos (DurationPredictor), base do ETA."""
+        with self._lock:
+            self._plan = {'durations': dict(durations), 'depends_on': dict(depends_on)}
+            self.version += 1
+
+    def step_changed(self, name: str, status: str, duration: Optional[float] = None) -> None:
+        """Registra a transição de um passo do orquestrador."""
+        with self._lock:
+            if status == 'running':
+                self._step_started[name] = time.monotonic()
+            self._steps[name] = {'status': status, 'duration': duration}
+            self._transitions.append({'step': name, 'status': status, 'duration': duration})
+            self.version += 1
+
+    def set_total(self, phase: str, total: int) -> None:
+        """Inicia uma fase (roles, databases, privileges) com `total` itens."""
+        with self._lock:
+            self._phases[phase] = {'done': 0, 'total': total, 'item': None,
+                                   'started_at': time.monotonic()}
+            self.version += 1
+
+    def add_total(self, phase: str, amount: int) -> None:
+        """Aumenta o total da fase (itens que chegam em lotes, ex.: streaming)."""
+        with self._lock:
+            progress = self._phases.setdefault(
+                phase, {'done': 0, 'total': 0, 'item': None, 'started_at': time.monotonic()})
+            progress['total'] += amount
+            self.version += 1
+
+    def advance(self, phase: str, amount: int = 1, item: Optional[str] = None) -> None:
+        """Avança a fase; `item` é o objeto mais recente (ex.: banco)."""
+        with self._lock:
+            progress = self._phases.setdefault(
+                phase, {'done': 0, 'total': 0, 'item': None, 'started_at': time.monotonic()})
+            progress['done'] += amount
+            if item is not None:
+                progress['item'] = item
+            self.version += 1
+
+    def drain_transitions(self) -> List[Dict[str, Any]]:
+        """Transições de passos desde a última chamada."""
+        with self._lock:
+            transitions, self._transitions = self._transitions, []
+            return transitions
+
+    def eta_seconds(self) -> Optional[float]:
+        """
+        Tempo restante. Com plano (set_plan): caminho crítico dos passos
+        restantes, usando para os passos em andamento a vazão medida das
+        fases; sem plano: a fase em andamento mais lenta.
+        """
+        now = time.monotonic()
+        estimates = []
+        with self._lock:
+            for progress in self._phases.values():
+                remaining = progress['total'] - progress['done']
+                elapsed = now - progress['started_at']
+                if remaining > 0 and progress['done'] > 0 and elapsed > 0:
+                    estimates.append(remaining / (progress['done'] / elapsed))
+            plan = self._plan
+            statuses = {name: state['status'] for name, state in self._steps.items()}
+            running = {name: now - started for name, started in self._step_started.items()
+                       if statuses.get(name) == 'running'}
+
+        measured = max(estimates) if estimates else None
+        if plan is None:
+            return measured
+        # As fases (roles, bancos, privilégios) pertencem ao passo em andamento
+        overrides = {name: measured for name in running} if measured is not None else {}
+        return remaining_seconds(plan['durations'], plan['depends_on'], statuses,
+                                 running, overrides)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Estado atual (passos, fases, decorrido e ETA)."""
+        with self._lock:
+            steps = {name: dict(state) for name, state in self._steps.items()}
+            phases = {name: {k: v for k, v in progress.items() if k != 'started_at'}
+                      for name, progress in self._phases.items()}
+            elapsed = time.monotonic() - self.started_at
+        return {
+            'steps': steps,
+            'phases': phases,
+            'elapsed_seconds': round(elapsed, 1),
+            'eta_seconds': self.eta_seconds()
+        }
+
+
+# Hub global do processo
+progress_hub = ProgressHub()
+
+
+class _ThroughputMeter:
+    """Vazão entre dois instantes, a partir dos contadores Prometheus."""
+
+    def __init__(self):
+        self._last = (time.monotonic(),) + self._totals()
+        self.rates = {'objects_per_second': 0.0, 'rows_per_second': 0.0,
+                      'bytes_per_second': 0.0}
+
+    @staticmethod
+    def _totals():
+        return OBJECTS_PROCESSED.total(), ROWS_COPIED.total(), BYTES_COPIED.total()
+
+    def sample(self) -> Dict[str, float]:
+        now = time.monotonic()
+        totals = self._totals()
+        elapsed = now - self._last[0]
+        if elapsed > 0:
+            objects, rows, size = (current - previous
+                                   for current, previous in zip(totals, self._last[1:]))
+            self.rates = {'objects_per_second': round(objects / elapsed, 1),
+                          'rows_per_second': round(rows / elapsed, 1),
+                          'bytes_per_second': round(size / elapsed, 1)}
+        self._last = (now,) + totals
+        return self.rates
+
+
+class DashboardServer:
+    """Servidor HTTP do dashboard, com uma thread de difusão dos eventos."""
+
+    def __init__(self, port: int = DEFAULT_DASHBOARD_PORT, host: str = "0.0.0.0",
+                 hub: ProgressHub = progress_hub,
+                 flush_interval: float = DEFAULT_FLUSH_INTERVAL):
+        self.hub = hub
+        self.flush_interval = flush_interval
+        self._clients: List["queue.SimpleQueue[Optional[bytes]]"] = []
+        self._clients_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._meter = _ThroughputMeter()
+
+        handler = type("DashboardHandler", (_DashboardHandler,), {"dashboard": self})
+        self._server = ThreadingHTTPServer((host, port), handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._threads = [
+            threading.Thread(target=self._server.serve_forever, name="dashboard", daemon=True),
+            threading.Thread(target=self._broadcast_loop, name="dashboard-sse", daemon=True)
+        ]
+
+    def start(self) -> "DashboardServer":
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stopped.set()
+        with self._clients_lock:
+            for client in self._clients:
+                client.put(None)
+        self._server.shutdown()
+        self._server.server_close()
+
+    def status(self) -> Dict[str, Any]:
+        snapshot = self.hub.snapshot()
+        snapshot['throughput'] = self._meter.rates
+        return snapshot
+
+    def _message(self) -> bytes:
+        """Um lote SSE: transições pendentes e o progresso atual."""
+        parts = [f"event: step\ndata: {json.dumps(transition)}\n\n"
+                 for transition in self.hub.drain_transitions()]
+        status = self.status()
+        parts.append(f"event: progress\ndata: {json.dumps(status)}\n\n")
+        return "".join(parts).encode("utf-8")
+
+    def _broadcast_loop(self) -> None:
+        version = -1
+        while not self._stopped.wait(self.flush_interval):
+            self._meter.sample()
+            if self.hub.version == version:
+                continue
+            version = self.hub.version
+            message = self._message()
+            with self._clients_lock:
+                for client in self._clients:
+                    client.put(message)
+
+    def subscribe(self) -> "queue.SimpleQueue[Optional[bytes]]":
+        client: "queue.SimpleQueue[Optional[bytes]]" = queue.SimpleQueue()
+        # Cliente novo recebe o estado atual de imediato
+        status = self.status()
+        client.put(f"event: progress\ndata: {json.dumps(status)}\n\n".encode("utf-8"))
+        with self._clients_lock:
+            self._clients.append(client)
+        return client
+
+    def unsubscribe(self, client) -> None:
+        with self._clients_lock:
+            if client in self._clients:
+                self._clients.remove(client)
+
+
+class _DashboardHandler(BaseHTTPRequestHandler):
+    dashboard: DashboardServer = None
+    protocol_version = "HTTP/1.1"
+
+    def _send(self, body: bytes, content_type: str) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        path = self.path.split("?")[0]
+        if path == "/":
+            self._send(_PAGE.encode("utf-8"), "text/html; charset=utf-8")
+        elif path == "/status":
+            self._send(json.dumps(self.dashboard.status()).encode("utf-8"),
+                       "application/json")
+        elif path == "/events":
+            self._stream()
+        else:
+            self.send_error(404)
+
+    def _stream(self) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        client = self.dashboard.subscribe()
+        try:
+            while True:
+                try:
+                    message = client.get(timeout=HEARTBEAT_SECONDS)
+                except queue.Empty:
+                    message = b": keep-alive\n\n"
+                if message is None:
+                    return
+                self.wfile.write(message)
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            self.dashboard.unsubscribe(client)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_server: Optional[DashboardServer] = None
+_server_lock = threading.Lock()
+
+
+def start_dashboard_server(port: int = DEFAULT_DASHBOARD_PORT,
+                           host: str = "0.0.0.0") -> Optional[DashboardServer]:
+    """
+    Inicia o dashboard (uma vez por processo).
+
+    Returns:
+        Servidor em execução, ou None se a porta não pôde ser aberta
+    """
+    global _server
+    with _server_lock:
+        if _server is not None:
+            return _server
+        try:
+            _server = DashboardServer(port, host).start()
+        except OSError as e:
+            print(f"⚠️ Dashboard indisponível na porta {port}: {e}")
+            return None
+        print(f"🖥️ Dashboard de progresso: http://{host}:{_server.port}/")
+        return _server
+
+
+def stop_dashboard_server() -> None:
+    """Para o dashboard iniciado por start_dashboard_server."""
+    global _server
+    with _server_lock:
+        if _server is not None:
+            _server.stop()
+            _server = None
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+ETA - Previsão de duração calibrada por execuções anteriores
+============================================================
+
+Antes da migração, estima a duração de cada passo a partir do volume da
+origem (roles, bancos e bytes, de get_databases_with_owners) e das durações
+registradas nos relatórios JSON de execuções anteriores
+(reports/migration_report_*.json). A taxa de cada passo (segundos por
+unidade do seu volume) é a mediana das execuções; o total respeita o DAG
+de passos (caminho crítico), já que passos independentes rodam em paralelo.
+
+Durante a execução, remaining_seconds recalcula o tempo restante com os
+passos já concluídos e a vazão medida do passo em andamento.
+
+Uso:
+    from app.monitoring.eta import DurationPredictor
+
+    predictor = DurationPredictor.from_reports("reports")
+    prediction = predictor.predict(steps, {'roles': 120, 'databases': 40, 'bytes': 5e9})
+    print(format_duration(prediction.total))
+"""
+
+import json
+import statistics
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Union
+
+# Volume que domina a duração de cada passo; passos ausentes têm duração fixa
+STEP_DRIVERS = {
+    'discover_source': 'roles',
+    'analyze_compatibility': 'roles',
+    'pre_migration_backup': 'bytes',
+    'execute_migration': 'objects',
+    'validate_migration': 'objects',
+    'test_connections': 'roles',
+}
+
+DEFAULT_HISTORY_LIMIT = 20
+
+
+def workload_units(workload: Mapping[str, float], driver: str) -> float:
+    """Unidades do volume `driver` (objects = roles + bancos)."""
+    if driver == 'objects':
+        return workload.get('roles', 0) + workload.get('databases', 0)
+    return workload.get(driver, 0)
+
+
+def _status_value(status) -> str:
+    # Relatórios antigos gravam o Enum como "MigrationStatus.SUCCESS"
+    return str(status).rsplit('.', 1)[-1].lower()
+
+
+def critical_path_seconds(durations: Mapping[str, float],
+                          depends_on: Mapping[str, Sequence[str]]) -> float:
+    """Duração total do DAG: o maior caminho de dependências."""
+    finish: Dict[str, float] = {}
+
+    def finish_time(name: str) -> float:
+        if name not in finish:
+            start = max((finish_time(dep) for dep in depends_on.get(name, ())
+                         if dep in durations), default=0.0)
+            finish[name] = start + durations[name]
+        return finish[name]
+
+    return max((finish_time(name) for name in durations), default=0.0)
+
+
+def remaining_seconds(durations: Mapping[str, float],
+                      depends_on: Mapping[str, Sequence[str]],
+                      statuses: Mapping[str, str],
+                      elapsed: Mapping[str, float],
+                      measured: Optional[Mapping[str, float]] = None) -> float:
+    """
+    Tempo restante da execução.
+
+    Args:
+        durations: Duração prevista de cada passo
+        depends_on: Dependências de cada passo
+        statuses: Status atual ('pending', 'running', 'success', ...)
+        elapsed: Tempo decorrido dos passos em execução
+        measured: Restante medido pela vazão dos passos em execução; tem
+            precedência sobre a previsão
+
+    Returns:
+        Segundos restantes pelo caminho crítico
+    """
+    measured = measured or {}
+    remaining = {}
+    for name, predicted in durations.items():
+        status = statuses.get(name, 'pending')
+        if status == 'pending':
+            remaining[name] = predicted
+        elif status == 'running':
+            if name in measured:
+                remaining[name] = measured[name]
+            else:
+                remaining[name] = max(predicted - elapsed.get(name, 0.0), 0.0)
+        else:
+            remaining[name] = 0.0
+    return critical_path_seconds(remaining, depends_on)
+
+
+def format_duration(seconds: Optional[float]) -> str:
+    """Duração legível: '1h 02m', '5m 20s', '12s'."""
+    if seconds is None:
+        return "desconhecida"
+    seconds = int(round(seconds))
+    hours, rest = divmod(seconds, 3600)
+    minutes, secs = divmod(rest, 60)
+    if hours:
+        return f"{hours}h {minutes:02d}m"
+    if minutes:
+        return f"{minutes}m {secs:02d}s"
+    return f"{secs}s"
+
+
+@dataclass
+class Prediction:
+    """Previsão de uma execução."""
+    durations: Dict[str, float]
+    depends_on: Dict[str, List[str]]
+    workload: Dict[str, float]
+    runs: int
+    unknown: List[str] = field(default_factory=list)
+
+    @property
+    def total(self) -> float:
+        return critical_path_seconds(self.durations, self.depends_on)
+
+
+class DurationPredictor:
+    """Estima a duração dos passos a partir do histórico de execuções."""
+
+    def __init__(self, history: Iterable[Mapping]):
+        """
+        Args:
+            history: Execuções anteriores, cada uma com 'workload' (pode ser
+                vazio) e 'steps' {passo: duração em segundos}
+        """
+        self.history = [run for run in history if run.get('steps')]
+
+    @classmethod
+    def from_reports(cls, *report_dirs: Union[str, Path],
+                     limit: int = DEFAULT_HISTORY_LIMIT) -> "DurationPredictor":
+        """Carrega as `limit` execuções mais recentes dos relatórios JSON."""
+        files = []
+        for report_dir in report_dirs:
+            files.extend(Path(report_dir).glob("migration_report_*.json"))
+        files.sort(key=lambda path: path.name, reverse=True)
+
+        history = []
+        for path in files:
+            if len(history) >= limit:
+                break
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    report = json.load(f)
+            except (OSError, ValueError):
+                continue
+            steps = {
+                step['name']: step['duration']
+                for step in report.get('steps') or []
+                if isinstance(step, dict) and step.get('duration')
+                and not step.get('cached') and _status_value(step.get('status')) == 'success'
+            }
+            history.append({'session_id': report.get('session_info', {}).get('session_id'),
+                            'workload': report.get('workload') or {},
+                            'steps': steps})
+        return cls(history)
+
+    def predict_step(self, name: str, workload: Mapping[str, float]) -> Optional[float]:
+        """Duração prevista do passo, ou None sem histórico."""
+        driver = STEP_DRIVERS.get(name)
+        samples = [run for run in self.history if name in run['steps']]
+        if not samples:
+            return None
+
+        if driver and workload_units(workload, driver) > 0:
+            # Segundos por unidade, das execuções que registraram o volume
+            rates = [run['steps'][name] / workload_units(run['workload'], driver)
+                     for run in samples if workload_units(run['workload'], driver) > 0]
+            if rates:
+                return statistics.median(rates) * workload_units(workload, driver)
+
+        return statistics.median(run['steps'][name] for run in samples)
+
+    def predict(self, steps: Mapping[str, Sequence[str]],
+                workload: Mapping[str, float]) -> Prediction:
+        """
+        Prevê a duração de cada passo e o total da execução.
+
+        Args:
+            steps: Passos e suas dependências (DAG do orquestrador)
+            workload: Volume da origem: roles, databases, bytes
+
+        Returns:
+            Previsão; passos sem histórico ficam em `unknown` (contam 0s)
+        """
+        durations, unknown = {}, []
+        for name in steps:
+            predicted = self.predict_step(name, workload)
+            if predicted is None:
+                unknown.append(name)
+                predicted = 0.0
+            durations[name] = predicted
+        return Prediction(durations, {name: list(deps) for name, deps in steps.items()},
+                          dict(workload), len(self.history), unknown)
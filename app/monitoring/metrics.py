@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Metrics - Exportador Prometheus embutido
+========================================
+
+Métricas da migração em memória (thread-safe) servidas no formato texto do
+Prometheus em http://<host>:9090/metrics por uma thread HTTP própria, sem
+dependências externas. Contadores são acumulados; a taxa por segundo
+(linhas, bytes, objetos) é obtida no Grafana com rate().
+
+Uso:
+    from app.monitoring.metrics import OBJECTS_PROCESSED, start_metrics_server
+
+    server = start_metrics_server(9090)
+    OBJECTS_PROCESSED.inc(kind='role')
+"""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_METRICS_PORT = 9090
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Metric:
+    """Contador ou gauge com rótulos."""
+
+    def __init__(self, name: str, documentation: str, metric_type: str,
+                 labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.type = metric_type
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name}: rótulos esperados {self.labelnames}, "
+                             f"recebidos {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        if self.type == "counter" and amount < 0:
+            raise ValueError(f"{self.name}: contador não pode diminuir")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        if self.type != "gauge":
+            raise ValueError(f"{self.name}: apenas gauges podem diminuir")
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels) -> None:
+        if self.type != "gauge":
+            raise ValueError(f"{self.name}: apenas gauges aceitam set()")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def total(self) -> float:
+        """Soma de todas as séries (todos os rótulos)."""
+        with self._lock:
+            return sum(self._values.values())
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {_escape(self.documentation)}",
+                 f"# TYPE {self.name} {self.type}"]
+        with self._lock:
+            values = sorted(self._values.items())
+        if not values and not self.labelnames:
+            values = [((), 0)]
+        for key, value in values:
+            labels = ",".join(f'{name}="{_escape(label)}"'
+                              for name, label in zip(self.labelnames, key))
+            suffix = f"{{{labels}}}" if labels else ""
+            lines.append(f"{self.name}{suffix} {value:g}")
+        return lines
+
+
+class MetricsRegistry:
+    """Conjunto de métricas exportadas."""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, name: str, documentation: str, metric_type: str,
+                  labelnames: Iterable[str]) -> Metric:
+        with self._lock:
+            if name not in self._metrics:
+                self._metrics[name] = Metric(name, documentation, metric_type, labelnames)
+            return self._metrics[name]
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Metric:
+        return self._register(name, documentation, "counter", labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Metric:
+        return self._register(name, documentation, "gauge", labelnames)
+
+    def reset(self) -> None:
+        """Zera todas as métricas (testes e execuções repetidas no mesmo processo)."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            metric.clear()
+
+    def render(self) -> str:
+        """Todas as métricas no formato texto do Prometheus."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Registro global do processo
+registry = MetricsRegistry()
+
+STEP_DURATION = registry.gauge(
+    "migration_step_duration_seconds", "Duração da última execução de cada passo", ("step",))
+STEPS_TOTAL = registry.counter(
+    "migration_steps_total", "Passos finalizados por status", ("step", "status"))
+OBJECTS_PROCESSED = registry.counter(
+    "migration_objects_processed_total", "Roles, bancos e GRANTs aplicados no destino",
+    ("kind",))
+ROWS_COPIED = registry.counter(
+    "migration_rows_copied_total", "Linhas copiadas (COPY) para o destino")
+BYTES_COPIED = registry.counter(
+    "migration_bytes_copied_total", "Bytes de dados COPY enviados ao destino")
+ACTIVE_CONNECTIONS = registry.gauge(
+    "migration_active_connections", "Conexões em uso por servidor", ("server",))
+ERRORS = registry.counter(
+    "migration_errors_total", "Erros por componente", ("component",))
+
+
+def instrument_engine(engine, server: Optional[str] = None) -> None:
+    """
+    Acompanha as conexões em uso de um engine SQLAlchemy (checkout/checkin).
+
+    Args:
+        engine: Engine SQLAlchemy
+        server: Rótulo do servidor (padrão: host:porta da URL)
+    """
+    from sqlalchemy import event
+
+    if server is None:
+        server = f"{engine.url.host}:{engine.url.port or 5432}"
+
+    def checkout(dbapi_connection, connection_record, connection_proxy):
+        ACTIVE_CONNECTIONS.inc(server=server)
+
+    def checkin(dbapi_connection, connection_record):
+        ACTIVE_CONNECTIONS.dec(server=server)
+
+    event.listen(engine, "checkout", checkout)
+    event.listen(engine, "checkin", checkin)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry: MetricsRegistry = registry
+
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = self.registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Scrapes periódicos não devem poluir o console da migração
+        pass
+
+
+class MetricsServer:
+    """Servidor HTTP do /metrics em uma thread daemon."""
+
+    def __init__(self, port: int = DEFAULT_METRICS_PORT, host: str = "0.0.0.0",
+                 metrics: MetricsRegistry = registry):
+        handler = type("MetricsHandler", (_MetricsHandler,), {"registry": metrics})
+        self._server = ThreadingHTTPServer((host, port), handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever,
+                                        name="metrics", daemon=True)
+
+    def start(self) -> "MetricsServer":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+_server: Optional[MetricsServer] = None
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(port: int = DEFAULT_METRICS_PORT,
+                         host: str = "0.0.0.0") -> Optional[MetricsServer]:
+    """
+    Inicia o exportador (uma vez por processo).
+
+    Returns:
+        Servidor em execução, ou None se a porta não pôde ser aberta
+    """
+    global _server
+    with _server_lock:
+        if _server is not None:
+            return _server
+        try:
+            _server = MetricsServer(port, host).start()
+        except OSError as e:
+            print(f"⚠️ Métricas Prometheus indisponíveis na porta {port}: {e}")
+            return None
+        print(f"📈 Métricas Prometheus: http://{host}:{_server.port}/metrics")
+        return _server
+
+
+def stop_metrics_server() -> None:
+    """Para o exportador iniciado por start_metrics_server."""
+    global _server
+    with _server_lock:
+        if _server is not None:
+            _server.stop()
+            _server = None
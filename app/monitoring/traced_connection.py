@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Traced Connection - Conexões psycopg2 com spans de tracing
+==========================================================
+
+Separado de app.monitoring.tracing para que apenas quem abre conexões
+psycopg2 diretamente (extrator e executor) carregue o psycopg2.
+
+Uso:
+    import psycopg2
+    from app.monitoring.traced_connection import TracedConnection
+
+    conn = psycopg2.connect(dsn, connection_factory=TracedConnection)
+"""
+
+import psycopg2
+import psycopg2.extensions
+
+from app.monitoring.tracing import active_tracer, sql_args, sql_label
+
+
+class TracedCursor(psycopg2.extensions.cursor):
+    """Cursor psycopg2 com um span por ida ao servidor."""
+
+    def execute(self, query, vars=None):
+        tracer = active_tracer()
+        if tracer is None:
+            return super().execute(query, vars)
+        with tracer.span(sql_label(query), "sql", **sql_args(query)):
+            return super().execute(query, vars)
+
+    def executemany(self, query, vars_list):
+        tracer = active_tracer()
+        if tracer is None:
+            return super().executemany(query, vars_list)
+        with tracer.span(sql_label(query), "sql", **sql_args(query)):
+            return super().executemany(query, vars_list)
+
+    def copy_expert(self, sql, file, size=8192):
+        tracer = active_tracer()
+        if tracer is None:
+            return super().copy_expert(sql, file, size)
+        with tracer.span("COPY", "sql", **sql_args(sql)):
+            return super().copy_expert(sql, file, size)
+
+
+class TracedConnection(psycopg2.extensions.connection):
+    """
+    Conexão psycopg2 que registra o tempo de estabelecimento da conexão
+    e cria cursores TracedCursor. Use com psycopg2.connect(...,
+    connection_factory=TracedConnection), inclusive em pools.
+    """
+
+    def __init__(self, dsn, *args, **kwargs):
+        tracer = active_tracer()
+        if tracer is None:
+            super().__init__(dsn, *args, **kwargs)
+        else:
+            params = psycopg2.extensions.parse_dsn(dsn)
+            with tracer.span("connect", "connection", host=params.get('host'),
+                             database=params.get('dbname')):
+                super().__init__(dsn, *args, **kwargs)
+        self.cursor_factory = TracedCursor
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Tracing - Spans da migração no formato Chrome trace
+===================================================
+
+Fases, passos do orquestrador, conexões e idas ao servidor (SQL) viram spans
+com relação pai/filho. O arquivo exportado (JSON "Trace Event Format") abre
+em chrome://tracing, https://ui.perfetto.dev e speedscope, mostrando onde o
+tempo de relógio é gasto - inclusive esperas no estabelecimento de conexões.
+
+O pai de cada span vem de um contextvar; threads de trabalho herdam o span
+corrente quando a tarefa é submetida com contextvars.copy_context().run.
+Com o tracing desligado, span() não registra nada.
+
+Uso:
+    from app.monitoring.tracing import span, start_tracing, stop_tracing
+
+    start_tracing()
+    with span("phase_1_extraction", "phase"):
+        ...
+    stop_tracing("reports/trace.json")
+
+Conexões psycopg2 instrumentadas ficam em app.monitoring.traced_connection,
+para que este módulo não carregue o psycopg2.
+"""
+
+import contextvars
+import functools
+import itertools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Union
+
+_current_span: "contextvars.ContextVar[Optional[Span]]" = contextvars.ContextVar(
+    "migration_current_span", default=None)
+
+
+class Span:
+    """Intervalo de tempo aberto por Tracer.begin e fechado por end()."""
+
+    __slots__ = ("tracer", "name", "category", "args", "span_id", "parent",
+                 "start", "tid", "_token")
+
+    def __init__(self, tracer: "Tracer", name: str, category: str,
+                 args: Dict[str, Any], parent: Optional["Span"]):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.args = args
+        self.span_id = next(tracer._ids)
+        self.parent = parent
+        self.tid = threading.get_native_id()
+        self.start = tracer._clock()
+        self._token = _current_span.set(self)
+
+    def end(self, error: Optional[BaseException] = None) -> None:
+        """Fecha o span e restaura o span pai no contexto."""
+        end = self.tracer._clock()
+        try:
+            _current_span.reset(self._token)
+        except ValueError:
+            # Fechado em outro contexto (ex.: eventos de outra thread)
+            _current_span.set(self.parent)
+        if error is not None:
+            self.args['error'] = f"{type(error).__name__}: {error}"
+        self.tracer._record(self, end)
+
+
+class Tracer:
+    """Coleta spans em memória e exporta no formato Chrome trace."""
+
+    def __init__(self, clock: Callable[[], int] = time.perf_counter_ns):
+        self._clock = clock
+        self._origin = clock()
+        self._ids = itertools.count(1)
+        self._events: List[Dict[str, Any]] = []
+        self._threads: Dict[int, str] = {}
+        self._lock = threading.Lock()
+
+    def begin(self, name: str, category: str = "function", **args) -> Span:
+        """Abre um span filho do span corrente (feche com end())."""
+        return Span(self, name, category, args, _current_span.get())
+
+    @contextmanager
+    def span(self, name: str, category: str = "function", **args):
+        current = self.begin(name, category, **args)
+        try:
+            yield current
+        except BaseException as e:
+            current.end(e)
+            raise
+        else:
+            current.end()
+
+    def _us(self, timestamp: int) -> float:
+        return (timestamp - self._origin) / 1000
+
+    def _record(self, span: Span, end: int) -> None:
+        args = dict(span.args, span_id=span.span_id)
+        if span.parent is not None:
+            args['parent_id'] = span.parent.span_id
+        event = {"name": span.name, "cat": span.category, "ph": "X",
+                 "ts": self._us(span.start), "dur": self._us(end) - self._us(span.start),
+                 "pid": os.getpid(), "tid": span.tid, "args": args}
+
+        events = [event]
+        if span.parent is not None and span.parent.tid != span.tid:
+            # Seta do span pai (outra thread) até o filho nos visualizadores
+            flow = {"name": "spawn", "cat": "flow", "id": span.span_id,
+                    "ts": event["ts"], "pid": event["pid"]}
+            events.append(dict(flow, ph="s", tid=span.parent.tid))
+            events.append(dict(flow, ph="f", bp="e", tid=span.tid))
+
+        with self._lock:
+            self._threads.setdefault(span.tid, threading.current_thread().name)
+            self._events.extend(events)
+
+    def events(self) -> List[Dict[str, Any]]:
+        """Eventos registrados, com os nomes das threads."""
+        with self._lock:
+            events = list(self._events)
+            threads = dict(self._threads)
+        metadata = [{"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": tid,
+                     "args": {"name": name}} for tid, name in sorted(threads.items())]
+        return metadata + events
+
+    def export(self, path: Union[str, Path]) -> str:
+        """Grava o trace JSON (chrome://tracing, Perfetto, speedscope)."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({"traceEvents": self.events(), "displayTimeUnit": "ms"}, f)
+        return str(path)
+
+
+_tracer: Optional[Tracer] = None
+
+
+def start_tracing() -> Tracer:
+    """Liga o tracing do processo (idempotente)."""
+    global _tracer
+    if _tracer is None:
+        _tracer = Tracer()
+    return _tracer
+
+
+def stop_tracing(path: Optional[Union[str, Path]] = None) -> Optional[str]:
+    """
+    Desliga o tracing e exporta os spans coletados.
+
+    Returns:
+        Caminho do arquivo gravado, ou None se nada foi exportado
+    """
+    global _tracer
+    tracer, _tracer = _tracer, None
+    if tracer is None or path is None:
+        return None
+    return tracer.export(path)
+
+
+def active_tracer() -> Optional[Tracer]:
+    return _tracer
+
+
+def span(name: str, category: str = "function", **args):
+    """Context manager do span (sem efeito com o tracing desligado)."""
+    tracer = _tracer
+    if tracer is None:
+        return nullcontext()
+    return tracer.span(name, category, **args)
+
+
+def traced(name: Optional[str] = None, category: str = "function"):
+    """Decorator: cada chamada da função vira um span."""
+    def decorator(func):
+        span_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name, category):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def sql_label(sql) -> str:
+    """Nome curto do span SQL: o primeiro comando do texto."""
+    if isinstance(sql, bytes):
+        sql = sql.decode('utf-8', 'replace')
+    words = str(sql).split(None, 2)
+    if not words:
+        return "SQL"
+    if words[0].upper() in ("CREATE", "DROP", "ALTER") and len(words) > 1:
+        return f"{words[0]} {words[1]}".upper()
+    return words[0].upper()
+
+
+def sql_args(sql) -> Dict[str, Any]:
+    """Argumentos do span SQL (texto do statement truncado)."""
+    if isinstance(sql, bytes):
+        sql = sql.decode('utf-8', 'replace')
+    return {"statement": str(sql)[:500]}
+
+
+def trace_engine(engine) -> None:
+    """
+    Spans de conexão e de cada statement de um engine SQLAlchemy.
+
+    Args:
+        engine: Engine SQLAlchemy
+    """
+    from sqlalchemy import event
+
+    server = f"{engine.url.host}:{engine.url.port or 5432}"
+
+    @event.listens_for(engine, "do_connect")
+    def do_connect(dialect, conn_rec, cargs, cparams):
+        tracer = _tracer
+        if tracer is None:
+            return None
+        with tracer.span("connect", "connection", host=server,
+                         database=engine.url.database):
+            return dialect.connect(*cargs, **cparams)
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        tracer = _tracer
+        if tracer is not None:
+            conn.info.setdefault('trace_spans', []).append(
+                tracer.begin(sql_label(statement), "sql", server=server,
+                             **sql_args(statement)))
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        spans = conn.info.get('trace_spans')
+        if spans:
+            spans.pop().end()
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(exception_context):
+        conn = exception_context.connection
+        spans = conn.info.get('trace_spans') if conn is not None else None
+        if spans:
+            spans.pop().end(exception_context.original_exception)
@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Fleet Runner - Migração de vários pares origem→destino
+======================================================
+
+Executa a migração (usuários, bancos e privilégios) de uma lista de pares
+de servidores em paralelo, sob limites globais:
+- workers: pares migrando ao mesmo tempo
+- connections_per_destination: conexões simultâneas em cada destino
+  (pares que compartilham um destino dividem a cota)
+- bandwidth_mbps: volume de SQL enviado por segundo, somando todos os pares
+
+Ao final grava um relatório agregado em reports/fleet_report_<ts>.json.
+
+Uso:
+    python -m app.orchestrators.fleet_runner config/fleet_config.example.json
+"""
+
+import argparse
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+# Adicionar diretório do projeto ao Python path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.monitoring.metrics import DEFAULT_METRICS_PORT, start_metrics_server  # noqa: E402
+from components.config_normalizer import normalize_server_config  # noqa: E402
+
+DEFAULT_FLEET_WORKERS = 4
+DEFAULT_CONNECTIONS_PER_DESTINATION = 8
+
+
+class TokenBucket:
+    """
+    Limitador de taxa (bytes/s) compartilhado entre threads.
+
+    Permite rajadas de até `capacity` bytes; pedidos maiores que a
+    capacidade são atendidos em partes.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        """
+        Args:
+            rate: Bytes por segundo (0 ou menos desativa o limite)
+            capacity: Tamanho máximo da rajada (padrão: 1 segundo de taxa)
+        """
+        self.rate = rate
+        self.capacity = capacity or rate
+        self._tokens = self.capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+        self.waited = 0.0
+
+    def consume(self, amount: float) -> None:
+        """Bloqueia até que `amount` bytes possam ser enviados."""
+        if self.rate <= 0:
+            return
+
+        while amount > 0:
+            with self._lock:
+                now = self._clock()
+                self._tokens = min(self.capacity,
+                                   self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+
+                chunk = min(amount, self.capacity)
+                if self._tokens >= chunk:
+                    self._tokens -= chunk
+                    amount -= chunk
+                    continue
+                delay = (chunk - self._tokens) / self.rate
+
+            self.waited += delay
+            self._sleep(delay)
+
+
+class ConnectionBudget:
+    """Cota de conexões por destino; cada par reserva várias de uma vez."""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._in_use: Dict[str, int] = {}
+        self._condition = threading.Condition()
+
+    def acquire(self, destination: str, connections: int) -> None:
+        connections = min(connections, self.capacity)
+        with self._condition:
+            self._condition.wait_for(
+                lambda: self._in_use.get(destination, 0) + connections <= self.capacity)
+            self._in_use[destination] = self._in_use.get(destination, 0) + connections
+
+    def release(self, destination: str, connections: int) -> None:
+        connections = min(connections, self.capacity)
+        with self._condition:
+            self._in_use[destination] -= connections
+            self._condition.notify_all()
+
+    def in_use(self, destination: str) -> int:
+        with self._condition:
+            return self._in_use.get(destination, 0)
+
+
+def destination_key(config: Dict) -> str:
+    """Identifica o servidor de destino (host:porta)."""
+    server = normalize_server_config(config)
+    return f"{server['host']}:{server['port']}"
+
+
+def _load_json(path: str) -> Dict:
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _default_migrator_factory(source_config: Dict, dest_config: Dict):
+    from app.core.sqlalchemy_migration import SQLAlchemyPostgreSQLMigrator
+    return SQLAlchemyPostgreSQLMigrator(source_config, dest_config)
+
+
+class FleetRunner:
+    """Migra uma frota de pares origem→destino sob limites globais."""
+
+    def __init__(self, pairs: List[Dict[str, Any]],
+                 workers: int = DEFAULT_FLEET_WORKERS,
+                 connections_per_destination: int = DEFAULT_CONNECTIONS_PER_DESTINATION,
+                 bandwidth_mbps: float = 0.0,
+                 reports_dir: str = "reports",
+                 migrator_factory: Callable[[Dict, Dict], Any] = _default_migrator_factory):
+        """
+        Args:
+            pairs: Pares com 'name', 'source' e 'destination' (caminho do
+                JSON de configuração ou o próprio dicionário)
+            workers: Pares migrando ao mesmo tempo
+            connections_per_destination: Conexões simultâneas por destino
+            bandwidth_mbps: Limite global de SQL enviado (0 = sem limite)
+            reports_dir: Diretório do relatório agregado
+            migrator_factory: Cria o migrator de um par (source, dest)
+        """
+        self.pairs = pairs
+        self.workers = workers
+        self.connections_per_destination = connections_per_destination
+        self.bandwidth = TokenBucket(bandwidth_mbps * 1024 * 1024 / 8)
+        self.budget = ConnectionBudget(connections_per_destination)
+        self.reports_dir = reports_dir
+        self.migrator_factory = migrator_factory
+        self.results: List[Dict[str, Any]] = []
+        self._results_lock = threading.Lock()
+
+    @classmethod
+    def from_file(cls, fleet_file: str, **overrides) -> "FleetRunner":
+        """Cria o runner a partir do JSON da frota (limites podem ser sobrescritos)."""
+        fleet = _load_json(fleet_file)
+        limits = dict(fleet.get('limits', {}))
+        limits.update({k: v for k, v in overrides.items() if v is not None})
+        return cls(fleet['pairs'], **limits)
+
+    def _connections_for_pair(self, migrator) -> int:
+        """Conexões de destino do par: pool limitado à cota do destino."""
+        connections = min(self.connections_per_destination,
+                          getattr(migrator, 'privilege_workers', 4) + 1)
+        migrator.pool_size = connections
+        migrator.max_overflow = 0
+        migrator.privilege_workers = max(1, connections - 1)
+        return connections
+
+    def _throttle_engines(self, migrator) -> None:
+        """Desconta do limite global o SQL enviado pelos engines do par."""
+        if self.bandwidth.rate <= 0:
+            return
+
+        from sqlalchemy import event
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            self.bandwidth.consume(len(statement) + len(repr(parameters or '')))
+
+        for engine in (migrator.source_engine, migrator.dest_engine):
+            if engine is not None:
+                event.listen(engine, "before_cursor_execute", before_cursor_execute)
+
+    def run_pair(self, pair: Dict[str, Any]) -> Dict[str, Any]:
+        """Migra um par, respeitando a cota de conexões do destino."""
+        name = pair.get('name') or f"{pair['source']}→{pair['destination']}"
+        result: Dict[str, Any] = {'name': name, 'status': 'failed'}
+        start = time.perf_counter()
+
+        try:
+            source = pair['source'] if isinstance(pair['source'], dict) else _load_json(pair['source'])
+            dest = (pair['destination'] if isinstance(pair['destination'], dict)
+                    else _load_json(pair['destination']))
+            destination = destination_key(dest)
+            result['destination'] = destination
+
+            migrator = self.migrator_factory(source, dest)
+            connections = self._connections_for_pair(migrator)
+
+            self.budget.acquire(destination, connections)
+            try:
+                result['started_at'] = datetime.now().isoformat()
+                print(f"🚚 [{name}] iniciando ({connections} conexões em {destination})")
+
+                original_create_engines = migrator.create_engines
+
+                def create_engines():
+                    created = original_create_engines()
+                    if created:
+                        self._throttle_engines(migrator)
+                    return created
+
+                migrator.create_engines = create_engines
+                success = migrator.migrate_all_users()
+            finally:
+                self.budget.release(destination, connections)
+                for engine in (getattr(migrator, 'source_engine', None),
+                               getattr(migrator, 'dest_engine', None)):
+                    if engine is not None:
+                        engine.dispose()
+
+            result.update(getattr(migrator, 'last_result', {}) or {})
+            result['status'] = 'success' if success else 'failed'
+
+        except Exception as e:
+            result['error'] = str(e)
+
+        result['duration'] = round(time.perf_counter() - start, 3)
+        icon = "✅" if result['status'] == 'success' else "❌"
+        print(f"{icon} [{name}] {result['status']} em {result['duration']:.1f}s")
+
+        with self._results_lock:
+            self.results.append(result)
+        return result
+
+    def run(self) -> Dict[str, Any]:
+        """Executa todos os pares e grava o relatório agregado."""
+        print(f"🚀 Frota: {len(self.pairs)} pares, {self.workers} workers, "
+              f"{self.connections_per_destination} conexões por destino")
+        start = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=self.workers,
+                                thread_name_prefix="fleet") as executor:
+            list(executor.map(self.run_pair, self.pairs))
+
+        return self.write_report(time.perf_counter() - start)
+
+    def summary(self, elapsed: float) -> Dict[str, Any]:
+        """Consolida os resultados dos pares."""
+        totals: Dict[str, int] = {}
+        for result in self.results:
+            for key in ('users_created', 'databases_created', 'privileges_applied'):
+                totals[key] = totals.get(key, 0) + result.get(key, 0)
+
+        serial = sum(result['duration'] for result in self.results)
+        return {
+            'pairs': len(self.pairs),
+            'succeeded': sum(1 for r in self.results if r['status'] == 'success'),
+            'failed': sum(1 for r in self.results if r['status'] != 'success'),
+            'elapsed_seconds': round(elapsed, 3),
+            'serial_seconds': round(serial, 3),
+            'speedup': round(serial / elapsed, 2) if elapsed else 0.0,
+            'bandwidth_wait_seconds': round(self.bandwidth.waited, 3),
+            'limits': {
+                'workers': self.workers,
+                'connections_per_destination': self.connections_per_destination,
+                'bandwidth_bytes_per_second': self.bandwidth.rate
+            },
+            'totals': totals,
+            'results': sorted(self.results, key=lambda r: r['name'])
+        }
+
+    def write_report(self, elapsed: float) -> Dict[str, Any]:
+        summary = self.summary(elapsed)
+        report_dir = Path(self.reports_dir)
+        report_dir.mkdir(parents=True, exist_ok=True)
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        report_file = report_dir / f"fleet_report_{timestamp}.json"
+
+        with open(report_file, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2, ensure_ascii=False)
+
+        print("\n📊 RELATÓRIO DA FROTA")
+        print(f"   ✅ {summary['succeeded']}/{summary['pairs']} pares migrados "
+              f"em {summary['elapsed_seconds']:.1f}s "
+              f"(sequencial: {summary['serial_seconds']:.1f}s, {summary['speedup']:.1f}x)")
+        for result in summary['results']:
+            if result['status'] != 'success':
+                print(f"   ❌ {result['name']}: {result.get('error', 'falhou')}")
+        print(f"   📄 Relatório: {report_file}")
+
+        summary['report_file'] = str(report_file)
+        return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migração de uma frota de servidores")
+    parser.add_argument("fleet_file", help="JSON com 'pairs' e 'limits'")
+    parser.add_argument("--workers", type=int, help="Pares migrando ao mesmo tempo")
+    parser.add_argument("--connections-per-destination", type=int,
+                        help="Conexões simultâneas por servidor de destino")
+    parser.add_argument("--bandwidth-mbps", type=float,
+                        help="Limite global de SQL enviado (Mbit/s)")
+    parser.add_argument("--metrics-port", type=int, default=DEFAULT_METRICS_PORT,
+                        help="Porta do exportador Prometheus (0 desativa)")
+    args = parser.parse_args()
+
+    if args.metrics_port:
+        start_metrics_server(args.metrics_port)
+
+    runner = FleetRunner.from_file(
+        args.fleet_file,
+        workers=args.workers,
+        connections_per_destination=args.connections_per_destination,
+        bandwidth_mbps=args.bandwidth_mbps)
+    summary = runner.run()
+    return 0 if summary['failed'] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
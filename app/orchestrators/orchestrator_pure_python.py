@@ -16,23 +16,30 @@ import sys
 import json
 import time
 import logging
+import threading
 import argparse
 import traceback
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Any, Optional, Tuple, Union
+from collections import deque
+from typing import Deque, Dict, List, Any, Optional, Tuple, Union
 from dataclasses import dataclass, asdict
 from enum import Enum
-import colorama
-from colorama import Fore, Back, Style
-
-# Inicializar colorama para cores no terminal
-colorama.init(autoreset=True)
-
 # Adicionar diretório do projeto ao Python path
 project_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(project_root))
 
+from components.lazy_imports import load_attribute, module_available
+from components.logging_utils import (attach_queue_handler, detach_queue_handler,
+                                      rotating_file_handler)
+from app.orchestrators.step_scheduler import DEFAULT_STEP_WORKERS, StepScheduler
+from app.orchestrators.run_state import RUN_STATE_FILE, RunStateStore, inputs_hash
+from app.monitoring.dashboard import DEFAULT_DASHBOARD_PORT, progress_hub, start_dashboard_server
+from app.monitoring.eta import DurationPredictor, Prediction, format_duration
+from app.monitoring.tracing import active_tracer, span, start_tracing
+from app.monitoring.metrics import (DEFAULT_METRICS_PORT, ERRORS, STEP_DURATION, STEPS_TOTAL,
+                                    start_metrics_server)
+
 class MigrationStatus(Enum):
     """Estados possíveis da migração."""
     PENDING = "pending"
@@ -64,15 +71,73 @@ class MigrationStep:
     error_message: Optional[str] = None
     result_data: Optional[Dict] = None
     logs: List[str] = None
+    depends_on: List[str] = None
+    cacheable: bool = False
+    inputs_hash: Optional[str] = None
+    cached: bool = False
 
     def __post_init__(self):
         if self.logs is None:
             self.logs = []
+        if self.depends_on is None:
+            self.depends_on = []
+
+_colors = None
+
+
+def _terminal_colors():
+    """Importa e inicializa o colorama só na primeira mensagem colorida."""
+    global _colors
+    if _colors is None:
+        import colorama
+        # Inicializar colorama para cores no terminal
+        colorama.init(autoreset=True)
+        _colors = (colorama.Fore, colorama.Style)
+    return _colors
+
+
+# Entradas mantidas em memória para o relatório (as mais recentes)
+DEFAULT_LOG_BUFFER_SIZE = 1000
+
+
+class _ConsoleFormatter(logging.Formatter):
+    """Formata registros para o console com cor e ícone por nível."""
+
+    _levels = {
+        'DEBUG': LogLevel.DEBUG,
+        'INFO': LogLevel.INFO,
+        'WARNING': LogLevel.WARNING,
+        'ERROR': LogLevel.ERROR,
+        'CRITICAL': LogLevel.CRITICAL
+    }
+
+    def format(self, record: logging.LogRecord) -> str:
+        level = getattr(record, 'migration_level', None) or self._levels.get(record.levelname,
+                                                                             LogLevel.INFO)
+        return MigrationLogger._format_console_message(level, record.getMessage())
 
-class MigrationLogger:
-    """Sistema de logging avançado para migração."""
 
-    def __init__(self, log_dir: Path, session_id: str):
+class MigrationLogger:
+    """
+    Sistema de logging avançado para migração.
+
+    Arquivo (com rotação por tamanho) e console são escritos por uma thread
+    própria (QueueListener); em memória ficam só as últimas `buffer_size`
+    entradas e contadores por nível.
+    """
+
+    def __init__(self, log_dir: Path, session_id: str,
+                 buffer_size: int = DEFAULT_LOG_BUFFER_SIZE,
+                 max_log_files: Optional[int] = None,
+                 log_file_size_mb: Optional[float] = None):
+        """
+        Args:
+            log_dir: Diretório do arquivo de log
+            session_id: Sessão (nome do arquivo de log)
+            buffer_size: Entradas mantidas para o relatório
+            max_log_files: Arquivos de log mantidos (padrão: config.ini)
+            log_file_size_mb: Tamanho de rotação (padrão: config.ini)
+        """
         self.log_dir = Path(log_dir)
         self.session_id = session_id
         self.log_file = self.log_dir / f"migration_{session_id}.log"
@@ -84,36 +149,43 @@ class MigrationLogger:
         self.logger = logging.getLogger('migration')
         self.logger.setLevel(logging.DEBUG)
 
-        # Handler para arquivo
-        file_handler = logging.FileHandler(self.log_file, encoding='utf-8')
+        # Handler para arquivo, com rotação (config.ini [LOGGING])
+        file_handler = rotating_file_handler(self.log_file, max_log_files, log_file_size_mb)
         file_handler.setLevel(logging.DEBUG)
 
-        # Handler para console
-        console_handler = logging.StreamHandler()
+        # Handler para console (colorido)
+        console_handler = logging.StreamHandler(sys.stdout)
         console_handler.setLevel(logging.INFO)
 
         # Formatadores
         file_formatter = logging.Formatter(
             '%(asctime)s | %(levelname)-8s | %(name)s | %(message)s'
         )
-        console_formatter = logging.Formatter(
-            '%(asctime)s | %(levelname)-8s | %(message)s',
-            datefmt='%H:%M:%S'
-        )
 
         file_handler.setFormatter(file_formatter)
-        console_handler.setFormatter(console_formatter)
+        console_handler.setFormatter(_ConsoleFormatter())
 
         # Limpar handlers existentes e adicionar novos
+        detach_queue_handler(self.logger)
         self.logger.handlers = []
         self.logger.addHandler(file_handler)
         self.logger.addHandler(console_handler)
+        self.logger.propagate = False
 
-        # Buffer de logs para relatórios
-        self.log_buffer = []
+        # Escrita em thread própria; os loggers "migration.*" dos migrators
+        # herdam estes handlers e seus níveis (DEBUG no arquivo, INFO no console)
+        attach_queue_handler(self.logger)
 
-    def _format_console_message(self, level: LogLevel, message: str) -> str:
+        # Buffer circular de logs para relatórios e contadores por nível
+        self.log_buffer: Deque[Dict[str, str]] = deque(maxlen=buffer_size)
+        self.level_counts: Dict[str, int] = {}
+        self.total_entries = 0
+        self._counts_lock = threading.Lock()
+
+    @staticmethod
+    def _format_console_message(level: LogLevel, message: str) -> str:
         """Formata mensagem para console com cores."""
+        Fore, Style = _terminal_colors()
         colors = {
             LogLevel.DEBUG: Fore.CYAN,
             LogLevel.INFO: Fore.BLUE,
@@ -140,21 +212,20 @@ class MigrationLogger:
     def log(self, message: str, level: LogLevel = LogLevel.INFO, component: str = "orchestrator"):
         """Log personalizado com cores e componentes."""
         # Adicionar ao buffer
-        log_entry = {
+        self.log_buffer.append({
             'timestamp': datetime.now().isoformat(),
             'level': level.value,
             'component': component,
             'message': message
-        }
-        self.log_buffer.append(log_entry)
-
-        # Log para arquivo
-        logger_method = getattr(self.logger, level.value.lower(), self.logger.info)
-        logger_method(f"[{component}] {message}")
+        })
+        with self._counts_lock:
+            self.total_entries += 1
+            self.level_counts[level.value] = self.level_counts.get(level.value, 0) + 1
 
-        # Log colorido para console
-        colored_message = self._format_console_message(level, f"[{component}] {message}")
-        print(colored_message)
+        # Arquivo e console: formatados e escritos pela thread do QueueListener
+        levelno = logging.INFO if level == LogLevel.SUCCESS else getattr(logging, level.value)
+        self.logger.log(levelno, "[%s] %s", component, message,
+                        extra={'migration_level': level})
 
     def debug(self, message: str, component: str = "orchestrator"):
         self.log(message, LogLevel.DEBUG, component)
@@ -192,44 +263,66 @@ class MigrationLogger:
         self.error(message, f"step.{step_name}")
 
     def get_log_summary(self) -> Dict:
-        """Retorna resumo dos logs."""
-        level_counts = {}
-        for entry in self.log_buffer:
-            level = entry['level']
-            level_counts[level] = level_counts.get(level, 0) + 1
+        """Retorna resumo dos logs (contadores completos, entradas recentes)."""
+        with self._counts_lock:
+            total_entries = self.total_entries
+            level_counts = dict(self.level_counts)
+        entries = list(self.log_buffer)
 
         return {
-            'total_entries': len(self.log_buffer),
+            'total_entries': total_entries,
             'level_counts': level_counts,
             'log_file': str(self.log_file),
-            'entries': self.log_buffer
+            'entries': entries,
+            'dropped_entries': total_entries - len(entries)
         }
 
+    def close(self):
+        """Esvazia a fila de escrita e fecha os arquivos de log."""
+        detach_queue_handler(self.logger)
+        for handler in list(self.logger.handlers):
+            handler.close()
+            self.logger.removeHandler(handler)
+
 class ModuleManager:
-    """Gerenciador de módulos da migração."""
+    """
+    Gerenciador de módulos da migração.
+
+    Os módulos são apenas localizados (find_spec) na inicialização; a
+    importação real acontece no primeiro get_module() de cada um.
+    """
+
+    MODULE_SPECS = [
+        ("sqlalchemy_migration", "core.sqlalchemy_migration", "SQLAlchemyPostgreSQLMigrator"),
+        ("scram_checker", "validation.check_scram_auth", "ScramAuthChecker"),
+        ("connection_tester", "validation.test_wfdb02_connection", "WFDB02ConnectionTester"),
+        ("user_discoverer", "utils.discover_users", "UserDiscoverer"),
+        ("password_analyzer", "utils.analyze_password", "PasswordAnalyzer")
+    ]
 
     def __init__(self, logger: MigrationLogger):
         self.logger = logger
+        self.specs: Dict[str, Tuple[str, str]] = {}
+        self.available: Dict[str, bool] = {}
         self.modules = {}
         self._load_modules()
 
     def _load_modules(self):
-        """Carrega todos os módulos necessários."""
-        self.logger.info("Carregando módulos de migração...", "module_manager")
-
-        module_specs = [
-            ("sqlalchemy_migration", "core.sqlalchemy_migration", "SQLAlchemyPostgreSQLMigrator"),
-            ("scram_checker", "validation.check_scram_auth", "ScramAuthChecker"),
-            ("connection_tester", "validation.test_wfdb02_connection", "WFDB02ConnectionTester"),
-            ("user_discoverer", "utils.discover_users", "UserDiscoverer"),
-            ("password_analyzer", "utils.analyze_password", "PasswordAnalyzer")
-        ]
+        """Localiza os módulos necessários, sem importá-los."""
+        self.logger.info("Localizando módulos de migração...", "module_manager")
+
+        for module_name, module_path, class_name in self.MODULE_SPECS:
+            self.specs[module_name] = (module_path, class_name)
+            self.available[module_name] = module_available(module_path)
+            if not self.available[module_name]:
+                self.logger.error(f"Módulo {module_name} não encontrado ({module_path})", "module_manager")
 
-        for module_name, module_path, class_name in module_specs:
+    def _resolve(self, module_name: str):
+        """Importa o módulo (uma vez) e retorna a classe."""
+        if module_name not in self.modules:
+            module_path, class_name = self.specs[module_name]
             try:
-                module = __import__(module_path, fromlist=[class_name])
-                module_class = getattr(module, class_name)
-                self.modules[module_name] = module_class
+                self.modules[module_name] = load_attribute(module_path, class_name)
                 self.logger.success(f"Módulo {module_name} carregado", "module_manager")
             except ImportError as e:
                 self.logger.error(f"Falha ao carregar {module_name}: {e}", "module_manager")
@@ -237,14 +330,15 @@ class ModuleManager:
             except AttributeError as e:
                 self.logger.error(f"Classe {class_name} não encontrada em {module_path}: {e}", "module_manager")
                 self.modules[module_name] = None
+        return self.modules[module_name]
 
     def get_module(self, module_name: str):
-        """Retorna instância de um módulo."""
-        if module_name not in self.modules:
+        """Retorna instância de um módulo (importado no primeiro uso)."""
+        if module_name not in self.specs:
             self.logger.error(f"Módulo {module_name} não encontrado", "module_manager")
             return None
 
-        module_class = self.modules[module_name]
+        module_class = self._resolve(module_name) if self.available[module_name] else None
         if module_class is None:
             self.logger.error(f"Módulo {module_name} não foi carregado corretamente", "module_manager")
             return None
@@ -256,14 +350,14 @@ class ModuleManager:
             return None
 
     def check_all_modules(self) -> bool:
-        """Verifica se todos os módulos estão carregados."""
-        missing_modules = [name for name, module_class in self.modules.items() if module_class is None]
+        """Verifica se todos os módulos estão disponíveis (sem importá-los)."""
+        missing_modules = [name for name, available in self.available.items() if not available]
 
         if missing_modules:
             self.logger.error(f"Módulos faltando: {', '.join(missing_modules)}", "module_manager")
             return False
 
-        self.logger.success("Todos os módulos carregados com sucesso", "module_manager")
+        self.logger.success("Todos os módulos disponíveis", "module_manager")
         return True
 
 class PostgreSQLMigrationOrchestrator:
@@ -348,7 +442,8 @@ class PostgreSQLMigrationOrchestrator:
             'project_root': current_dir
         }
 
-    def __init__(self, config_dir: str = None, verbose: bool = False):
+    def __init__(self, config_dir: str = None, verbose: bool = False,
+                 resume_session: Optional[str] = None):
         # Detectar caminhos automaticamente usando HOME como base
         paths = self._detect_project_paths()
 
@@ -361,11 +456,18 @@ class PostgreSQLMigrationOrchestrator:
         self.migration_dir = paths['migration_dir']
         self.project_root = paths.get('project_root', Path.cwd())
         self.reports_dir = self.migration_dir / "core" / "reports"
-        self.session_id = datetime.now().strftime("%Y%m%d_%H%M%S")
 
         # Criar diretórios necessários
         self.reports_dir.mkdir(parents=True, exist_ok=True)
 
+        # Estado persistente dos passos; ao retomar uma sessão, passos já
+        # concluídos com as mesmas entradas são reaproveitados
+        self.run_state = RunStateStore(self.reports_dir / RUN_STATE_FILE)
+        if resume_session == "latest":
+            resume_session = self.run_state.latest_session()
+        self.resumed = resume_session is not None
+        self.session_id = resume_session or datetime.now().strftime("%Y%m%d_%H%M%S")
+
         # Sistema de logging
         self.logger = MigrationLogger(self.reports_dir, self.session_id)
 
@@ -380,10 +482,17 @@ class PostgreSQLMigrationOrchestrator:
 
         # Estado da migração
         self.steps: List[MigrationStep] = []
+        self.step_workers = DEFAULT_STEP_WORKERS
+        self.critical_path: List[Dict] = []
+        self._stats_lock = threading.Lock()
         self.overall_status = MigrationStatus.PENDING
         self.start_time = None
         self.end_time = None
 
+        # Previsão de duração (histórico de relatórios + volume da origem)
+        self.workload: Dict[str, float] = {}
+        self.prediction: Optional[Prediction] = None
+
         # Estatísticas
         self.stats = {
             'total_steps': 0,
@@ -394,21 +503,39 @@ class PostgreSQLMigrationOrchestrator:
 
         self._initialize_steps()
         self.logger.info(f"Orquestrador inicializado - Session ID: {self.session_id}")
+        if self.resumed:
+            self.logger.info(f"♻️ Retomando sessão: passos concluídos com as mesmas "
+                             f"entradas serão reaproveitados ({self.run_state.db_path})")
 
     def _initialize_steps(self):
         """Inicializa os passos da migração."""
+        # Passos de pré-voo independentes entre si rodam em paralelo
+        preflight = ["validate_environment", "test_connectivity", "discover_source",
+                     "analyze_compatibility", "capacity_planning", "pre_migration_backup"]
+        configured = ["load_configurations", "check_modules"]
+
         self.steps = [
             MigrationStep("validate_environment", "Validar ambiente e dependências"),
             MigrationStep("load_configurations", "Carregar configurações de migração"),
             MigrationStep("check_modules", "Verificar módulos carregados"),
-            MigrationStep("test_connectivity", "Testar conectividade com servidores"),
-            MigrationStep("discover_source", "Descobrir estrutura do servidor origem"),
-            MigrationStep("analyze_compatibility", "Analisar compatibilidade SCRAM-SHA-256"),
-            MigrationStep("pre_migration_backup", "Criar backup pré-migração", required=False),
-            MigrationStep("execute_migration", "Executar migração principal"),
-            MigrationStep("validate_migration", "Validar resultado da migração"),
-            MigrationStep("test_connections", "Testar conexões pós-migração"),
-            MigrationStep("generate_report", "Gerar relatório final")
+            MigrationStep("test_connectivity", "Testar conectividade com servidores",
+                          depends_on=configured),
+            MigrationStep("discover_source", "Descobrir estrutura do servidor origem",
+                          depends_on=configured, cacheable=True),
+            MigrationStep("analyze_compatibility", "Analisar compatibilidade SCRAM-SHA-256",
+                          depends_on=configured, cacheable=True),
+            MigrationStep("capacity_planning", "Planejar capacidade do destino (disco, conexões, versão)",
+                          depends_on=configured),
+            MigrationStep("pre_migration_backup", "Criar backup pré-migração", required=False,
+                          depends_on=["load_configurations"], cacheable=True),
+            MigrationStep("execute_migration", "Executar migração principal",
+                          depends_on=preflight, cacheable=True),
+            MigrationStep("validate_migration", "Validar resultado da migração",
+                          depends_on=["execute_migration"], cacheable=True),
+            MigrationStep("test_connections", "Testar conexões pós-migração",
+                          depends_on=["execute_migration"]),
+            MigrationStep("generate_report", "Gerar relatório final",
+                          depends_on=["validate_migration", "test_connections"])
         ]
         self.stats['total_steps'] = len(self.steps)
 
@@ -424,6 +551,7 @@ class PostgreSQLMigrationOrchestrator:
         step.status = MigrationStatus.RUNNING
         step.start_time = datetime.now()
         self.logger.step_start(step.name, step.description)
+        progress_hub.step_changed(step.name, step.status.value)
 
     def _finish_step(self, step: MigrationStep, success: bool, error_message: str = None):
         """Finaliza um passo."""
@@ -432,20 +560,165 @@ class PostgreSQLMigrationOrchestrator:
 
         if success:
             step.status = MigrationStatus.SUCCESS
-            self.stats['completed_steps'] += 1
+            with self._stats_lock:
+                self.stats['completed_steps'] += 1
             self.logger.step_success(step.name, step.description, step.duration)
         else:
             step.status = MigrationStatus.FAILED
             step.error_message = error_message
-            self.stats['failed_steps'] += 1
+            with self._stats_lock:
+                self.stats['failed_steps'] += 1
             self.logger.step_error(step.name, step.description, error_message or "Erro desconhecido", step.duration)
+            ERRORS.inc(component='orchestrator')
+
+        STEP_DURATION.set(step.duration, step=step.name)
+        STEPS_TOTAL.inc(step=step.name, status=step.status.value)
+        progress_hub.step_changed(step.name, step.status.value, step.duration)
+        self._save_step_state(step)
+        self._log_eta(step)
+
+    def _log_eta(self, step: MigrationStep):
+        """Registra previsto x medido do passo e o ETA atualizado."""
+        if self.prediction is None:
+            return
+        predicted = self.prediction.durations.get(step.name)
+        if step.name not in self.prediction.unknown and predicted is not None:
+            self.logger.info(f"⏱️ {step.name}: {format_duration(step.duration)} "
+                             f"(previsto {format_duration(predicted)}), "
+                             f"ETA {format_duration(progress_hub.eta_seconds())}",
+                             f"step.{step.name}")
 
     def _skip_step(self, step: MigrationStep, reason: str = "Pulado"):
         """Pula um passo."""
         step.status = MigrationStatus.SKIPPED
         step.error_message = reason
-        self.stats['skipped_steps'] += 1
+        with self._stats_lock:
+            self.stats['skipped_steps'] += 1
         self.logger.info(f"⏭️ Pulando: {step.description} - {reason}", f"step.{step.name}")
+        STEPS_TOTAL.inc(step=step.name, status=step.status.value)
+        progress_hub.step_changed(step.name, step.status.value)
+        self._save_step_state(step)
+
+    def _save_step_state(self, step: MigrationStep):
+        """Grava o estado do passo no banco de estado da sessão."""
+        try:
+            self.run_state.record(
+                self.session_id, step.name, step.status.value,
+                inputs_hash=step.inputs_hash, result_data=step.result_data,
+                error_message=step.error_message, start_time=step.start_time,
+                end_time=step.end_time, duration=step.duration)
+        except Exception as e:
+            self.logger.warning(f"Não foi possível gravar o estado de {step.name}: {e}")
+
+    def _connection_identity(self) -> Dict[str, Any]:
+        """
+        Servidores que o migrator realmente usa (secrets/): host, porta,
+        banco e usuário normalizados, sem senhas.
+        """
+        migrator = self.module_manager.get_module('sqlalchemy_migration')
+        if not migrator or not migrator.load_configs():
+            return {}
+
+        try:
+            from components.config_normalizer import get_connection_identity
+            return {'source': get_connection_identity(migrator.source_config),
+                    'destination': get_connection_identity(migrator.dest_config)}
+        except Exception as e:
+            self.logger.warning(f"Identidade das conexões indisponível: {e}")
+            return {}
+
+    def _step_inputs_hash(self, step: MigrationStep) -> str:
+        """
+        Hash das entradas do passo: configurações carregadas, servidores
+        efetivos do migrator (passos reaproveitáveis) e hashes das
+        dependências (uma dependência com entradas novas invalida o passo).
+        """
+        dependencies = [self._get_step(name).inputs_hash for name in step.depends_on]
+        connections = self._connection_identity() if step.cacheable else None
+        return inputs_hash(step.name, step.required, self.migration_rules,
+                           self.source_config, self.dest_config, connections, dependencies)
+
+    def _collect_workload(self) -> Dict[str, float]:
+        """
+        Volume da origem (roles, bancos de usuário e bytes) para a previsão.
+
+        Uma consulta agregada na origem; a coleta completa fica para o
+        passo discover_source.
+        """
+        migrator = self.module_manager.get_module('sqlalchemy_migration')
+        if not migrator or not migrator.load_configs():
+            return {}
+        return migrator.get_source_workload()
+
+    def predict_duration(self) -> Optional[Prediction]:
+        """
+        Prevê a duração de cada passo com o histórico de relatórios em
+        reports_dir e o volume atual da origem.
+
+        Returns:
+            Previsão, ou None se não foi possível calculá-la
+        """
+        try:
+            self.workload = self._collect_workload()
+        except Exception as e:
+            self.logger.warning(f"Volume da origem indisponível para a previsão: {e}")
+            self.workload = {}
+
+        try:
+            predictor = DurationPredictor.from_reports(self.reports_dir)
+            self.prediction = predictor.predict(
+                {step.name: step.depends_on for step in self.steps}, self.workload)
+        except Exception as e:
+            self.logger.warning(f"Previsão de duração indisponível: {e}")
+            self.prediction = None
+        return self.prediction
+
+    def _print_prediction(self, prediction: Prediction):
+        """Mostra a previsão por passo e o total (janela de manutenção)."""
+        print(f"\n⏱️ PREVISÃO DE DURAÇÃO:")
+        if not prediction.runs:
+            print("  🔸 Sem execuções anteriores em reports/ - previsão indisponível")
+            return
+
+        workload = prediction.workload
+        if workload:
+            size_mb = workload.get('bytes', 0) / (1024 * 1024)
+            print(f"  🔸 Volume: {workload.get('roles', 0)} roles, "
+                  f"{workload.get('databases', 0)} bancos, {size_mb:.2f} MB")
+        for step in self.steps:
+            if step.name in prediction.unknown:
+                print(f"    ├─ {step.description}: sem histórico")
+            else:
+                print(f"    ├─ {step.description}: "
+                      f"{format_duration(prediction.durations[step.name])}")
+        print(f"  🔸 Total estimado: {format_duration(prediction.total)} "
+              f"(caminho crítico, calibrado com {prediction.runs} execuções)")
+
+    def _run_step_with_state(self, step: MigrationStep, method) -> bool:
+        """Executa o passo ou reaproveita o resultado gravado na sessão."""
+        with span(step.name, "step"):
+            return self._run_or_reuse_step(step, method)
+
+    def _run_or_reuse_step(self, step: MigrationStep, method) -> bool:
+        step.inputs_hash = self._step_inputs_hash(step)
+
+        if step.cacheable:
+            state = self.run_state.completed(self.session_id, step.name, step.inputs_hash)
+            if state is not None:
+                step.status = MigrationStatus.SUCCESS
+                step.cached = True
+                step.result_data = state['result_data']
+                step.duration = 0.0
+                with self._stats_lock:
+                    self.stats['completed_steps'] += 1
+                STEPS_TOTAL.inc(step=step.name, status='cached')
+                progress_hub.step_changed(step.name, 'cached', 0.0)
+                self.logger.info(f"♻️ Reaproveitado: {step.description} "
+                                 f"(concluído em {state['ended_at']}, {state['duration'] or 0:.2f}s)",
+                                 f"step.{step.name}")
+                return True
+
+        return method()
 
     # Implementação dos passos de migração
     def validate_environment(self) -> bool:
@@ -548,8 +821,8 @@ class PostgreSQLMigrationOrchestrator:
             modules_ok = self.module_manager.check_all_modules()
 
             step.result_data = {
-                'modules_loaded': len([m for m in self.module_manager.modules.values() if m is not None]),
-                'total_modules': len(self.module_manager.modules),
+                'modules_available': sum(self.module_manager.available.values()),
+                'total_modules': len(self.module_manager.specs),
                 'all_modules_ok': modules_ok
             }
 
@@ -745,6 +1018,64 @@ class PostgreSQLMigrationOrchestrator:
             self._finish_step(step, False, f"Erro na análise SCRAM: {str(e)}")
             return False
 
+    def plan_capacity(self) -> bool:
+        """Pré-voo: disco, folga de conexões e versão do destino."""
+        step = self._get_step("capacity_planning")
+        self._start_step(step)
+
+        try:
+            migrator = self.module_manager.get_module("sqlalchemy_migration")
+            if not migrator:
+                self._finish_step(step, False, "Migrator não disponível")
+                return False
+            if not migrator.load_configs() or not migrator.create_engines():
+                self._finish_step(step, False, "Não foi possível conectar aos servidores")
+                return False
+
+            # Importação adiada: o planejador carrega o SQLAlchemy
+            from app.validation.capacity_planner import FAILED, OK, CapacityPlanner
+
+            rules = self.migration_rules.get("migration_rules", self.migration_rules)
+            validation = rules.get("validation_rules", {})
+            enabled = set(validation.get("pre_migration_checks",
+                                         ["disk_space_check", "version_compatibility"]))
+            enabled.add("connection_headroom")
+
+            # Todas as conexões do pool do destino podem ficar em uso ao mesmo tempo
+            planner = CapacityPlanner(
+                migrator.source_engine, migrator.dest_engine,
+                planned_connections=migrator.pool_size + migrator.max_overflow,
+                rules=validation.get("capacity_planning"),
+                system_databases=self.migration_rules.get("excluded_objects", {}).get("system_databases"),
+                include_data=rules.get("data_migration", {}).get("enabled", False))
+            try:
+                plan = planner.plan()
+            finally:
+                migrator.source_engine.dispose()
+                migrator.dest_engine.dispose()
+
+            plan.checks = [check for check in plan.checks if check.name in enabled]
+            for check in plan.checks:
+                if check.status == OK:
+                    self.logger.success(f"{check.name}: {check.message}", "capacity")
+                elif check.status == FAILED:
+                    self.logger.error(f"{check.name}: {check.message}", "capacity")
+                else:
+                    self.logger.warning(f"{check.name}: {check.message}", "capacity")
+
+            step.result_data = plan.to_dict()
+            if not plan.ok:
+                failed = ", ".join(check.name for check in plan.checks if check.status == FAILED)
+                self._finish_step(step, False, f"Plano de capacidade recusado ({failed})")
+                return False
+
+            self._finish_step(step, True)
+            return True
+
+        except Exception as e:
+            self._finish_step(step, False, f"Erro no planejamento de capacidade: {str(e)}")
+            return False
+
     def create_pre_migration_backup(self) -> bool:
         """Cria backup pré-migração."""
         step = self._get_step("pre_migration_backup")
@@ -877,6 +1208,8 @@ class PostgreSQLMigrationOrchestrator:
                 },
                 'overall_status': self.overall_status.value,
                 'statistics': self.stats,
+                'workload': self.workload,
+                'predicted_durations': self.prediction.durations if self.prediction else None,
                 'steps': [asdict(step) for step in self.steps],
                 'logs': self.logger.get_log_summary()
             }
@@ -920,60 +1253,89 @@ class PostgreSQLMigrationOrchestrator:
         self.start_time = datetime.now()
         self.overall_status = MigrationStatus.RUNNING
 
+        # Nova execução da sessão: estado em memória recomeça; o que já
+        # concluiu vem do banco de estado (_run_step_with_state)
+        self.stats.update(completed_steps=0, failed_steps=0, skipped_steps=0)
+        self.steps = [MigrationStep(step.name, step.description, step.required,
+                                    depends_on=step.depends_on, cacheable=step.cacheable)
+                      for step in self.steps]
+        progress_hub.reset()
+        for step in self.steps:
+            progress_hub.step_changed(step.name, step.status.value)
+
+        # Execução automática: prever aqui (na interativa, já foi na confirmação)
+        if self.prediction is None:
+            self.predict_duration()
+        if self.prediction is not None:
+            progress_hub.set_plan(self.prediction.durations, self.prediction.depends_on)
+
         self.logger.info("=" * 70)
         self.logger.info("🚀 INICIANDO MIGRAÇÃO POSTGRESQL COMPLETA")
         self.logger.info("=" * 70)
         self.logger.info(f"Session ID: {self.session_id}")
         self.logger.info(f"Timestamp: {self.start_time}")
+        if self.prediction is not None and self.prediction.runs:
+            self.logger.info(f"⏱️ Duração prevista: {format_duration(self.prediction.total)} "
+                             f"({self.prediction.runs} execuções anteriores)")
+
+        # Passos e dependências (DAG): independentes rodam em paralelo
+        step_methods = {
+            "validate_environment": self.validate_environment,
+            "load_configurations": self.load_configurations,
+            "check_modules": self.check_modules,
+            "test_connectivity": self.test_connectivity,
+            "discover_source": self.discover_source_structure,
+            "analyze_compatibility": self.analyze_scram_compatibility,
+            "capacity_planning": self.plan_capacity,
+            "pre_migration_backup": self.create_pre_migration_backup,
+            "execute_migration": self.execute_main_migration,
+            "validate_migration": self.validate_migration_result,
+            "test_connections": self.test_post_migration_connections,
+            "generate_report": self.generate_final_report
+        }
 
-        # Definir ordem de execução
-        step_methods = [
-            self.validate_environment,
-            self.load_configurations,
-            self.check_modules,
-            self.test_connectivity,
-            self.discover_source_structure,
-            self.analyze_scram_compatibility,
-            self.create_pre_migration_backup,
-            self.execute_main_migration,
-            self.validate_migration_result,
-            self.test_post_migration_connections,
-            self.generate_final_report
-        ]
+        scheduler = StepScheduler(max_workers=self.step_workers)
+        for step in self.steps:
+            scheduler.add(step.name,
+                          lambda step=step: self._run_step_with_state(step, step_methods[step.name]),
+                          step.depends_on)
 
         failed_steps = []
         critical_failure = False
+        continue_on_error = self.migration_rules.get("error_handling", {}).get("continue_on_error", False)
 
-        for step_method in step_methods:
-            if critical_failure:
-                break
+        def on_failure(step_name: str, error: Optional[BaseException]) -> bool:
+            nonlocal critical_failure
+            failed_steps.append(step_name)
 
-            try:
-                success = step_method()
-
-                if not success:
-                    step_name = step_method.__name__
-                    failed_steps.append(step_name)
-
-                    # Verificar se deve continuar
-                    continue_on_error = self.migration_rules.get("error_handling", {}).get("continue_on_error", False)
-                    if not continue_on_error:
-                        self.logger.critical(f"Falha crítica em {step_name}. Parando execução.")
-                        critical_failure = True
-                        break
-                    else:
-                        self.logger.warning(f"Falha em {step_name}, mas continuando...")
-
-            except KeyboardInterrupt:
-                self.logger.warning("Migração interrompida pelo usuário")
-                critical_failure = True
-                break
-            except Exception as e:
-                self.logger.critical(f"Exceção não tratada: {str(e)}")
+            if error is not None:
+                self.logger.critical(f"Exceção não tratada: {str(error)}")
                 if self.verbose:
-                    self.logger.error(traceback.format_exc())
+                    self.logger.error("".join(traceback.format_exception(error)))
+                critical_failure = True
+                return False
+
+            # Verificar se deve continuar
+            if not continue_on_error:
+                self.logger.critical(f"Falha crítica em {step_name}. Parando execução.")
                 critical_failure = True
-                break
+                return False
+
+            self.logger.warning(f"Falha em {step_name}, mas continuando...")
+            return True
+
+        try:
+            with span("run_complete_migration", "pipeline", session=self.session_id):
+                results = scheduler.run(on_failure)
+            for step in self.steps:
+                if results.get(step.name) is None and step.status == MigrationStatus.PENDING:
+                    self._skip_step(step, "Execução interrompida antes do passo")
+        except KeyboardInterrupt:
+            self.logger.warning("Migração interrompida pelo usuário")
+            critical_failure = True
+
+        self._log_critical_path(scheduler)
+        self._export_trace()
 
         # Determinar status final
         self.end_time = datetime.now()
@@ -1006,6 +1368,45 @@ class PostgreSQLMigrationOrchestrator:
 
         return self.overall_status in [MigrationStatus.SUCCESS, MigrationStatus.PARTIAL]
 
+    def start_monitoring(self, metrics_port: int = DEFAULT_METRICS_PORT,
+                         dashboard_port: int = DEFAULT_DASHBOARD_PORT):
+        """
+        Inicia o exportador Prometheus e o dashboard de progresso (SSE).
+
+        Args:
+            metrics_port: Porta do /metrics (0 desativa)
+            dashboard_port: Porta do dashboard (0 desativa)
+        """
+        if metrics_port:
+            start_metrics_server(metrics_port)
+        if dashboard_port:
+            start_dashboard_server(dashboard_port)
+
+    def _export_trace(self):
+        """Grava os spans da execução (--trace) ao lado dos relatórios."""
+        tracer = active_tracer()
+        if tracer is None:
+            return
+        trace_file = tracer.export(self.reports_dir / f"trace_{self.session_id}.json")
+        self.logger.info(f"🔥 Trace (chrome://tracing, Perfetto): {trace_file}")
+
+    def _log_critical_path(self, scheduler: StepScheduler):
+        """Registra a contribuição de cada passo para o caminho crítico."""
+        self.critical_path = scheduler.critical_path()
+        if not self.critical_path:
+            return
+
+        on_path = {entry['name'] for entry in self.critical_path}
+        self.logger.info("🧭 Caminho crítico:")
+        for entry in self.critical_path:
+            wait_str = f", espera {entry['wait']:.2f}s" if entry['wait'] > 0.01 else ""
+            self.logger.info(f"   {entry['name']}: {entry['duration']:.2f}s "
+                             f"({entry['share']:.0%} do total{wait_str})")
+
+        off_path = sorted(name for name in scheduler.timings if name not in on_path)
+        if off_path:
+            self.logger.info(f"   Fora do caminho crítico (em paralelo): {', '.join(off_path)}")
+
     def _show_migration_confirmation(self) -> bool:
         """Mostra confirmação interativa antes da migração."""
         print("\n" + "="*70)
@@ -1075,6 +1476,10 @@ class PostgreSQLMigrationOrchestrator:
         except Exception as e:
             print(f"⚠️ Erro ao obter detalhes da configuração: {e}")
 
+        prediction = self.predict_duration()
+        if prediction is not None:
+            self._print_prediction(prediction)
+
         print(f"\n🔧 OPERAÇÕES QUE SERÃO EXECUTADAS:")
         operations = [
             "✅ Validar ambiente e dependências",
@@ -1083,6 +1488,7 @@ class PostgreSQLMigrationOrchestrator:
             "✅ Testar conectividade com servidores",
             "🔍 Descobrir estrutura do banco origem",
             "🔒 Analisar compatibilidade SCRAM",
+            "📏 Planejar capacidade do destino (disco, conexões, versão)",
             "💾 Criar backup pré-migração",
             "🚀 Executar migração principal",
             "✅ Validar resultado da migração",
@@ -1197,7 +1603,8 @@ class PostgreSQLMigrationOrchestrator:
                 }
                 icon = status_icons.get(step['status'], '❓')
                 duration = f" ({step['duration']:.2f}s)" if step['duration'] else ""
-                f.write(f"- {icon} **{step['description']}**{duration}\\n")
+                reused = " _(reaproveitado)_" if step.get('cached') else ""
+                f.write(f"- {icon} **{step['description']}**{duration}{reused}\\n")
 
             f.write("\\n---\\n")
             f.write(f"*Relatório gerado em {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}*\\n")
@@ -1241,6 +1648,7 @@ Exemplos de uso:
   %(prog)s --test-modules      # Só testar módulos
   %(prog)s --dry-run           # Simulação sem modificações
   %(prog)s --verbose           # Saída detalhada
+  %(prog)s --auto --resume     # Retomar a última sessão sem repetir passos concluídos
         """
     )
 
@@ -1250,6 +1658,18 @@ Exemplos de uso:
     parser.add_argument('--test-modules', action='store_true', help='Testar módulos apenas')
     parser.add_argument('--dry-run', '-d', action='store_true', help='Simulação')
     parser.add_argument('--verbose', '-v', action='store_true', help='Modo verboso')
+    parser.add_argument('--workers', '-w', type=int, default=DEFAULT_STEP_WORKERS,
+                        help='Passos independentes executados em paralelo')
+    parser.add_argument('--resume', nargs='?', const='latest', metavar='SESSION_ID',
+                        help='Retomar sessão (padrão: a mais recente), reaproveitando '
+                             'passos já concluídos com as mesmas entradas')
+    parser.add_argument('--metrics-port', type=int, default=DEFAULT_METRICS_PORT,
+                        help='Porta do exportador Prometheus /metrics (0 desativa)')
+    parser.add_argument('--dashboard-port', type=int, default=DEFAULT_DASHBOARD_PORT,
+                        help='Porta do dashboard de progresso com SSE (0 desativa)')
+    parser.add_argument('--trace', action='store_true',
+                        help='Gravar spans (passos, conexões, SQL) em '
+                             'reports/trace_<sessão>.json (chrome://tracing, Perfetto)')
 
     args = parser.parse_args()
 
@@ -1257,8 +1677,13 @@ Exemplos de uso:
         # Criar orquestrador
         orchestrator = PostgreSQLMigrationOrchestrator(
             config_dir=args.config,
-            verbose=args.verbose
+            verbose=args.verbose,
+            resume_session=args.resume
         )
+        orchestrator.step_workers = args.workers
+        orchestrator.start_monitoring(args.metrics_port, args.dashboard_port)
+        if args.trace:
+            start_tracing()
 
         if args.dry_run:
             orchestrator.logger.warning("🔍 MODO SIMULAÇÃO - Nenhuma modificação será feita")
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Run State - Estado persistente dos passos do orquestrador
+=========================================================
+
+Grava status, hash das entradas, resultado e duração de cada passo em um
+banco SQLite local, por session_id. Ao reexecutar uma sessão (--resume), os
+passos que já concluíram com as mesmas entradas são reaproveitados em vez
+de executados de novo.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+from contextlib import closing
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+RUN_STATE_FILE = "run_state.db"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS step_state (
+    session_id    TEXT NOT NULL,
+    step_name     TEXT NOT NULL,
+    status        TEXT NOT NULL,
+    inputs_hash   TEXT,
+    result_data   TEXT,
+    error_message TEXT,
+    started_at    TEXT,
+    ended_at      TEXT,
+    duration      REAL,
+    updated_at    TEXT NOT NULL,
+    PRIMARY KEY (session_id, step_name)
+)
+"""
+
+
+def inputs_hash(*parts: Any) -> str:
+    """SHA-256 das entradas de um passo (JSON com chaves ordenadas)."""
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class RunStateStore:
+    """
+    Estado dos passos por sessão em SQLite.
+
+    Cada operação abre a própria conexão, de modo que passos executando em
+    threads diferentes podem gravar ao mesmo tempo.
+    """
+
+    def __init__(self, db_path: Path):
+        """
+        Args:
+            db_path: Arquivo SQLite (criado se não existir)
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        with closing(self._connect()) as conn, conn:
+            conn.execute(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def record(self, session_id: str, step_name: str, status: str,
+               inputs_hash: Optional[str] = None, result_data: Optional[Dict] = None,
+               error_message: Optional[str] = None, start_time: Optional[datetime] = None,
+               end_time: Optional[datetime] = None, duration: Optional[float] = None) -> None:
+        """Grava (ou substitui) o estado de um passo."""
+        row = (session_id, step_name, status, inputs_hash,
+               json.dumps(result_data, default=str) if result_data is not None else None,
+               error_message,
+               start_time.isoformat() if start_time else None,
+               end_time.isoformat() if end_time else None,
+               duration, datetime.now().isoformat())
+
+        with self._lock, closing(self._connect()) as conn, conn:
+            conn.execute("INSERT OR REPLACE INTO step_state VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                         row)
+
+    def get(self, session_id: str, step_name: str) -> Optional[Dict[str, Any]]:
+        """Estado gravado de um passo (None se nunca executou na sessão)."""
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT * FROM step_state WHERE session_id = ? AND step_name = ?",
+                (session_id, step_name)).fetchone()
+
+        if row is None:
+            return None
+        state = dict(row)
+        state['result_data'] = json.loads(state['result_data']) if state['result_data'] else None
+        return state
+
+    def completed(self, session_id: str, step_name: str,
+                  current_hash: str) -> Optional[Dict[str, Any]]:
+        """
+        Estado do passo se ele já concluiu com as mesmas entradas.
+
+        Returns:
+            Estado gravado, ou None se o passo precisa ser executado
+        """
+        state = self.get(session_id, step_name)
+        if state and state['status'] == 'success' and state['inputs_hash'] == current_hash:
+            return state
+        return None
+
+    def steps(self, session_id: str) -> List[Dict[str, Any]]:
+        """Estado de todos os passos gravados da sessão."""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT step_name, status, duration, error_message FROM step_state "
+                "WHERE session_id = ? ORDER BY started_at", (session_id,)).fetchall()
+        return [dict(row) for row in rows]
+
+    def latest_session(self) -> Optional[str]:
+        """Sessão atualizada mais recentemente."""
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT session_id FROM step_state ORDER BY updated_at DESC LIMIT 1").fetchone()
+        return row[0] if row else None
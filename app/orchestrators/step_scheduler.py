@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Step Scheduler - Execução de passos em DAG
+==========================================
+
+Executa os passos do orquestrador respeitando dependências declaradas,
+rodando em paralelo (thread pool) os passos independentes, e calcula o
+caminho crítico da execução a partir dos tempos medidos.
+"""
+
+import contextvars
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Workers padrão: os passos de pré-voo são dominados por I/O de rede
+DEFAULT_STEP_WORKERS = 4
+
+
+class StepScheduler:
+    """
+    Agendador de passos com dependências (DAG) sobre um thread pool.
+
+    Cada passo é uma função sem argumentos que retorna True/False. Um passo
+    só inicia quando todas as suas dependências terminaram; quando um passo
+    falha, `on_failure` decide se a execução continua.
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_STEP_WORKERS):
+        """
+        Args:
+            max_workers: Máximo de passos executando ao mesmo tempo
+        """
+        self.max_workers = max_workers
+        self._steps: Dict[str, Callable[[], bool]] = {}
+        self._depends_on: Dict[str, Tuple[str, ...]] = {}
+        self.results: Dict[str, Optional[bool]] = {}
+        self.errors: Dict[str, BaseException] = {}
+        self.timings: Dict[str, Tuple[float, float]] = {}
+        self._origin = 0.0
+
+    def add(self, name: str, func: Callable[[], bool],
+            depends_on: Iterable[str] = ()) -> None:
+        """Registra um passo e suas dependências."""
+        self._steps[name] = func
+        self._depends_on[name] = tuple(depends_on)
+
+    def order(self) -> List[str]:
+        """
+        Ordem topológica dos passos (na ordem de registro entre os prontos).
+
+        Raises:
+            ValueError: Se houver dependência desconhecida ou ciclo
+        """
+        for name, deps in self._depends_on.items():
+            unknown = set(deps) - set(self._steps)
+            if unknown:
+                raise ValueError(f"Passo '{name}' depende de passos "
+                                 f"inexistentes: {sorted(unknown)}")
+
+        ordered: List[str] = []
+        done = set()
+        while len(ordered) < len(self._steps):
+            ready = [name for name in self._steps
+                     if name not in done and set(self._depends_on[name]) <= done]
+            if not ready:
+                pending = [name for name in self._steps if name not in done]
+                raise ValueError(f"Dependência circular entre passos: {pending}")
+            for name in ready:
+                ordered.append(name)
+                done.add(name)
+
+        return ordered
+
+    def _run_step(self, name: str) -> bool:
+        start = time.perf_counter() - self._origin
+        try:
+            return bool(self._steps[name]())
+        finally:
+            self.timings[name] = (start, time.perf_counter() - self._origin)
+
+    def run(self, on_failure: Callable[[str, Optional[BaseException]], bool]) -> Dict[str, Optional[bool]]:
+        """
+        Executa os passos.
+
+        Args:
+            on_failure: Chamado com (passo, exceção ou None) quando um passo
+                falha; retorna True para continuar, False para parar. Passos
+                já em execução terminam; os que não iniciaram ficam None.
+
+        Returns:
+            Resultado por passo: True, False ou None (não executado)
+        """
+        order = self.order()
+        self.results = {name: None for name in order}
+        self.errors.clear()
+        self.timings.clear()
+        self._origin = time.perf_counter()
+
+        finished = set()
+        running: Dict[Future, str] = {}
+        stopped = False
+
+        with ThreadPoolExecutor(max_workers=self.max_workers,
+                                thread_name_prefix="step") as executor:
+            try:
+                while True:
+                    if not stopped:
+                        for name in order:
+                            if (name not in finished and name not in running.values()
+                                    and self.results[name] is None
+                                    and set(self._depends_on[name]) <= finished):
+                                # Contexto copiado: o passo herda o span corrente (tracing)
+                                running[executor.submit(contextvars.copy_context().run,
+                                                        self._run_step, name)] = name
+
+                    if not running:
+                        break
+
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        name = running.pop(future)
+                        error = future.exception()
+                        success = error is None and future.result()
+                        self.results[name] = success
+                        finished.add(name)
+
+                        if error is not None:
+                            self.errors[name] = error
+                        if not success and not on_failure(name, error):
+                            stopped = True
+
+            except BaseException:
+                # Ctrl+C: não iniciar mais nada e repassar
+                for future in running:
+                    future.cancel()
+                raise
+
+        return self.results
+
+    def critical_path(self) -> List[Dict[str, float]]:
+        """
+        Caminho crítico da última execução.
+
+        Parte do passo que terminou por último e volta pela dependência que
+        terminou mais tarde; cada passo contribui com sua duração e com a
+        espera entre a dependência e seu início.
+
+        Returns:
+            Passos do caminho crítico, do primeiro ao último, com
+            'duration', 'wait' e 'share' (fração do tempo total)
+        """
+        if not self.timings:
+            return []
+
+        total = max(end for _, end in self.timings.values()) or 1e-9
+        path = []
+        current: Optional[str] = max(self.timings, key=lambda n: self.timings[n][1])
+
+        while current is not None:
+            start, end = self.timings[current]
+            previous = max((dep for dep in self._depends_on[current] if dep in self.timings),
+                           key=lambda dep: self.timings[dep][1], default=None)
+            ready_at = self.timings[previous][1] if previous else 0.0
+            path.append({
+                'name': current,
+                'start': round(start, 3),
+                'duration': round(end - start, 3),
+                'wait': round(max(start - ready_at, 0.0), 3),
+                'share': round((end - start) / total, 3)
+            })
+            current = previous
+
+        path.reverse()
+        return path
@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+Capacity Planner - Verificações de pré-voo do destino
+=====================================================
+
+Implementa as verificações `disk_space_check` e `version_compatibility`
+listadas em migration_rules.json (validation_rules.pre_migration_checks) e
+a folga de max_connections, antes de qualquer alteração no destino:
+
+- Disco: tamanho da origem (bancos a criar) + reconstrução de índices +
+  WAL retido até o checkpoint, com margem de segurança, comparado com o
+  espaço livre do destino. O espaço livre vem de uma função administrativa
+  configurada (ex.: "SELECT admin.disk_free_bytes()") ou, com o destino
+  local, de shutil.disk_usage sobre o data_directory.
+- Conexões: conexões ativas + conexões planejadas (workers/pool) não podem
+  consumir a folga de max_connections do destino.
+- Versão: o destino não pode ter versão principal anterior à da origem.
+
+Um plano recusado para a migração antes do início: falhar com 80% do
+caminho percorrido porque o disco encheu é o pior desfecho possível.
+
+Uso:
+    python -m app.validation.capacity_planner --connections 15
+"""
+
+import argparse
+import math
+import shutil
+import sys
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from sqlalchemy import text
+
+OK = "ok"
+WARNING = "warning"
+FAILED = "failed"
+
+DEFAULT_SYSTEM_DATABASES = ["template0", "template1", "postgres"]
+LOCAL_HOSTS = {"localhost", "127.0.0.1", "::1"}
+
+# Padrões da seção validation_rules.capacity_planning
+DEFAULT_CAPACITY_RULES = {
+    # Espaço temporário de ordenação do CREATE INDEX, sobre os dados copiados
+    "index_rebuild_ratio": 0.25,
+    # Folga exigida sobre o espaço estimado
+    "safety_margin": 0.15,
+    # Fração de max_connections que deve continuar livre durante a migração
+    "connection_headroom": 0.10,
+    # SQL que retorna os bytes livres no disco do destino (função administrativa)
+    "free_space_function": None,
+    # Stand-in local: diretório cujo disco hospeda o data_directory do destino
+    "local_data_directory": None,
+}
+
+
+@dataclass
+class CheckResult:
+    """Resultado de uma verificação de capacidade."""
+    name: str
+    status: str
+    message: str
+    details: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class CapacityPlan:
+    """Resultado do planejamento: a migração só segue sem falhas."""
+    checks: List[CheckResult]
+
+    @property
+    def ok(self) -> bool:
+        return all(check.status != FAILED for check in self.checks)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'ok': self.ok, 'checks': [asdict(check) for check in self.checks]}
+
+
+def format_bytes(size: float) -> str:
+    """Tamanho legível (B, KB, MB, GB, TB)."""
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(size) < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TB"
+
+
+def major_version(version_num: int) -> Tuple[int, int]:
+    """
+    Versão principal a partir de server_version_num, em uma escala comparável.
+
+    Até a 9.6 a versão principal tem dois números (90624 → (9, 6)); a partir
+    da 10 apenas um (160002 → (16, 0)).
+    """
+    if version_num >= 100000:
+        return version_num // 10000, 0
+    return version_num // 10000, version_num // 100 % 100
+
+
+def format_major_version(version_num: int) -> str:
+    """Versão principal legível (90624 → '9.6', 160002 → '16')."""
+    major, minor = major_version(version_num)
+    return f"{major}.{minor}" if version_num < 100000 else str(major)
+
+
+def check_disk_space(source: Mapping[str, Any], destination: Mapping[str, Any],
+                     include_data: bool = True,
+                     rules: Mapping[str, Any] = DEFAULT_CAPACITY_RULES) -> CheckResult:
+    """
+    disk_space_check: espaço estimado da migração x espaço livre do destino.
+
+    Args:
+        source: Medidas da origem ('databases': {nome: bytes})
+        destination: Medidas do destino ('databases', 'free_bytes',
+            'template_bytes', 'max_wal_bytes')
+        include_data: Se os dados das tabelas são copiados (data_migration)
+        rules: Seção capacity_planning
+
+    Returns:
+        FAILED se o espaço livre não comporta a estimativa com a margem
+    """
+    new_databases = {name: size for name, size in source['databases'].items()
+                     if name not in destination['databases']}
+    data_bytes = sum(new_databases.values()) if include_data else 0
+    template_bytes = len(new_databases) * destination.get('template_bytes', 0)
+    index_bytes = data_bytes * rules['index_rebuild_ratio']
+    # WAL gerado fica retido até o checkpoint (limitado por max_wal_size)
+    wal_bytes = min(data_bytes + template_bytes,
+                    destination.get('max_wal_bytes') or data_bytes + template_bytes)
+    required = (data_bytes + template_bytes + index_bytes + wal_bytes) * (1 + rules['safety_margin'])
+
+    details = {
+        'source_total_bytes': sum(source['databases'].values()),
+        'databases_to_create': len(new_databases),
+        'data_bytes': data_bytes,
+        'template_bytes': template_bytes,
+        'index_rebuild_bytes': index_bytes,
+        'wal_bytes': wal_bytes,
+        'required_bytes': required,
+        'free_bytes': destination.get('free_bytes'),
+        'free_space_source': destination.get('free_space_source')
+    }
+
+    free = destination.get('free_bytes')
+    if free is None:
+        return CheckResult('disk_space_check', WARNING,
+                           f"Espaço livre do destino não medido (necessário ~{format_bytes(required)}); "
+                           "configure free_space_function ou local_data_directory", details)
+    if required > free:
+        return CheckResult('disk_space_check', FAILED,
+                           f"Espaço insuficiente no destino: necessário {format_bytes(required)}, "
+                           f"livre {format_bytes(free)}", details)
+    return CheckResult('disk_space_check', OK,
+                       f"Necessário {format_bytes(required)} de {format_bytes(free)} livres", details)
+
+
+def check_connections(destination: Mapping[str, Any], planned_connections: int,
+                      rules: Mapping[str, Any] = DEFAULT_CAPACITY_RULES) -> CheckResult:
+    """
+    Folga de max_connections no destino para as conexões planejadas.
+
+    Returns:
+        FAILED se ativas + planejadas invadem as reservadas e a folga mínima
+    """
+    max_connections = destination['max_connections']
+    headroom = math.ceil(max_connections * rules['connection_headroom'])
+    available = (max_connections - destination.get('reserved_connections', 0)
+                 - destination['active_connections'] - headroom)
+    details = {
+        'max_connections': max_connections,
+        'reserved_connections': destination.get('reserved_connections', 0),
+        'active_connections': destination['active_connections'],
+        'headroom': headroom,
+        'planned_connections': planned_connections,
+        'available_connections': available
+    }
+
+    if planned_connections > available:
+        return CheckResult('connection_headroom', FAILED,
+                           f"{planned_connections} conexões planejadas saturariam o destino "
+                           f"(disponíveis: {max(available, 0)} de {max_connections}); "
+                           f"reduza workers/pool para no máximo {max(available, 0)}", details)
+    return CheckResult('connection_headroom', OK,
+                       f"{planned_connections} conexões planejadas, {available} disponíveis "
+                       f"(max_connections={max_connections})", details)
+
+
+def check_version(source: Mapping[str, Any], destination: Mapping[str, Any]) -> CheckResult:
+    """version_compatibility: o destino não pode ser anterior à origem."""
+    source_major = format_major_version(source['version_num'])
+    dest_major = format_major_version(destination['version_num'])
+    details = {'source_version_num': source['version_num'],
+               'destination_version_num': destination['version_num']}
+
+    if major_version(destination['version_num']) < major_version(source['version_num']):
+        return CheckResult('version_compatibility', FAILED,
+                           f"Destino (versão {dest_major}) é anterior à origem "
+                           f"(versão {source_major})", details)
+    return CheckResult('version_compatibility', OK,
+                       f"Origem {source_major} → destino {dest_major}", details)
+
+
+class CapacityPlanner:
+    """Mede origem e destino e executa as verificações de capacidade."""
+
+    def __init__(self, source_engine, dest_engine, planned_connections: int,
+                 rules: Optional[Mapping[str, Any]] = None,
+                 system_databases: Optional[List[str]] = None,
+                 include_data: bool = True):
+        """
+        Args:
+            source_engine: Engine SQLAlchemy da origem
+            dest_engine: Engine SQLAlchemy do destino
+            planned_connections: Conexões simultâneas ao destino (workers/pool)
+            rules: Seção validation_rules.capacity_planning
+            system_databases: Bancos que não são migrados
+            include_data: Se os dados das tabelas são copiados
+        """
+        self.source_engine = source_engine
+        self.dest_engine = dest_engine
+        self.planned_connections = planned_connections
+        self.rules = {**DEFAULT_CAPACITY_RULES, **(rules or {})}
+        self.system_databases = set(system_databases or DEFAULT_SYSTEM_DATABASES)
+        self.include_data = include_data
+
+    def _databases(self, conn) -> Dict[str, int]:
+        rows = conn.execute(text("""
+            SELECT datname,
+                   CASE WHEN has_database_privilege(datname, 'CONNECT')
+                        THEN pg_database_size(datname) ELSE 0 END AS size_bytes
+            FROM pg_database
+            WHERE datallowconn AND NOT datistemplate
+        """))
+        return {row.datname: row.size_bytes for row in rows
+                if row.datname not in self.system_databases}
+
+    @staticmethod
+    def _version_num(conn) -> int:
+        return int(conn.execute(text("SHOW server_version_num")).scalar())
+
+    def measure_source(self) -> Dict[str, Any]:
+        """Bancos a migrar (tamanhos) e versão da origem."""
+        with self.source_engine.connect() as conn:
+            return {'databases': self._databases(conn), 'version_num': self._version_num(conn)}
+
+    def _free_bytes(self, conn) -> Dict[str, Any]:
+        """Espaço livre: função administrativa, ou stand-in local."""
+        function = self.rules.get('free_space_function')
+        if function:
+            return {'free_bytes': int(conn.execute(text(function)).scalar()),
+                    'free_space_source': 'admin_function'}
+
+        directory = self.rules.get('local_data_directory')
+        if not directory and self.dest_engine.url.host in LOCAL_HOSTS:
+            try:
+                directory = conn.execute(text("SHOW data_directory")).scalar()
+            except Exception:
+                # data_directory exige superusuário ou pg_read_all_settings
+                conn.rollback()
+        if directory and Path(directory).exists():
+            return {'free_bytes': shutil.disk_usage(directory).free,
+                    'free_space_source': f"local:{directory}"}
+
+        return {'free_bytes': None, 'free_space_source': None}
+
+    def measure_destination(self) -> Dict[str, Any]:
+        """Bancos existentes, espaço livre, WAL, conexões e versão do destino."""
+        with self.dest_engine.connect() as conn:
+            settings = conn.execute(text("""
+                SELECT current_setting('max_connections')::int AS max_connections,
+                       current_setting('superuser_reserved_connections')::int AS reserved,
+                       pg_size_bytes(current_setting('max_wal_size')) AS max_wal_bytes,
+                       pg_database_size('template1') AS template_bytes,
+                       (SELECT count(*) FROM pg_stat_activity
+                        WHERE backend_type = 'client backend') AS active
+            """)).one()
+            measurements = {
+                'databases': self._databases(conn),
+                'version_num': self._version_num(conn),
+                'max_connections': settings.max_connections,
+                'reserved_connections': settings.reserved,
+                'active_connections': settings.active,
+                'max_wal_bytes': settings.max_wal_bytes,
+                'template_bytes': settings.template_bytes
+            }
+            measurements.update(self._free_bytes(conn))
+            return measurements
+
+    def plan(self) -> CapacityPlan:
+        """Executa todas as verificações."""
+        source = self.measure_source()
+        destination = self.measure_destination()
+        return CapacityPlan([
+            check_disk_space(source, destination, self.include_data, self.rules),
+            check_connections(destination, self.planned_connections, self.rules),
+            check_version(source, destination)
+        ])
+
+
+def print_plan(plan: CapacityPlan) -> None:
+    icons = {OK: "✅", WARNING: "⚠️", FAILED: "❌"}
+    for check in plan.checks:
+        print(f"   {icons[check.status]} {check.name}: {check.message}")
+    if plan.ok:
+        print("✅ Plano de capacidade aprovado")
+    else:
+        print("❌ Plano recusado: o destino não comporta a migração planejada")
+
+
+def main() -> int:
+    """Executa o planejamento com as configurações de secrets/."""
+    from app.core.sqlalchemy_migration import SQLAlchemyPostgreSQLMigrator
+
+    parser = argparse.ArgumentParser(description="Pré-voo de capacidade do destino")
+    parser.add_argument('--connections', type=int,
+                        help='Conexões simultâneas planejadas (padrão: pool do migrator)')
+    parser.add_argument('--no-data', action='store_true',
+                        help='Só estrutura/roles: não contar os dados das tabelas')
+    args = parser.parse_args()
+
+    migrator = SQLAlchemyPostgreSQLMigrator()
+    if not migrator.load_configs() or not migrator.create_engines():
+        return 1
+
+    planned = args.connections or migrator.pool_size + migrator.max_overflow
+    try:
+        plan = CapacityPlanner(migrator.source_engine, migrator.dest_engine, planned,
+                               include_data=not args.no_data).plan()
+    finally:
+        migrator.source_engine.dispose()
+        migrator.dest_engine.dispose()
+
+    print_plan(plan)
+    return 0 if plan.ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
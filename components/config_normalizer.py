@@ -99,6 +99,26 @@ def get_sqlalchemy_url(config, database='postgres'):
         f"?sslmode={norm_config['ssl_mode']}"
     )
 
+def get_connection_identity(config, database='postgres'):
+    """
+    Identidade da conexão (servidor, porta, banco e usuário), sem senha.
+
+    Args:
+        config (dict): Configuração completa do servidor
+        database (str): Nome do banco de dados
+
+    Returns:
+        dict: host, port, database e user normalizados
+    """
+    norm_config = normalize_server_config(config)
+
+    return {
+        'host': str(norm_config['host']).strip().lower(),
+        'port': int(norm_config['port']),
+        'database': database,
+        'user': norm_config['user']
+    }
+
 def validate_config_compatibility(source_config, dest_config):
     """
     Valida compatibilidade entre configurações de origem e destino.
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Lazy Imports - Descoberta de módulos sem importação
+===================================================
+
+Verifica a disponibilidade de módulos com importlib.util.find_spec (sem
+executar o módulo) e adia a importação real até o momento do uso. Com o
+perfil ativo (--import-profile), cada importação adiada é cronometrada.
+
+Uso:
+    from components.lazy_imports import import_profile, load_attribute, module_available
+
+    if module_available('app.core.sqlalchemy_migration'):
+        migrator_class = load_attribute('app.core.sqlalchemy_migration',
+                                        'SQLAlchemyPostgreSQLMigrator')
+"""
+
+import importlib
+import importlib.util
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+# Pacotes de terceiros cujo custo de importação interessa no relatório
+TRACKED_PACKAGES = ('sqlalchemy', 'psycopg2', 'colorama', 'mysql', 'asyncpg', 'jsonschema')
+
+
+def module_available(module_path: str) -> bool:
+    """
+    Indica se o módulo pode ser importado, sem importá-lo.
+
+    Pacotes pais são importados pelo find_spec (apenas seus __init__).
+    """
+    try:
+        return importlib.util.find_spec(module_path) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+class ImportProfile:
+    """Cronometra as importações adiadas e resume o custo por módulo."""
+
+    def __init__(self):
+        self.enabled = False
+        self.records: List[Dict[str, Any]] = []
+        self._started = time.perf_counter()
+        self._baseline = set(sys.modules)
+
+    def enable(self) -> None:
+        """Ativa o perfil (totais contados desde a importação deste módulo)."""
+        self.enabled = True
+
+    def import_module(self, module_path: str):
+        """Importa o módulo, registrando tempo e módulos carregados."""
+        if not self.enabled or module_path in sys.modules:
+            return importlib.import_module(module_path)
+
+        before = set(sys.modules)
+        start = time.perf_counter()
+        try:
+            return importlib.import_module(module_path)
+        finally:
+            loaded = set(sys.modules) - before
+            self.records.append({
+                'module': module_path,
+                'seconds': time.perf_counter() - start,
+                'modules_loaded': len(loaded),
+                'packages': sorted({name.split('.')[0] for name in loaded
+                                    if name.split('.')[0] in TRACKED_PACKAGES})
+            })
+
+    def report(self) -> None:
+        """Imprime o resumo das importações cronometradas."""
+        if not self.enabled:
+            return
+
+        elapsed = time.perf_counter() - self._started
+        loaded = set(sys.modules) - self._baseline
+        packages = sorted({name.split('.')[0] for name in loaded
+                           if name.split('.')[0] in TRACKED_PACKAGES})
+
+        print("\n⏱️ PERFIL DE IMPORTAÇÃO")
+        for record in sorted(self.records, key=lambda r: -r['seconds']):
+            extra = f" [{', '.join(record['packages'])}]" if record['packages'] else ""
+            print(f"   📦 {record['module']}: {record['seconds'] * 1000:.1f} ms "
+                  f"({record['modules_loaded']} módulos){extra}")
+        if not self.records:
+            print("   ✅ Nenhuma importação adiada foi necessária")
+        print(f"   📊 {len(loaded)} módulos carregados em {elapsed:.2f}s de execução")
+        print(f"   🧩 Pacotes pesados carregados: {', '.join(packages) or 'nenhum'}")
+        print("   💡 Detalhes por módulo: python -X importtime main.py ...")
+
+
+# Perfil global do processo (ativado por --import-profile)
+import_profile = ImportProfile()
+
+
+def load_attribute(module_path: str, attribute: Optional[str] = None) -> Any:
+    """
+    Importa (com perfil, se ativo) e retorna o módulo ou um atributo dele.
+
+    Raises:
+        ImportError: Se o módulo não puder ser importado
+        AttributeError: Se o atributo não existir
+    """
+    module = import_profile.import_module(module_path)
+    return getattr(module, attribute) if attribute else module
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Logging Utils - Logging não bloqueante para os migrators
+=======================================================
+
+Os migrators registram em loggers filhos de "migration" (ex.:
+"migration.sqlalchemy"), com formatação preguiçosa (%s). Os handlers do
+logger "migration" são servidos por uma thread (QueueHandler/QueueListener),
+de modo que I/O de terminal e arquivo não bloqueia os loops de execução.
+
+Uso:
+    from components.logging_utils import get_migration_logger
+
+    logger = get_migration_logger('sqlalchemy')
+    logger.debug("GRANT %s → %s", privilege, username)
+"""
+
+import atexit
+import logging
+import logging.handlers
+import queue
+import sys
+from pathlib import Path
+from typing import Optional, Tuple
+
+# Logger raiz da migração; MigrationLogger configura seus handlers e níveis
+MIGRATION_LOGGER = 'migration'
+
+# Rotação padrão quando config.ini [LOGGING] não está disponível
+DEFAULT_MAX_LOG_FILES = 10
+DEFAULT_LOG_FILE_SIZE_MB = 50
+
+
+def get_migration_logger(component: str) -> logging.Logger:
+    """Logger de um componente, filho de "migration" (herda níveis e handlers)."""
+    return logging.getLogger(f"{MIGRATION_LOGGER}.{component}")
+
+
+def attach_queue_handler(logger: logging.Logger) -> Optional[logging.handlers.QueueListener]:
+    """
+    Move os handlers do logger para uma thread de escrita.
+
+    O logger passa a ter apenas um QueueHandler; os handlers originais são
+    servidos por um QueueListener que respeita o nível de cada handler.
+    Idempotente: chamadas seguintes apenas incorporam handlers novos.
+
+    Returns:
+        QueueListener em execução (None se o logger não tem handlers)
+    """
+    listener = getattr(logger, '_queue_listener', None)
+    handlers = [h for h in logger.handlers
+                if not isinstance(h, logging.handlers.QueueHandler)]
+
+    if listener is not None:
+        if handlers:
+            listener.stop()
+            listener.handlers = tuple(listener.handlers) + tuple(handlers)
+            listener.start()
+            for handler in handlers:
+                logger.removeHandler(handler)
+        return listener
+
+    if not handlers:
+        return None
+
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(
+        log_queue, *handlers, respect_handler_level=True)
+
+    for handler in handlers:
+        logger.removeHandler(handler)
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    listener.start()
+
+    logger._queue_listener = listener
+    atexit.register(listener.stop)
+    return listener
+
+
+def detach_queue_handler(logger: logging.Logger) -> None:
+    """Esvazia a fila e devolve os handlers originais ao logger."""
+    listener = getattr(logger, '_queue_listener', None)
+    if listener is None:
+        return
+
+    listener.stop()
+    for handler in list(logger.handlers):
+        if isinstance(handler, logging.handlers.QueueHandler):
+            logger.removeHandler(handler)
+    for handler in listener.handlers:
+        logger.addHandler(handler)
+    del logger._queue_listener
+
+
+def configure_console_logging(level: int = logging.INFO) -> logging.Logger:
+    """
+    Saída de console para execuções avulsas dos migrators.
+
+    Não altera nada se "migration" já tem handlers (ex.: configurados pelo
+    MigrationLogger do orquestrador).
+    """
+    logger = logging.getLogger(MIGRATION_LOGGER)
+    if logger.handlers:
+        return logger
+
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setLevel(level)
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    logger.addHandler(handler)
+    logger.setLevel(min(level, logger.getEffectiveLevel()))
+    logger.propagate = False
+    attach_queue_handler(logger)
+    return logger
+
+
+def rotation_settings() -> Tuple[int, int]:
+    """
+    Limites de rotação do arquivo de log (config.ini [LOGGING]).
+
+    Returns:
+        (max_log_files, log_file_size_mb)
+    """
+    try:
+        from components.config_manager import config
+        return (config.getint('LOGGING', 'max_log_files', fallback=DEFAULT_MAX_LOG_FILES),
+                config.getint('LOGGING', 'log_file_size_mb', fallback=DEFAULT_LOG_FILE_SIZE_MB))
+    except Exception:
+        return DEFAULT_MAX_LOG_FILES, DEFAULT_LOG_FILE_SIZE_MB
+
+
+def rotating_file_handler(log_file: Path, max_log_files: Optional[int] = None,
+                          log_file_size_mb: Optional[float] = None) -> logging.Handler:
+    """
+    Handler de arquivo com rotação por tamanho.
+
+    Args:
+        log_file: Arquivo de log atual
+        max_log_files: Total de arquivos mantidos, incluindo o atual
+            (padrão: config.ini)
+        log_file_size_mb: Tamanho que dispara a rotação (padrão: config.ini)
+    """
+    default_files, default_size = rotation_settings()
+    max_log_files = max_log_files or default_files
+    log_file_size_mb = log_file_size_mb or default_size
+
+    # backupCount=0 desativaria a rotação; mantém ao menos um arquivo antigo
+    return logging.handlers.RotatingFileHandler(
+        log_file, maxBytes=int(log_file_size_mb * 1024 * 1024),
+        backupCount=max(max_log_files - 1, 1), encoding='utf-8')
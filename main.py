@@ -30,13 +30,12 @@ project_root = Path(__file__).parent.resolve()
 os.environ['PROJECT_HOME'] = str(project_root)
 sys.path.insert(0, str(project_root))
 
-# Importar sistema v4.0.0
-try:
-    from app.core.migration_orchestrator import MigrationOrchestrator
-    SYSTEM_V4_AVAILABLE = True
-except ImportError:
+from components.lazy_imports import import_profile, load_attribute, module_available
+
+# Localizar sistema v4.0.0 (importado apenas quando inicializado)
+SYSTEM_V4_AVAILABLE = module_available('app.core.migration_orchestrator')
+if not SYSTEM_V4_AVAILABLE:
     print("⚠️ Sistema v4.0.0 não encontrado, usando modo de compatibilidade")
-    SYSTEM_V4_AVAILABLE = False
 
 # === IMPORTS CONDICIONAIS PARA TODOS OS MÓDULOS ===
 
@@ -65,18 +64,9 @@ def check_module_availability():
         'config_manager': 'components.config_manager',
     }
 
-    availability = {}
-
-    for name, module_path in modules_to_check.items():
-        try:
-            __import__(module_path)
-            availability[name] = True
-        except ImportError:
-            availability[name] = False
-        except Exception:
-            availability[name] = False
-
-    return availability
+    # find_spec apenas localiza o módulo, sem executá-lo
+    return {name: module_available(module_path)
+            for name, module_path in modules_to_check.items()}
 
 
 def setup_project_environment():
@@ -1051,6 +1041,8 @@ class MainController:
         """Inicializa o sistema v4.0.0."""
         try:
             if SYSTEM_V4_AVAILABLE:
+                MigrationOrchestrator = load_attribute(
+                    'app.core.migration_orchestrator', 'MigrationOrchestrator')
                 self.orchestrator = MigrationOrchestrator()
                 return self.orchestrator.load_config()
             else:
@@ -1168,9 +1160,14 @@ Exemplos de uso:
                         help='Arquivo de entrada (para geração/execução)')
     parser.add_argument('--verbose', action='store_true',
                         help='Logs detalhados')
+    parser.add_argument('--import-profile', action='store_true',
+                        help='Mostrar custo de importação dos módulos ao final')
 
     args = parser.parse_args()
 
+    if args.import_profile:
+        import_profile.enable()
+
     # Configurar logging
     log_level = "DEBUG" if args.verbose else "INFO"
     logger = setup_logging(log_level)
@@ -1291,4 +1288,7 @@ def show_interactive_menu(controller):
 
 
 if __name__ == "__main__":
-    sys.exit(main())
+    try:
+        sys.exit(main())
+    finally:
+        import_profile.report()
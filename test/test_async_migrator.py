@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Testes do backend assíncrono de migração (sem servidor real).
+
+Execute com:
+  python3 -m pytest test/test_async_migrator.py -v
+"""
+
+import asyncio
+import io
+import unittest
+from contextlib import asynccontextmanager, redirect_stdout
+
+from app.core.async_migrator import (AsyncPostgreSQLMigrator, BoundedConnections,
+                                     quote_literal)
+
+
+def role(name, password=None):
+    return {
+        'rolname': name, 'rolpassword': password, 'rolcanlogin': True,
+        'rolsuper': False, 'rolinherit': True, 'rolcreaterole': False,
+        'rolcreatedb': False, 'rolreplication': False, 'rolconnlimit': -1
+    }
+
+
+class Server:
+    """Estado compartilhado de um servidor falso com latência injetada."""
+
+    def __init__(self, latency=0.001):
+        self.latency = latency
+        self.active = 0
+        self.max_active = 0
+        self.events = []
+        self.roles = {'postgres'}
+        self.databases = {'postgres': 'postgres'}
+        self.source_roles = []
+        self.source_databases = []
+        self.acls = []
+
+    async def connect(self):
+        return FakeAsyncConnection(self)
+
+
+class FakeAsyncConnection:
+    """Imita a API do asyncpg usada pelo migrator."""
+
+    def __init__(self, server):
+        self.server = server
+        self.server.active += 1
+        self.server.max_active = max(self.server.max_active, self.server.active)
+
+    async def _round_trip(self, label):
+        self.server.events.append(label)
+        await asyncio.sleep(self.server.latency)
+
+    async def execute(self, sql, *args):
+        await self._round_trip('write')
+        for statement in sql.split(';\n'):
+            statement = statement.strip()
+            if statement.startswith('CREATE ROLE'):
+                self.server.roles.add(statement.split('"')[1])
+            elif statement.startswith('CREATE DATABASE'):
+                self.server.databases[statement.split('"')[1]] = 'postgres'
+            elif 'ON DATABASE "broken"' in statement:
+                raise Exception('permission denied')
+
+    async def fetch(self, sql, *args):
+        await self._round_trip('read')
+        if 'ANY($1' in sql:
+            return [{'rolname': name} for name in args[0] if name in self.server.roles]
+        if 'aclexplode' in sql:
+            return self.server.acls
+        if 'FROM pg_roles' in sql and 'pg_database' not in sql:
+            return [{'rolname': name} for name in self.server.roles]
+        if 'datconnlimit' in sql:
+            return self.server.source_databases
+        return [{'datname': name, 'owner': owner}
+                for name, owner in self.server.databases.items()]
+
+    async def cursor(self, sql, prefetch=50):
+        for row in self.server.source_roles:
+            if self.server.source_roles.index(row) % prefetch == 0:
+                await self._round_trip('read_roles')
+            yield row
+
+    @asynccontextmanager
+    async def transaction(self):
+        yield
+
+    async def close(self):
+        self.server.active -= 1
+
+
+class TestAsyncMigrator(unittest.IsolatedAsyncioTestCase):
+    """Testes para AsyncPostgreSQLMigrator."""
+
+    def setUp(self):
+        self.source = Server()
+        self.dest = Server()
+        self.source.source_roles = [role(f'u{i}', password=f"md5'{i}") for i in range(50)]
+        self.source.source_databases = [
+            {'datname': name, 'owner': 'u1', 'datconnlimit': -1}
+            for name in ('app', 'crm', 'broken', 'erp')]
+        self.source.acls = [{'datname': 'app', 'grantee': 'u2', 'privileges': ['CONNECT']}]
+
+        self.migrator = AsyncPostgreSQLMigrator(max_connections=2)
+        self.migrator.role_batch_size = 10
+        self.migrator.source = BoundedConnections('origem', self.source.connect, 2)
+        self.migrator.destination = BoundedConnections('destino', self.dest.connect, 2)
+
+    async def _migrate(self):
+        with redirect_stdout(io.StringIO()):
+            result = await self.migrator.migrate()
+            await self.migrator.close_connections()
+        return result
+
+    async def test_migrates_roles_databases_and_privileges(self):
+        """Roles, bancos e GRANTs aplicados; GRANT com erro fica isolado"""
+        result = await self._migrate()
+
+        self.assertEqual(result['users_created'], 50)
+        self.assertEqual(result['databases_created'], 4)
+        # 4 bancos x (PUBLIC CONNECT/TEMPORARY + ALL owner) + CONNECT u2 em app
+        # menos os 3 GRANTs do banco "broken"
+        self.assertEqual(result['privileges_applied'], 4 * 3 + 1 - 3)
+        self.assertIn('u49', self.dest.roles)
+
+    async def test_connections_bounded_per_server(self):
+        """Semáforo limita as conexões simultâneas em cada servidor"""
+        await self._migrate()
+
+        self.assertLessEqual(self.source.max_active, 2)
+        self.assertLessEqual(self.dest.max_active, 2)
+        self.assertLessEqual(self.migrator.destination.opened, 2)
+        self.assertEqual(self.dest.active, 0)
+
+    async def test_source_reads_overlap_destination_writes(self):
+        """Escritas no destino começam antes do fim da leitura da origem"""
+        loop = asyncio.get_running_loop()
+        source_reads, dest_writes = [], []
+
+        async def source_trip(label, server=self.source):
+            source_reads.append(loop.time())
+            await asyncio.sleep(server.latency)
+
+        async def dest_trip(label, server=self.dest):
+            if label == 'write':
+                dest_writes.append(loop.time())
+            await asyncio.sleep(server.latency)
+
+        original_connect_source = self.source.connect
+        original_connect_dest = self.dest.connect
+
+        async def connect_source():
+            conn = await original_connect_source()
+            conn._round_trip = source_trip
+            return conn
+
+        async def connect_dest():
+            conn = await original_connect_dest()
+            conn._round_trip = dest_trip
+            return conn
+
+        self.migrator.source = BoundedConnections('origem', connect_source, 2)
+        self.migrator.destination = BoundedConnections('destino', connect_dest, 2)
+
+        await self._migrate()
+
+        self.assertLess(min(dest_writes), max(source_reads))
+
+    async def test_consumer_failure_does_not_hang(self):
+        """Erro no consumidor de roles cancela o produtor em vez de travar"""
+        self.source.source_roles = [role(f'u{i}') for i in range(100)]
+
+        async def failing_snapshot():
+            raise Exception('snapshot de roles indisponível')
+
+        self.migrator.load_role_snapshot_async = failing_snapshot
+
+        with self.assertRaisesRegex(Exception, 'snapshot de roles indisponível'):
+            await asyncio.wait_for(self._migrate(), 3)
+        await self.migrator.close_connections()
+
+        self.assertEqual(self.source.active, 0)
+        self.assertEqual(self.dest.roles, {'postgres'})
+
+    async def test_producer_failure_releases_consumer(self):
+        """Erro na leitura da origem com a fila cheia não deixa o consumidor esperando"""
+        self.source.source_roles = [role(f'u{i}') for i in range(100)]
+        original_cursor = FakeAsyncConnection.cursor
+
+        async def failing_cursor(conn, sql, prefetch=50):
+            async for row in original_cursor(conn, sql, prefetch):
+                if row['rolname'] == 'u95':
+                    raise Exception('conexão com a origem perdida')
+                yield row
+
+        original_connect = self.source.connect
+
+        async def connect_source():
+            conn = await original_connect()
+            conn.cursor = lambda sql, prefetch=50: failing_cursor(conn, sql, prefetch)
+            return conn
+
+        self.migrator.source = BoundedConnections('origem', connect_source, 2)
+
+        with self.assertRaisesRegex(Exception, 'conexão com a origem perdida'):
+            await asyncio.wait_for(self._migrate(), 3)
+        await self.migrator.close_connections()
+
+    def test_quote_literal(self):
+        """Aspas simples da senha são escapadas"""
+        self.assertEqual(quote_literal("md5'x"), "'md5''x'")
+
+
+if __name__ == '__main__':
+    unittest.main()
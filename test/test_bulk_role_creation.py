@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Testes da criação de roles em lote no destino.
+
+Execute com:
+  python3 -m pytest test/test_bulk_role_creation.py -v
+"""
+
+import io
+import unittest
+from contextlib import redirect_stdout
+from types import SimpleNamespace
+
+from app.core.sqlalchemy_migration import SQLAlchemyPostgreSQLMigrator
+
+
+def role(name, password=None, superuser=False):
+    return {
+        'rolname': name, 'rolpassword': password, 'rolcanlogin': True,
+        'rolsuper': superuser, 'rolinherit': True, 'rolcreaterole': False,
+        'rolcreatedb': False, 'rolreplication': False, 'rolconnlimit': -1
+    }
+
+
+class FakeResult(list):
+    def fetchone(self):
+        return self[0] if self else None
+
+
+class RoleConnection:
+    """Conexão falsa que simula pg_roles e conta idas ao servidor."""
+
+    def __init__(self, existing, refuse_superuser=False, lost=()):
+        self.roles = set(existing)
+        self.pending = set()
+        self.refuse_superuser = refuse_superuser
+        self.lost = set(lost)
+        self.round_trips = 0
+        self.statements = []
+        self.params = []
+
+    def execute(self, query, params=None):
+        self.round_trips += 1
+        sql = str(query)
+        self.statements.append(sql)
+        self.params.append(params or {})
+        if sql.startswith('SELECT rolname FROM pg_roles WHERE rolname = ANY'):
+            return FakeResult(SimpleNamespace(rolname=name)
+                              for name in params['names'] if name in self.roles)
+        if sql.startswith('SELECT rolname FROM pg_roles WHERE'):
+            found = params['username'] in self.roles
+            return FakeResult([SimpleNamespace(rolname=params['username'])] if found else [])
+        if sql.startswith('SELECT rolname FROM pg_roles'):
+            return FakeResult(SimpleNamespace(rolname=name) for name in self.roles)
+        for line in sql.split(';\n'):
+            if 'SUPERUSER' in line and self.refuse_superuser:
+                self.pending.clear()
+                raise Exception('must be superuser to create superusers')
+            name = line.split('"')[1]
+            if name not in self.lost:
+                self.pending.add(name)
+        return FakeResult()
+
+    def commit(self):
+        self.roles |= self.pending
+        self.pending.clear()
+
+    def rollback(self):
+        self.pending.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+
+class TestBulkRoleCreation(unittest.TestCase):
+    """Testes para SQLAlchemyPostgreSQLMigrator.create_users_in_destination."""
+
+    def _create(self, conn, users, batch_size=500):
+        migrator = SQLAlchemyPostgreSQLMigrator()
+        migrator.dest_engine = SimpleNamespace(connect=lambda: conn)
+        migrator.role_batch_size = batch_size
+        with redirect_stdout(io.StringIO()):
+            created = migrator.create_users_in_destination(users)
+        return migrator, created
+
+    def test_batches_use_one_create_and_one_verify_each(self):
+        """Cada lote: uma ida para os CREATE ROLE e uma verificação com ANY"""
+        conn = RoleConnection(existing={'postgres', 'old'})
+        users = [role('old')] + [role(f'u{i}', password=f'md5{i}') for i in range(1200)]
+
+        migrator, created = self._create(conn, users)
+
+        self.assertEqual(created, 1200)
+        # snapshot + 3 x (CREATE em lote + verificação)
+        self.assertEqual(conn.round_trips, 1 + 3 * 2)
+        self.assertEqual(conn.params[1]['password_0'], 'md50')
+        self.assertIn('u1199', migrator.load_role_snapshot())
+
+    def test_missing_roles_found_by_set_difference(self):
+        """Roles não persistidos não entram no snapshot nem na contagem"""
+        conn = RoleConnection(existing={'postgres'}, lost={'b'})
+
+        migrator, created = self._create(conn, [role('a'), role('b'), role('c')])
+
+        self.assertEqual(created, 2)
+        self.assertNotIn('b', migrator.load_role_snapshot())
+
+    def test_refused_batch_falls_back_to_individual_creation(self):
+        """Lote recusado é desfeito e os roles são criados um a um"""
+        conn = RoleConnection(existing={'postgres'}, refuse_superuser=True)
+        users = [role('a'), role('root', superuser=True), role('b')]
+
+        migrator, created = self._create(conn, users)
+
+        self.assertEqual(created, 2)
+        self.assertEqual(conn.roles, {'postgres', 'a', 'b'})
+        self.assertEqual(migrator.load_role_snapshot(), {'postgres', 'a', 'b'})
+
+
+if __name__ == '__main__':
+    unittest.main()
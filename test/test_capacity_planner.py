@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Testes do planejamento de capacidade (pré-voo do destino).
+
+Execute com:
+  python3 -m pytest test/test_capacity_planner.py -v
+"""
+
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from app.orchestrators.run_state import RunStateStore
+from app.validation.capacity_planner import (DEFAULT_CAPACITY_RULES, FAILED, OK, WARNING,
+                                             CapacityPlanner, check_connections,
+                                             check_disk_space, check_version, major_version)
+from test_run_state import make_orchestrator
+
+GB = 1024 ** 3
+
+SOURCE = {'databases': {'app': 10 * GB, 'erp': 5 * GB, 'ja_migrado': 20 * GB},
+          'version_num': 140010}
+
+
+def destination(**overrides):
+    measurements = {'databases': {'ja_migrado': 20 * GB}, 'version_num': 160002,
+                    'free_bytes': 100 * GB, 'free_space_source': 'admin_function',
+                    'template_bytes': 8 * 1024 ** 2, 'max_wal_bytes': 1 * GB,
+                    'max_connections': 100, 'reserved_connections': 3,
+                    'active_connections': 40}
+    measurements.update(overrides)
+    return measurements
+
+
+class TestDiskSpaceCheck(unittest.TestCase):
+    """Testes para check_disk_space."""
+
+    def test_required_space_includes_index_and_wal_overhead(self):
+        result = check_disk_space(SOURCE, destination())
+
+        details = result.details
+        self.assertEqual(result.status, OK)
+        # Banco já existente no destino não é recriado
+        self.assertEqual(details['databases_to_create'], 2)
+        self.assertEqual(details['data_bytes'], 15 * GB)
+        self.assertEqual(details['index_rebuild_bytes'], 15 * GB * 0.25)
+        self.assertEqual(details['wal_bytes'], 1 * GB)
+        expected = (15 * GB + 2 * 8 * 1024 ** 2 + 15 * GB * 0.25 + GB) * 1.15
+        self.assertAlmostEqual(details['required_bytes'], expected)
+
+    def test_refuses_when_disk_would_fill(self):
+        result = check_disk_space(SOURCE, destination(free_bytes=20 * GB))
+        self.assertEqual(result.status, FAILED)
+        self.assertIn("Espaço insuficiente", result.message)
+
+    def test_structure_only_counts_templates(self):
+        result = check_disk_space(SOURCE, destination(free_bytes=1 * GB), include_data=False)
+        self.assertEqual(result.status, OK)
+        self.assertEqual(result.details['data_bytes'], 0)
+
+    def test_unmeasured_free_space_is_a_warning(self):
+        result = check_disk_space(SOURCE, destination(free_bytes=None))
+        self.assertEqual(result.status, WARNING)
+
+
+class TestConnectionAndVersionChecks(unittest.TestCase):
+    """Testes para check_connections e check_version."""
+
+    def test_connection_headroom(self):
+        # 100 - 3 reservadas - 40 ativas - 10 de folga = 47 disponíveis
+        self.assertEqual(check_connections(destination(), 47).status, OK)
+        refused = check_connections(destination(), 48)
+        self.assertEqual(refused.status, FAILED)
+        self.assertIn("no máximo 47", refused.message)
+
+    def test_destination_older_than_source_is_refused(self):
+        self.assertEqual(check_version(SOURCE, destination()).status, OK)
+        self.assertEqual(check_version(SOURCE, destination(version_num=130008)).status, FAILED)
+        self.assertEqual(major_version(90624), (9, 6))
+        self.assertEqual(major_version(160002), (16, 0))
+
+    def test_upgrade_from_9x_is_accepted(self):
+        result = check_version({'version_num': 90624}, destination(version_num=160002))
+        self.assertEqual(result.status, OK)
+        self.assertEqual(result.message, "Origem 9.6 → destino 16")
+        downgrade = check_version({'version_num': 100023}, {'version_num': 90624})
+        self.assertEqual(downgrade.status, FAILED)
+
+
+class TestCapacityPlanner(unittest.TestCase):
+    """Planejamento completo com medições simuladas."""
+
+    def test_plan_fails_if_any_check_fails(self):
+        planner = CapacityPlanner(mock.MagicMock(), mock.MagicMock(), planned_connections=60,
+                                  rules={'safety_margin': 0.5})
+        self.assertEqual(planner.rules['index_rebuild_ratio'],
+                         DEFAULT_CAPACITY_RULES['index_rebuild_ratio'])
+
+        with mock.patch.object(planner, 'measure_source', return_value=SOURCE), \
+                mock.patch.object(planner, 'measure_destination', return_value=destination()):
+            plan = planner.plan()
+
+        statuses = {check.name: check.status for check in plan.checks}
+        self.assertEqual(statuses, {'disk_space_check': OK, 'connection_headroom': FAILED,
+                                    'version_compatibility': OK})
+        self.assertFalse(plan.ok)
+        self.assertFalse(plan.to_dict()['ok'])
+
+
+class TestOrchestratorCapacityStep(unittest.TestCase):
+    """O passo capacity_planning bloqueia a migração quando recusado."""
+
+    def test_refused_plan_fails_the_step(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            orchestrator = make_orchestrator(RunStateStore(Path(tmp) / "run_state.db"), 's1', [])
+            del orchestrator.plan_capacity  # passo real
+            migrator = mock.MagicMock(pool_size=5, max_overflow=10)
+            orchestrator.module_manager.get_module.return_value = migrator
+            orchestrator.migration_rules = {'migration_rules': {
+                'data_migration': {'enabled': True},
+                'validation_rules': {'pre_migration_checks': ['disk_space_check']}}}
+
+            with mock.patch.object(CapacityPlanner, 'measure_source', return_value=SOURCE), \
+                    mock.patch.object(CapacityPlanner, 'measure_destination',
+                                      return_value=destination(free_bytes=GB)):
+                self.assertFalse(orchestrator.plan_capacity())
+
+        step = orchestrator._get_step('capacity_planning')
+        # version_compatibility não está em pre_migration_checks
+        self.assertEqual([check['name'] for check in step.result_data['checks']],
+                         ['disk_space_check', 'connection_headroom'])
+        self.assertIn("disk_space_check", step.error_message)
+        migrator.dest_engine.dispose.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
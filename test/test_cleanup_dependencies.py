@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Testes da varredura de dependências de usuários em todos os bancos.
+
+Execute com:
+  python3 -m pytest test/test_cleanup_dependencies.py -v
+"""
+
+import threading
+import unittest
+from unittest import mock
+
+from sqlalchemy.engine import make_url
+
+from app.cleanup.cleanup_database import PostgreSQLCleanup
+
+URL = make_url("postgresql://admin:secret@db:5432/postgres")
+
+# Objetos por banco: (role, tipo, total, amostra)
+OBJECTS = {
+    'postgres': [],
+    'app': [('alice', 'schema', 1, ['vendas']),
+            ('alice', 'table', 25, [f"vendas.t{i}" for i in range(10)])],
+    'erp': [('bob', 'function', 2, ['public.calc', 'public.total'])],
+    'bloqueado': RuntimeError("permission denied for database"),
+}
+
+
+def fake_connection(execute):
+    conn = mock.MagicMock()
+    conn.__enter__.return_value = conn
+    conn.execute.side_effect = execute
+    return conn
+
+
+class TestScanUserDependencies(unittest.TestCase):
+    """Testes para scan_user_dependencies."""
+
+    def setUp(self):
+        self.cleanup = PostgreSQLCleanup({}, "destino")
+        self.cleanup.scan_workers = 3
+        self.queries = []
+        self.lock = threading.Lock()
+
+        def cluster_execute(statement, params=None):
+            sql = str(statement)
+            if "datdba" in sql:
+                self.roles = params['roles']
+                return [row for row in [('carol', 'carol_db')] if row[0] in params['roles']]
+            return [(name,) for name in OBJECTS]
+
+        self.cleanup.engine = mock.MagicMock(url=URL)
+        self.cleanup.engine.connect.side_effect = lambda: fake_connection(cluster_execute)
+
+        def create_engine(url, **kwargs):
+            database = url.database
+
+            def execute(statement, params=None):
+                with self.lock:
+                    self.queries.append(database)
+                if isinstance(OBJECTS[database], Exception):
+                    raise OBJECTS[database]
+                result = mock.MagicMock()
+                result.fetchall.return_value = [row for row in OBJECTS[database]
+                                                if row[0] in params['roles']]
+                return result
+
+            engine = mock.MagicMock()
+            engine.connect.side_effect = lambda: fake_connection(execute)
+            return engine
+
+        patcher = mock.patch('app.cleanup.cleanup_database.create_engine',
+                             side_effect=create_engine)
+        self.create_engine = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_index_merges_every_database(self):
+        index = self.cleanup.scan_user_dependencies(['alice', 'bob', 'carol'])
+
+        # Uma única consulta por banco, para todas as roles
+        self.assertEqual(self.roles, ['alice', 'bob', 'carol'])
+        self.assertEqual(sorted(self.queries), sorted(OBJECTS))
+        urls = [call.args[0] for call in self.create_engine.call_args_list]
+        self.assertEqual(sorted(url.database for url in urls), sorted(OBJECTS))
+        self.assertTrue(all(url.password == 'secret' for url in urls))
+
+        alice = index['alice']
+        self.assertTrue(alice['has_dependencies'])
+        self.assertEqual(alice['owned_schemas'], ['app:vendas'])
+        self.assertEqual(len(alice['owned_tables']), 10)
+        self.assertEqual(alice['owned_objects_total'], 26)
+        self.assertEqual(index['bob']['owned_functions'], ['erp:public.calc', 'erp:public.total'])
+        self.assertEqual(index['carol']['owned_databases'], ['carol_db'])
+        self.assertTrue(index['carol']['has_dependencies'])
+        self.assertEqual(index['alice']['unscanned_databases'], ['bloqueado'])
+
+    def test_cleanup_all_users_scans_once(self):
+        self.cleanup.list_users = lambda: ['postgres', 'alice', 'dave']
+
+        with mock.patch.object(self.cleanup, 'scan_user_dependencies',
+                               wraps=self.cleanup.scan_user_dependencies) as scan:
+            result = self.cleanup.cleanup_all_users(dry_run=True)
+
+        scan.assert_called_once_with(['alice', 'dave'])
+        self.assertEqual(result['skipped'], 1)
+        self.assertEqual(result['deleted'], 1)
+
+    def test_cluster_query_failure_assumes_dependencies(self):
+        self.cleanup.engine.connect.side_effect = RuntimeError("conexão recusada")
+        index = self.cleanup.scan_user_dependencies(['alice'])
+        self.assertTrue(index['alice']['has_dependencies'])
+
+
+if __name__ == '__main__':
+    unittest.main()
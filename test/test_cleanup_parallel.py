@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Testes do modo paralelo de limpeza de bancos (PostgreSQLCleanup).
+
+Execute com:
+  python3 -m pytest test/test_cleanup_parallel.py -v
+"""
+
+import threading
+import unittest
+from unittest import mock
+
+from app.cleanup.cleanup_database import PostgreSQLCleanup, quote_ident
+
+
+class FakeEngine:
+    """Engine que registra os statements executados em cada conexão."""
+
+    def __init__(self, version_num=160002, failing=()):
+        self.version_num = version_num
+        self.failing = set(failing)
+        self.statements = []
+        self.connections = 0
+        self.url = "postgresql://admin@db/postgres"
+        self.disposed = False
+        self._lock = threading.Lock()
+
+    def dispose(self):
+        self.disposed = True
+
+    def connect(self):
+        with self._lock:
+            self.connections += 1
+        engine = self
+
+        conn = mock.MagicMock()
+        conn.__enter__.return_value = conn
+
+        def execute(statement, params=None):
+            sql = str(statement)
+            with engine._lock:
+                engine.statements.append((sql, params))
+            if "DROP DATABASE" in sql and any(name in sql for name in engine.failing):
+                raise RuntimeError("canceling statement due to lock timeout")
+            result = mock.MagicMock()
+            if "server_version_num" in sql:
+                result.scalar.return_value = engine.version_num
+            elif "pg_terminate_backend" in sql:
+                result.scalar.return_value = 7
+            return result
+
+        conn.execute.side_effect = execute
+        return conn
+
+    def executed(self, fragment):
+        return [(sql, params) for sql, params in self.statements if fragment in sql]
+
+
+def make_cleanup(engine, databases):
+    cleanup = PostgreSQLCleanup({'cleanup_protection': {'protected_databases': ['keep']}},
+                                "destino")
+    cleanup.engine = engine
+    cleanup.list_databases = lambda: databases
+    return cleanup
+
+
+class TestParallelDrops(unittest.TestCase):
+    """Testes para cleanup_all_databases(parallel=N)."""
+
+    def setUp(self):
+        # O modo paralelo cria um engine próprio; aqui ele é o mesmo FakeEngine
+        patcher = mock.patch('app.cleanup.cleanup_database.create_engine',
+                             side_effect=lambda url, **kwargs: self.drop_engine)
+        self.create_engine = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_bulk_terminate_then_forced_drops(self):
+        engine = self.drop_engine = FakeEngine()
+        databases = ['postgres', 'keep'] + [f"db_{i}" for i in range(20)]
+        cleanup = make_cleanup(engine, databases)
+
+        result = cleanup.cleanup_all_databases(parallel=4, lock_timeout_ms=2500)
+
+        self.assertTrue(result['success'])
+        self.assertEqual(result['deleted'], 20)
+        # Uma única terminação de conexões para todos os alvos
+        [(_, params)] = engine.executed("pg_terminate_backend")
+        self.assertEqual(sorted(params['databases']), sorted(databases[2:]))
+
+        drops = engine.executed("DROP DATABASE")
+        self.assertEqual(len(drops), 20)
+        self.assertTrue(all(sql.endswith("WITH (FORCE)") for sql, _ in drops))
+        self.assertFalse(any('"keep"' in sql or '"postgres"' in sql for sql, _ in drops))
+        self.assertEqual(len(engine.executed("SET lock_timeout = 2500")), 20)
+        # lock_timeout não fica na conexão devolvida ao pool
+        self.assertEqual(len(engine.executed("RESET lock_timeout")), 20)
+
+    def test_parallel_engine_has_one_connection_per_worker(self):
+        engine = self.drop_engine = FakeEngine()
+        cleanup = make_cleanup(engine, [f"db_{i}" for i in range(40)])
+
+        cleanup.cleanup_all_databases(parallel=20)
+
+        kwargs = self.create_engine.call_args.kwargs
+        self.assertEqual(self.create_engine.call_args.args, (engine.url,))
+        self.assertEqual((kwargs['pool_size'], kwargs['max_overflow']), (20, 0))
+        self.assertEqual(kwargs['isolation_level'], "AUTOCOMMIT")
+        self.assertTrue(engine.disposed)
+
+    def test_fallback_without_force_and_failures_are_reported(self):
+        engine = self.drop_engine = FakeEngine(version_num=120015, failing={'db_3'})
+        cleanup = make_cleanup(engine, [f"db_{i}" for i in range(6)])
+
+        result = cleanup.cleanup_all_databases(parallel=3)
+
+        self.assertFalse(result['success'])
+        self.assertEqual(result['deleted'], 5)
+        self.assertFalse(any("FORCE" in sql for sql, _ in engine.executed("DROP DATABASE")))
+
+    def test_sequential_and_dry_run_paths_unchanged(self):
+        engine = self.drop_engine = FakeEngine()
+        cleanup = make_cleanup(engine, ['db_a', 'db_b'])
+
+        result = cleanup.cleanup_all_databases(dry_run=True, parallel=4)
+
+        self.assertEqual(result['deleted'], 2)
+        self.assertEqual(engine.statements, [])
+
+        cleanup.cleanup_all_databases()
+        self.assertEqual(len(engine.executed("pg_terminate_backend")), 2)
+        self.assertFalse(any("FORCE" in sql for sql, _ in engine.executed("DROP DATABASE")))
+
+    def test_quote_ident(self):
+        self.assertEqual(quote_ident('a"b'), '"a""b"')
+
+
+if __name__ == '__main__':
+    unittest.main()
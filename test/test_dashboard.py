@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Testes do dashboard de progresso (SSE).
+
+Execute com:
+  python3 -m pytest test/test_dashboard.py -v
+"""
+
+import http.client
+import io
+import json
+import unittest
+import urllib.request
+from contextlib import redirect_stdout
+
+from app.monitoring.dashboard import DashboardServer, ProgressHub, progress_hub
+from app.monitoring.metrics import registry
+from test_sqlalchemy_privileges import TestApplyDatabasePrivileges
+
+
+def read_events(response, count):
+    """Lê `count` eventos SSE (tipo, dados) da resposta."""
+    events = []
+    event_type = None
+    while len(events) < count:
+        line = response.readline().decode("utf-8").rstrip("\n")
+        if line.startswith("event: "):
+            event_type = line[len("event: "):]
+        elif line.startswith("data: "):
+            events.append((event_type, json.loads(line[len("data: "):])))
+    return events
+
+
+class TestProgressHub(unittest.TestCase):
+    """Testes para ProgressHub."""
+
+    def test_phases_and_eta(self):
+        hub = ProgressHub()
+        hub.set_total('databases', 10)
+        hub._phases['databases']['started_at'] -= 4
+        hub.advance('databases', 2, item='db_2')
+
+        snapshot = hub.snapshot()
+
+        self.assertEqual(snapshot['phases']['databases'],
+                         {'done': 2, 'total': 10, 'item': 'db_2'})
+        # 2 bancos em ~4s → 8 restantes em ~16s
+        self.assertAlmostEqual(snapshot['eta_seconds'], 16, delta=0.5)
+
+    def test_transitions_are_drained_once(self):
+        hub = ProgressHub()
+        hub.step_changed('discover_source', 'running')
+        hub.step_changed('discover_source', 'success', 1.2)
+
+        self.assertEqual(len(hub.drain_transitions()), 2)
+        self.assertEqual(hub.drain_transitions(), [])
+        self.assertEqual(hub.snapshot()['steps']['discover_source'],
+                         {'status': 'success', 'duration': 1.2})
+
+    def test_streaming_totals(self):
+        hub = ProgressHub()
+        hub.add_total('roles', 500)
+        hub.add_total('roles', 200)
+        hub.advance('roles', 500)
+        self.assertEqual(hub.snapshot()['phases']['roles']['total'], 700)
+
+
+class TestDashboardServer(unittest.TestCase):
+    """Stream SSE e /status em localhost."""
+
+    def setUp(self):
+        registry.reset()
+        self.hub = ProgressHub()
+        self.server = DashboardServer(port=0, host="127.0.0.1", hub=self.hub,
+                                      flush_interval=0.05).start()
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_status_endpoint(self):
+        self.hub.set_total('privileges', 3)
+        self.hub.advance('privileges', item='app')
+
+        with urllib.request.urlopen(f"http://127.0.0.1:{self.server.port}/status",
+                                    timeout=5) as response:
+            status = json.loads(response.read())
+
+        self.assertEqual(status['phases']['privileges']['done'], 1)
+        self.assertIn('throughput', status)
+
+    def test_page_renders_values_as_text(self):
+        with urllib.request.urlopen(f"http://127.0.0.1:{self.server.port}/",
+                                    timeout=5) as response:
+            page = response.read().decode("utf-8")
+
+        # Nomes de bancos da origem não podem virar HTML no navegador
+        self.assertNotIn("innerHTML", page)
+        self.assertIn("textContent", page)
+
+    def test_sse_batches_updates(self):
+        conn = http.client.HTTPConnection("127.0.0.1", self.server.port, timeout=5)
+        conn.request("GET", "/events")
+        response = conn.getresponse()
+        self.assertEqual(response.getheader("Content-Type"), "text/event-stream")
+
+        # Estado inicial ao conectar
+        [(event_type, _)] = read_events(response, 1)
+        self.assertEqual(event_type, "progress")
+
+        # Muitas atualizações dentro de um intervalo viram um único lote
+        self.hub.step_changed('execute_migration', 'running')
+        self.hub.set_total('roles', 1000)
+        for i in range(1000):
+            self.hub.advance('roles', item=f"role_{i}")
+
+        events = []
+        while not events or events[-1][1].get('phases', {}).get('roles', {}).get('done') != 1000:
+            events.extend(read_events(response, 1))
+        conn.close()
+
+        self.assertEqual(events[0], ("step", {'step': 'execute_migration',
+                                              'status': 'running', 'duration': None}))
+        self.assertLess(len(events), 10)
+        self.assertEqual(events[-1][1]['steps']['execute_migration']['status'], 'running')
+
+
+class TestMigratorProgress(unittest.TestCase):
+    """O migrator publica o progresso por banco no hub global."""
+
+    def test_privileges_progress_per_database(self):
+        progress_hub.reset()
+        fixture = TestApplyDatabasePrivileges('test_connections_per_worker_and_single_role_snapshot')
+        fixture.setUp()
+        with redirect_stdout(io.StringIO()):
+            fixture.migrator.apply_database_privileges(fixture.databases)
+
+        phase = progress_hub.snapshot()['phases']['privileges']
+        self.assertEqual(phase['done'], len(fixture.databases))
+        self.assertEqual(phase['total'], len(fixture.databases))
+
+
+if __name__ == '__main__':
+    unittest.main()
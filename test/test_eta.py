@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Testes da previsão de duração (ETA) calibrada pelo histórico.
+
+Execute com:
+  python3 -m pytest test/test_eta.py -v
+"""
+
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+from app.core.sqlalchemy_migration import SQLAlchemyPostgreSQLMigrator
+from app.monitoring.dashboard import ProgressHub
+from app.monitoring.eta import (DurationPredictor, critical_path_seconds, format_duration,
+                                remaining_seconds)
+from app.orchestrators.run_state import RunStateStore
+from test_run_state import make_orchestrator
+
+DAG = {
+    'load_configurations': [],
+    'discover_source': ['load_configurations'],
+    'pre_migration_backup': ['load_configurations'],
+    'execute_migration': ['discover_source', 'pre_migration_backup'],
+    'generate_report': ['execute_migration'],
+}
+
+
+def write_report(report_dir: Path, session_id: str, workload: dict, durations: dict,
+                 status: str = "MigrationStatus.SUCCESS") -> None:
+    steps = [{'name': name, 'duration': duration, 'status': status, 'cached': False}
+             for name, duration in durations.items()]
+    with open(report_dir / f"migration_report_{session_id}.json", 'w', encoding='utf-8') as f:
+        json.dump({'session_info': {'session_id': session_id},
+                   'workload': workload, 'steps': steps}, f)
+
+
+class TestDurationPredictor(unittest.TestCase):
+    """Testes para DurationPredictor."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.reports = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_scales_with_workload_of_each_step(self):
+        write_report(self.reports, '20250101_000000',
+                     {'roles': 100, 'databases': 10, 'bytes': 1e9},
+                     {'load_configurations': 1.0, 'discover_source': 10.0,
+                      'pre_migration_backup': 20.0, 'execute_migration': 55.0})
+        write_report(self.reports, '20250102_000000',
+                     {'roles': 50, 'databases': 5, 'bytes': 5e8},
+                     {'load_configurations': 3.0, 'discover_source': 5.0,
+                      'pre_migration_backup': 10.0, 'execute_migration': 27.5})
+
+        prediction = DurationPredictor.from_reports(self.reports).predict(
+            DAG, {'roles': 200, 'databases': 20, 'bytes': 4e9})
+
+        self.assertEqual(prediction.runs, 2)
+        self.assertAlmostEqual(prediction.durations['discover_source'], 20.0)
+        self.assertAlmostEqual(prediction.durations['pre_migration_backup'], 80.0)
+        self.assertAlmostEqual(prediction.durations['execute_migration'], 110.0)
+        # Passo sem volume associado: mediana das durações
+        self.assertAlmostEqual(prediction.durations['load_configurations'], 2.0)
+        self.assertEqual(prediction.unknown, ['generate_report'])
+        # Caminho crítico: load → backup (mais lento que discover) → execute
+        self.assertAlmostEqual(prediction.total, 2.0 + 80.0 + 110.0)
+
+    def test_ignores_failed_cached_and_unreadable_reports(self):
+        write_report(self.reports, '20250101_000000', {}, {'discover_source': 99.0},
+                     status="failed")
+        (self.reports / "migration_report_20250102_000000.json").write_text("{corrompido")
+        with open(self.reports / "migration_report_20250103_000000.json", 'w') as f:
+            json.dump({'steps': [{'name': 'discover_source', 'duration': 50.0,
+                                  'status': 'success', 'cached': True}]}, f)
+
+        predictor = DurationPredictor.from_reports(self.reports)
+
+        self.assertIsNone(predictor.predict_step('discover_source', {}))
+
+    def test_history_without_workload_uses_median_duration(self):
+        write_report(self.reports, '20250101_000000', {}, {'execute_migration': 30.0})
+        predictor = DurationPredictor.from_reports(self.reports)
+        self.assertEqual(predictor.predict_step('execute_migration', {'roles': 500}), 30.0)
+
+
+class TestRemaining(unittest.TestCase):
+    """Tempo restante durante a execução."""
+
+    def test_critical_path_and_remaining(self):
+        durations = {'load_configurations': 2.0, 'discover_source': 20.0,
+                     'pre_migration_backup': 80.0, 'execute_migration': 110.0,
+                     'generate_report': 1.0}
+        self.assertEqual(critical_path_seconds(durations, DAG), 193.0)
+
+        statuses = {'load_configurations': 'success', 'discover_source': 'cached',
+                    'pre_migration_backup': 'success', 'execute_migration': 'running'}
+        self.assertEqual(remaining_seconds(durations, DAG, statuses,
+                                           {'execute_migration': 10.0}), 101.0)
+        # Vazão medida tem precedência sobre a previsão
+        self.assertEqual(remaining_seconds(durations, DAG, statuses,
+                                           {'execute_migration': 10.0},
+                                           {'execute_migration': 300.0}), 301.0)
+
+    def test_hub_eta_uses_plan_and_measured_throughput(self):
+        hub = ProgressHub()
+        hub.set_plan({'a': 10.0, 'b': 30.0}, {'a': [], 'b': ['a']})
+        self.assertAlmostEqual(hub.eta_seconds(), 40.0)
+
+        hub.step_changed('a', 'success', 8.0)
+        hub.step_changed('b', 'running')
+        self.assertAlmostEqual(hub.eta_seconds(), 30.0, delta=0.5)
+
+        hub.set_total('databases', 10)
+        hub._phases['databases']['started_at'] -= 4
+        hub.advance('databases', 2)
+        # 8 bancos restantes a 0,5 banco/s
+        self.assertAlmostEqual(hub.eta_seconds(), 16.0, delta=0.5)
+
+    def test_format_duration(self):
+        self.assertEqual(format_duration(12.4), "12s")
+        self.assertEqual(format_duration(320), "5m 20s")
+        self.assertEqual(format_duration(3720), "1h 02m")
+        self.assertEqual(format_duration(None), "desconhecida")
+
+
+class TestOrchestratorPrediction(unittest.TestCase):
+    """O orquestrador calibra a previsão com os relatórios de reports_dir."""
+
+    def test_prediction_from_previous_reports(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            store = RunStateStore(Path(tmp) / "run_state.db")
+            write_report(Path(tmp), '20250101_000000', {},
+                         {'execute_migration': 60.0, 'generate_report': 2.0})
+            orchestrator = make_orchestrator(store, 's1', [])
+
+            prediction = orchestrator.predict_duration()
+
+        self.assertEqual(prediction.runs, 1)
+        self.assertEqual(prediction.durations['execute_migration'], 60.0)
+        self.assertEqual(prediction.total, 62.0)
+        self.assertIn('validate_environment', prediction.unknown)
+
+    def test_workload_uses_one_aggregate_query_on_source(self):
+        """O volume vem de uma consulta agregada, sem a coleta completa"""
+        with tempfile.TemporaryDirectory() as tmp:
+            orchestrator = make_orchestrator(RunStateStore(Path(tmp) / "run_state.db"), 's1', [])
+            migrator = SQLAlchemyPostgreSQLMigrator({'host': 'origem'}, {'host': 'destino'})
+            migrator.get_users_from_source = mock.Mock()
+            migrator.create_engines = mock.Mock()
+            orchestrator.module_manager.get_module.return_value = migrator
+
+            engine = mock.MagicMock()
+            conn = engine.connect.return_value.__enter__.return_value
+            conn.execute.return_value.one.return_value = SimpleNamespace(
+                roles=120, databases=8, bytes=3 * 1024 ** 3)
+            with mock.patch('app.core.sqlalchemy_migration.create_engine',
+                            return_value=engine) as create_engine, \
+                    mock.patch('components.config_normalizer.get_sqlalchemy_url',
+                               side_effect=lambda config: f"postgresql://{config['host']}/postgres"):
+                orchestrator.predict_duration()
+
+        self.assertEqual(orchestrator.workload,
+                         {'roles': 120, 'databases': 8, 'bytes': 3 * 1024 ** 3})
+        self.assertEqual(create_engine.call_args.args, ("postgresql://origem/postgres",))
+        self.assertEqual(conn.execute.call_count, 1)
+        engine.dispose.assert_called_once()
+        migrator.get_users_from_source.assert_not_called()
+        migrator.create_engines.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Testes do journal de execução e da retomada (--resume) da Fase 3.
+
+Execute com:
+  python3 -m pytest test/test_execution_journal.py -v
+"""
+
+import io
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+from app.core.modules.execution_journal import (ExecutionJournal,
+                                                skip_applied)
+from app.core.modules.migration_executor import ControlledMigrationExecutor
+from app.core.modules.sql_lexer import SQLLexer
+
+SCRIPT = "\n".join(f"GRANT g{i} TO u;" for i in range(6))
+
+
+class FlakyCursor:
+    """Cursor que falha no statement indicado e registra os executados."""
+
+    def __init__(self, fail_on=None):
+        self.fail_on = fail_on
+        self.executed = []
+        self.connection = type('Conn', (), {'closed': 0})()
+
+    def execute(self, sql):
+        if self.fail_on and self.fail_on in sql:
+            raise Exception("connection reset")
+        self.executed.extend(s for s in sql.split("\n") if s)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+
+class TestExecutionJournal(unittest.TestCase):
+    """Testes para ExecutionJournal e retomada do executor."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.script = '03_apply_grants.sql'
+        self._write_script(SCRIPT)
+
+        self.executor = ControlledMigrationExecutor()
+        self.executor.scripts_dir = self.tmp.name
+        self.executor.config = {'host': 'destino', 'port': 5432,
+                                'user': 'u', 'password': 'p'}
+
+    def _write_script(self, content):
+        with open(os.path.join(self.tmp.name, self.script), 'w',
+                  encoding='utf-8') as f:
+            f.write(content)
+
+    def _run(self, cursor, resume=False):
+        connection = type('Conn', (), {'cursor': lambda self: cursor})()
+        with redirect_stdout(io.StringIO()):
+            return self.executor.execute_script(
+                self.script, connection=connection, resume=resume)
+
+    def _journal(self):
+        return ExecutionJournal(self.tmp.name, 'destino:5432', self.script)
+
+    def test_resume_continues_after_last_applied(self):
+        """--resume executa apenas os statements não aplicados"""
+        self.assertFalse(self._run(FlakyCursor(fail_on='g3')))
+
+        point = self._journal().resume_point()
+        self.assertEqual(point['line'], 3)
+        self.assertEqual(point['applied_count'], 3)
+
+        cursor = FlakyCursor()
+        self.assertTrue(self._run(cursor, resume=True))
+        self.assertEqual(cursor.executed,
+                         ['GRANT g3 TO u;', 'GRANT g4 TO u;', 'GRANT g5 TO u;'])
+
+    def test_resume_in_pipeline_mode(self):
+        """Lotes confirmados entram no journal e não são reenviados"""
+        self.executor.execution_mode = "pipeline"
+        self.executor.batch_size = 2
+        self.assertFalse(self._run(FlakyCursor(fail_on='g4')))
+
+        cursor = FlakyCursor()
+        self.assertTrue(self._run(cursor, resume=True))
+        self.assertEqual(cursor.executed, ['GRANT g4 TO u;', 'GRANT g5 TO u;'])
+
+    def test_changed_script_discards_journal(self):
+        """Script regenerado invalida o journal e a execução recomeça"""
+        self._run(FlakyCursor(fail_on='g3'))
+        self._write_script(SCRIPT + "\nGRANT g6 TO u;")
+
+        self.assertIsNone(self._journal().resume_point())
+
+        cursor = FlakyCursor()
+        self.assertTrue(self._run(cursor, resume=True))
+        self.assertEqual(len(cursor.executed), 7)
+
+    def test_without_resume_starts_over(self):
+        """Sem --resume o journal é reiniciado"""
+        self._run(FlakyCursor(fail_on='g3'))
+
+        cursor = FlakyCursor()
+        self.assertTrue(self._run(cursor))
+        self.assertEqual(len(cursor.executed), 6)
+
+    def test_skip_applied_checks_statement_hash(self):
+        """Hash divergente no ponto de retomada cancela a retomada"""
+        statements = SQLLexer(io.StringIO(SCRIPT))
+        point = {'offset': 15, 'line': 2, 'sha256': '0' * 64}
+        with self.assertRaises(ValueError):
+            list(skip_applied(statements, point))
+
+
+if __name__ == '__main__':
+    unittest.main()
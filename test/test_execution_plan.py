@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Testes dos shards de grants por base e do plano de execução por estágios.
+
+Execute com:
+  python3 -m pytest test/test_execution_plan.py -v
+"""
+
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from app.core.modules.migration_executor import ControlledMigrationExecutor
+from app.core.modules.script_cache import ScriptCache
+from app.core.modules.script_generator import SQLScriptGenerator
+from test_script_cache import build_extraction
+
+
+def build_multi_db_extraction():
+    """Extração com duas bases de usuário e uma de sistema."""
+    data = build_extraction()
+    data['databases'].append({'datname': 'crm db', 'owner': 'app_user',
+                              'size_mb': 2.0, 'datconnlimit': -1,
+                              'is_system': False})
+    data['grants']['crm db'] = [{'grantee': 'public', 'privileges': ['CONNECT']}]
+    data['grants']['postgres'] = [{'grantee': 'app_user',
+                                   'privileges': ['CONNECT']}]
+    return data
+
+
+class TestExecutionPlan(unittest.TestCase):
+    """Testes para shards por base e ordenação dos estágios."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.json_file = os.path.join(self.tmp.name, 'extracted.json')
+        self.output_dir = os.path.join(self.tmp.name, 'scripts')
+        with open(self.json_file, 'w', encoding='utf-8') as f:
+            json.dump(build_multi_db_extraction(), f)
+
+    def _generate(self):
+        generator = SQLScriptGenerator(self.json_file)
+        generator.output_dir = self.output_dir
+        return generator.run_generation()
+
+    def test_one_shard_per_user_database(self):
+        """Gera um shard por base de usuário e declara os estágios"""
+        self._generate()
+
+        shard_dir = os.path.join(self.output_dir, '03_grants')
+        shards = sorted(os.listdir(shard_dir))
+        self.assertEqual(shards, ['0001_app_db.sql', '0002_crm_db.sql'])
+
+        with open(os.path.join(shard_dir, shards[1]), encoding='utf-8') as f:
+            self.assertIn('GRANT CONNECT ON DATABASE "crm db" TO public;',
+                          f.read())
+
+        stages = ScriptCache(self.output_dir).load_stages()
+        self.assertEqual([s['name'] for s in stages],
+                         ['users', 'databases', 'grants', 'validation'])
+        grants = stages[2]
+        self.assertTrue(grants['parallel'])
+        self.assertEqual(grants['depends_on'], ['databases'])
+        self.assertEqual(grants['scripts'],
+                         [os.path.join('03_grants', s) for s in shards])
+
+    def test_order_stages_respects_dependencies(self):
+        """Ordenação topológica e detecção de ciclos"""
+        stages = [
+            {'name': 'grants', 'scripts': [], 'depends_on': ['databases']},
+            {'name': 'databases', 'scripts': [], 'depends_on': ['users']},
+            {'name': 'users', 'scripts': [], 'depends_on': []},
+        ]
+        ordered = ControlledMigrationExecutor.order_stages(stages)
+        self.assertEqual([s['name'] for s in ordered],
+                         ['users', 'databases', 'grants'])
+
+        stages[2]['depends_on'] = ['grants']
+        with self.assertRaises(ValueError):
+            ControlledMigrationExecutor.order_stages(stages)
+
+    def test_run_migration_parallelizes_shards(self):
+        """Shards de grants vão para o pool; demais estágios são seriais"""
+        self._generate()
+
+        executor = ControlledMigrationExecutor()
+        executor.scripts_dir = self.output_dir
+        executor.config = {'host': 'destino', 'port': 5432,
+                           'user': 'u', 'password': 'p'}
+        calls = []
+
+        def fake_execute(script, dry_run=False, connection=None, resume=False):
+            calls.append(('serial', script))
+            return True
+
+        def fake_parallel(scripts, resume=False):
+            calls.append(('parallel', tuple(scripts)))
+            return {script: True for script in scripts}
+
+        with patch.object(executor, 'load_config', return_value=True), \
+                patch.object(executor, 'connect_to_destination',
+                             return_value=True), \
+                patch.object(executor, 'execute_script',
+                             side_effect=fake_execute), \
+                patch.object(executor, 'execute_parallel',
+                             side_effect=fake_parallel), \
+                patch.object(executor, 'verify_users_created',
+                             return_value=True), \
+                patch.object(executor, 'verify_databases_created',
+                             return_value=True), \
+                patch.object(executor, 'verify_grants_applied',
+                             return_value=True):
+            self.assertTrue(executor.run_migration())
+
+        self.assertEqual(calls[0], ('serial', '01_create_users.sql'))
+        self.assertEqual(calls[1], ('serial', '02_create_databases.sql'))
+        self.assertEqual(calls[2][0], 'parallel')
+        self.assertEqual(len(calls[2][1]), 2)
+        self.assertEqual(calls[3], ('serial', '04_validate_migration.sql'))
+
+        cache = ScriptCache(self.output_dir)
+        self.assertTrue(cache.is_applied('destino:5432', calls[2][1][0]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Testes do modo frota (vários pares origem→destino sob limites globais).
+
+Execute com:
+  python3 -m pytest test/test_fleet_runner.py -v
+"""
+
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from contextlib import redirect_stdout
+
+from app.orchestrators.fleet_runner import ConnectionBudget, FleetRunner, TokenBucket
+
+
+def server(host, port=5432):
+    return {'server': {'host': host, 'port': port},
+            'authentication': {'user': 'postgres', 'password': 'secret'}}
+
+
+class FakeMigrator:
+    """Migrator que só registra conexões em uso por destino."""
+
+    active = {}
+    peak = {}
+    lock = threading.Lock()
+
+    def __init__(self, source, dest, fail=False):
+        self.dest = dest['server']['host']
+        self.fail = fail
+        self.privilege_workers = 4
+        self.pool_size = 5
+        self.max_overflow = 10
+        self.source_engine = None
+        self.dest_engine = None
+        self.last_result = {}
+
+    def create_engines(self):
+        return True
+
+    def migrate_all_users(self):
+        self.create_engines()
+        cls = FakeMigrator
+        with cls.lock:
+            cls.active[self.dest] = cls.active.get(self.dest, 0) + self.pool_size
+            cls.peak[self.dest] = max(cls.peak.get(self.dest, 0), cls.active[self.dest])
+        time.sleep(0.1)
+        with cls.lock:
+            cls.active[self.dest] -= self.pool_size
+        if self.fail:
+            raise RuntimeError("destino indisponível")
+        self.last_result = {'users_created': 2, 'databases_created': 1,
+                            'privileges_applied': 3}
+        return True
+
+
+class TestFleetRunner(unittest.TestCase):
+    """Testes para FleetRunner."""
+
+    def setUp(self):
+        FakeMigrator.active = {}
+        FakeMigrator.peak = {}
+        self.reports = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.reports.cleanup()
+
+    def run_fleet(self, pairs, **kwargs):
+        runner = FleetRunner(
+            pairs, reports_dir=self.reports.name,
+            migrator_factory=lambda s, d: FakeMigrator(s, d, fail=d['server']['host'] == 'down'),
+            **kwargs)
+        with redirect_stdout(io.StringIO()):
+            summary = runner.run()
+        return runner, summary
+
+    def test_pairs_run_concurrently(self):
+        """Pares com destinos distintos migram ao mesmo tempo"""
+        pairs = [{'name': f'par{i}', 'source': server(f'src{i}'),
+                  'destination': server(f'dst{i}')} for i in range(4)]
+
+        start = time.perf_counter()
+        _, summary = self.run_fleet(pairs, workers=4)
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(summary['succeeded'], 4)
+        self.assertLess(elapsed, 0.3)
+        self.assertEqual(summary['totals']['users_created'], 8)
+
+    def test_shared_destination_respects_connection_budget(self):
+        """Pares no mesmo destino dividem a cota de conexões"""
+        pairs = [{'name': f'par{i}', 'source': server(f'src{i}'),
+                  'destination': server('shared')} for i in range(4)]
+
+        self.run_fleet(pairs, workers=4, connections_per_destination=6)
+
+        # Cada par usa 5 conexões (4 workers + 1); só cabe um por vez
+        self.assertEqual(FakeMigrator.peak['shared'], 5)
+
+    def test_pool_is_capped_by_budget(self):
+        """O pool do migrator não ultrapassa a cota do destino"""
+        runner = FleetRunner([], connections_per_destination=3)
+        migrator = FakeMigrator(server('a'), server('b'))
+
+        connections = runner._connections_for_pair(migrator)
+
+        self.assertEqual(connections, 3)
+        self.assertEqual((migrator.pool_size, migrator.max_overflow,
+                          migrator.privilege_workers), (3, 0, 2))
+
+    def test_failed_pair_is_reported(self):
+        """Falha de um par não interrompe os demais e entra no relatório"""
+        pairs = [{'name': 'ok', 'source': server('src'), 'destination': server('dst')},
+                 {'name': 'ruim', 'source': server('src'), 'destination': server('down')}]
+
+        _, summary = self.run_fleet(pairs, workers=2)
+
+        self.assertEqual((summary['succeeded'], summary['failed']), (1, 1))
+        failed = [r for r in summary['results'] if r['name'] == 'ruim'][0]
+        self.assertEqual(failed['error'], 'destino indisponível')
+
+        with open(summary['report_file'], encoding='utf-8') as f:
+            self.assertEqual(json.load(f)['pairs'], 2)
+
+    def test_from_file_overrides_limits(self):
+        """Limites do arquivo podem ser sobrescritos pela linha de comando"""
+        with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as f:
+            json.dump({'pairs': [], 'limits': {'workers': 2, 'bandwidth_mbps': 8}}, f)
+
+        self.addCleanup(os.unlink, f.name)
+
+        runner = FleetRunner.from_file(f.name, workers=6, connections_per_destination=None)
+
+        self.assertEqual(runner.workers, 6)
+        self.assertEqual(runner.bandwidth.rate, 1024 * 1024)
+
+
+class TestLimits(unittest.TestCase):
+    """Testes para TokenBucket e ConnectionBudget."""
+
+    def test_token_bucket_waits_when_empty(self):
+        """Consumo acima da taxa espera o reabastecimento"""
+        now = [0.0]
+        sleeps = []
+
+        def sleep(seconds):
+            sleeps.append(seconds)
+            now[0] += seconds
+
+        bucket = TokenBucket(100, clock=lambda: now[0], sleep=sleep)
+        bucket.consume(100)
+        bucket.consume(50)
+
+        self.assertEqual(sleeps, [0.5])
+        self.assertEqual(bucket.waited, 0.5)
+
+    def test_token_bucket_disabled(self):
+        """Taxa zero não limita"""
+        bucket = TokenBucket(0, sleep=lambda s: self.fail("não deveria esperar"))
+        bucket.consume(10 ** 9)
+
+    def test_connection_budget_blocks_until_release(self):
+        """Reserva acima da cota aguarda liberação"""
+        budget = ConnectionBudget(4)
+        budget.acquire('dst', 3)
+        acquired = threading.Event()
+
+        thread = threading.Thread(target=lambda: (budget.acquire('dst', 2), acquired.set()))
+        thread.start()
+        self.assertFalse(acquired.wait(0.1))
+
+        budget.release('dst', 3)
+        self.assertTrue(acquired.wait(1))
+        thread.join()
+        self.assertEqual(budget.in_use('dst'), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Testes da descoberta de módulos sem importação e do perfil de importação.
+
+Execute com:
+  python3 -m pytest test/test_lazy_imports.py -v
+"""
+
+import io
+import subprocess
+import sys
+import unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+
+from app.orchestrators.orchestrator_pure_python import ModuleManager
+from components.lazy_imports import ImportProfile, module_available
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+
+class SilentLogger:
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+class TestLazyImports(unittest.TestCase):
+    """Testes para components.lazy_imports."""
+
+    def test_module_available(self):
+        """find_spec: existente, inexistente e pacote pai inexistente"""
+        self.assertTrue(module_available('components.config_manager'))
+        self.assertFalse(module_available('components.nao_existe'))
+        self.assertFalse(module_available('pacote_inexistente.modulo'))
+
+    def test_cli_startup_does_not_import_heavy_packages(self):
+        """main.py e o menu não importam SQLAlchemy/psycopg2/colorama/mysql"""
+        code = (
+            "import sys, main\n"
+            "main.check_module_availability()\n"
+            "heavy = [m for m in ('sqlalchemy', 'psycopg2', 'colorama', 'mysql')"
+            " if m in sys.modules]\n"
+            "print('HEAVY=' + ','.join(heavy))\n"
+        )
+        result = subprocess.run([sys.executable, '-c', code], cwd=PROJECT_ROOT,
+                                capture_output=True, text=True, check=True)
+        self.assertEqual(result.stdout.strip().splitlines()[-1], 'HEAVY=')
+
+    def test_profile_records_deferred_imports(self):
+        """Importações adiadas são cronometradas quando o perfil está ativo"""
+        profile = ImportProfile()
+        profile.enable()
+        sys.modules.pop('json.tool', None)
+
+        profile.import_module('json.tool')
+        output = io.StringIO()
+        with redirect_stdout(output):
+            profile.report()
+
+        self.assertEqual(profile.records[0]['module'], 'json.tool')
+        self.assertIn('json.tool', output.getvalue())
+
+
+class TestModuleManager(unittest.TestCase):
+    """ModuleManager localiza módulos sem importá-los."""
+
+    def test_modules_resolved_on_first_use(self):
+        class Manager(ModuleManager):
+            MODULE_SPECS = [
+                ("config", "components.config_normalizer", "normalize_server_config"),
+                ("missing", "components.nao_existe", "Nada"),
+            ]
+
+        sys.modules.pop('components.config_normalizer', None)
+        manager = Manager(SilentLogger())
+
+        self.assertNotIn('components.config_normalizer', sys.modules)
+        self.assertEqual(manager.available, {'config': True, 'missing': False})
+        self.assertFalse(manager.check_all_modules())
+        self.assertEqual(manager.modules, {})
+
+        self.assertIsNotNone(manager._resolve('config'))
+        self.assertIn('components.config_normalizer', sys.modules)
+        self.assertIsNone(manager.get_module('missing'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Testes do exportador Prometheus embutido.
+
+Execute com:
+  python3 -m pytest test/test_metrics.py -v
+"""
+
+import io
+import unittest
+import urllib.error
+import urllib.request
+from contextlib import redirect_stdout
+
+from app.monitoring.metrics import (ACTIVE_CONNECTIONS, ERRORS, OBJECTS_PROCESSED,
+                                    MetricsRegistry, MetricsServer, registry)
+from test_sqlalchemy_privileges import TestApplyDatabasePrivileges
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    """Testes para MetricsRegistry."""
+
+    def test_render_text_format(self):
+        metrics = MetricsRegistry()
+        steps = metrics.gauge("migration_step_duration_seconds", "Duração", ("step",))
+        copied = metrics.counter("migration_rows_copied_total", "Linhas")
+        steps.set(1.5, step="discover_source")
+        steps.set(0.25, step='execute "main"')
+
+        text = metrics.render()
+
+        self.assertIn("# TYPE migration_step_duration_seconds gauge", text)
+        self.assertIn('migration_step_duration_seconds{step="discover_source"} 1.5', text)
+        self.assertIn('migration_step_duration_seconds{step="execute \\"main\\""} 0.25', text)
+        self.assertIn("migration_rows_copied_total 0", text)
+        self.assertTrue(text.endswith("\n"))
+
+    def test_label_and_type_validation(self):
+        metrics = MetricsRegistry()
+        counter = metrics.counter("c_total", "c", ("kind",))
+        with self.assertRaises(ValueError):
+            counter.inc(server="x")
+        with self.assertRaises(ValueError):
+            counter.inc(-1, kind="role")
+        with self.assertRaises(ValueError):
+            counter.set(3, kind="role")
+
+        counter.inc(2, kind="role")
+        self.assertEqual(counter.value(kind="role"), 2)
+
+
+class TestMetricsServer(unittest.TestCase):
+    """Scrape do /metrics em localhost."""
+
+    def setUp(self):
+        registry.reset()
+        self.server = MetricsServer(port=0, host="127.0.0.1").start()
+        self.url = f"http://127.0.0.1:{self.server.port}"
+
+    def tearDown(self):
+        self.server.stop()
+        registry.reset()
+
+    def scrape(self) -> str:
+        with urllib.request.urlopen(f"{self.url}/metrics", timeout=5) as response:
+            self.assertTrue(response.headers['Content-Type'].startswith("text/plain"))
+            return response.read().decode("utf-8")
+
+    def test_scrape_reflects_updates(self):
+        OBJECTS_PROCESSED.inc(3, kind="role")
+        ERRORS.inc(component="grants")
+        ACTIVE_CONNECTIONS.inc(server="db:5432")
+
+        text = self.scrape()
+
+        self.assertIn('migration_objects_processed_total{kind="role"} 3', text)
+        self.assertIn('migration_errors_total{component="grants"} 1', text)
+        self.assertIn('migration_active_connections{server="db:5432"} 1', text)
+
+    def test_unknown_path_is_404(self):
+        with self.assertRaises(urllib.error.HTTPError) as ctx:
+            urllib.request.urlopen(f"{self.url}/", timeout=5)
+        self.assertEqual(ctx.exception.code, 404)
+
+    def test_grants_are_counted_by_migrator(self):
+        fixture = TestApplyDatabasePrivileges('test_connections_per_worker_and_single_role_snapshot')
+        fixture.setUp()
+        with redirect_stdout(io.StringIO()):
+            applied = fixture.migrator.apply_database_privileges(fixture.databases)
+
+        self.assertGreater(applied, 0)
+        self.assertIn(f'migration_objects_processed_total{{kind="grant"}} {applied}',
+                      self.scrape())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Testes do logging não bloqueante dos migrators.
+
+Execute com:
+  python3 -m pytest test/test_migration_logging.py -v
+"""
+
+import io
+import logging
+import logging.handlers
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+
+from app.orchestrators.orchestrator_pure_python import MigrationLogger
+from components.logging_utils import (attach_queue_handler, detach_queue_handler,
+                                      get_migration_logger)
+
+
+class ListHandler(logging.Handler):
+    def __init__(self, level):
+        super().__init__(level)
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+class Expensive:
+    """Conta quantas vezes foi formatado."""
+    formatted = 0
+
+    def __str__(self):
+        Expensive.formatted += 1
+        return "caro"
+
+
+class TestMigrationLogging(unittest.TestCase):
+    """Testes para components.logging_utils."""
+
+    def setUp(self):
+        # Outros módulos de teste desligam o logging globalmente
+        self.disabled = logging.root.manager.disable
+        logging.disable(logging.NOTSET)
+
+        self.root = logging.getLogger('migration')
+        self.saved = (list(self.root.handlers), self.root.level, self.root.propagate)
+        detach_queue_handler(self.root)
+        self.root.handlers = []
+        self.root.propagate = False
+
+        self.console = ListHandler(logging.INFO)
+        self.file = ListHandler(logging.DEBUG)
+        self.root.addHandler(self.console)
+        self.root.addHandler(self.file)
+
+    def tearDown(self):
+        detach_queue_handler(self.root)
+        handlers, level, propagate = self.saved
+        self.root.handlers = handlers
+        self.root.setLevel(level)
+        self.root.propagate = propagate
+        logging.disable(self.disabled)
+
+    def _flush(self):
+        listener = self.root._queue_listener
+        listener.stop()
+        listener.start()
+
+    def test_queue_handler_keeps_handler_levels(self):
+        """Handlers servidos pela fila mantêm seus níveis"""
+        self.root.setLevel(logging.DEBUG)
+        attach_queue_handler(self.root)
+
+        self.assertEqual(len(self.root.handlers), 1)
+        self.assertIsInstance(self.root.handlers[0], logging.handlers.QueueHandler)
+
+        logger = get_migration_logger('sqlalchemy')
+        logger.debug("GRANT %s → %s", "CONNECT", "app")
+        logger.info("Lote: %d/%d", 10, 10)
+        self._flush()
+
+        self.assertEqual(self.console.messages, ["Lote: 10/10"])
+        self.assertEqual(self.file.messages, ["GRANT CONNECT → app", "Lote: 10/10"])
+
+    def test_debug_arguments_not_formatted_when_disabled(self):
+        """Formatação preguiçosa: DEBUG desligado não formata argumentos"""
+        self.root.setLevel(logging.INFO)
+        attach_queue_handler(self.root)
+        Expensive.formatted = 0
+
+        get_migration_logger('sqlalchemy').debug("GRANT %s", Expensive())
+        self._flush()
+
+        self.assertEqual(Expensive.formatted, 0)
+        self.assertEqual(self.file.messages, [])
+
+    def test_grants_log_per_item_at_debug(self):
+        """GRANTs individuais vão para DEBUG, não para stdout"""
+        from test_sqlalchemy_privileges import TestApplyDatabasePrivileges
+
+        self.root.setLevel(logging.DEBUG)
+        attach_queue_handler(self.root)
+
+        fixture = TestApplyDatabasePrivileges('test_connections_per_worker_and_single_role_snapshot')
+        fixture.setUp()
+        output = io.StringIO()
+        with redirect_stdout(output):
+            fixture.migrator.apply_database_privileges(fixture.databases)
+        self._flush()
+
+        self.assertNotIn('→', output.getvalue())
+        self.assertIn('     ✅ ALL → app', self.file.messages)
+        self.assertNotIn('     ✅ ALL → app', self.console.messages)
+
+
+class TestMigrationLogger(unittest.TestCase):
+    """Buffer circular, contadores e rotação do MigrationLogger."""
+
+    def setUp(self):
+        self.disabled = logging.root.manager.disable
+        logging.disable(logging.NOTSET)
+
+        self.root = logging.getLogger('migration')
+        self.saved = (list(self.root.handlers), self.root.level, self.root.propagate)
+        detach_queue_handler(self.root)
+
+        self.tmp = tempfile.TemporaryDirectory()
+        self.output = io.StringIO()
+        with redirect_stdout(self.output):
+            self.logger = MigrationLogger(Path(self.tmp.name), 'sessao', buffer_size=3,
+                                          max_log_files=2, log_file_size_mb=0.001)
+
+    def tearDown(self):
+        self.logger.close()
+        handlers, level, propagate = self.saved
+        self.root.handlers = handlers
+        self.root.setLevel(level)
+        self.root.propagate = propagate
+        logging.disable(self.disabled)
+        self.tmp.cleanup()
+
+    def test_buffer_is_bounded_and_counts_everything(self):
+        for i in range(8):
+            self.logger.info(f"mensagem {i}")
+        self.logger.success("ok", "step.teste")
+        self.logger.error("falhou")
+
+        summary = self.logger.get_log_summary()
+
+        self.assertEqual(summary['total_entries'], 10)
+        self.assertEqual(summary['level_counts'], {'INFO': 8, 'SUCCESS': 1, 'ERROR': 1})
+        self.assertEqual([e['message'] for e in summary['entries']],
+                         ['mensagem 7', 'ok', 'falhou'])
+        self.assertEqual(summary['dropped_entries'], 7)
+
+    def test_console_written_once_by_listener(self):
+        self.logger.success("ok", "step.teste")
+        self.logger.debug("detalhe")
+        self.logger.close()
+
+        console = self.output.getvalue()
+        self.assertEqual(console.count("[step.teste] ok"), 1)
+        self.assertIn("✅", console)
+        self.assertNotIn("detalhe", console)
+        self.assertIn("detalhe", self.logger.log_file.read_text(encoding='utf-8'))
+
+    def test_log_file_rotates_by_size(self):
+        for i in range(100):
+            self.logger.info(f"linha de log número {i:03d}")
+        self.logger.close()
+
+        files = sorted(p.name for p in Path(self.tmp.name).iterdir())
+        self.assertEqual(files, ['migration_sessao.log', 'migration_sessao.log.1'])
+        self.assertLess(self.logger.log_file.stat().st_size, 2048)
+
+
+if __name__ == '__main__':
+    unittest.main()
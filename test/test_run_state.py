@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Testes do estado persistente dos passos do orquestrador (--resume).
+
+Execute com:
+  python3 -m pytest test/test_run_state.py -v
+"""
+
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from app.orchestrators.orchestrator_pure_python import (MigrationStatus,
+                                                        PostgreSQLMigrationOrchestrator)
+from app.orchestrators.run_state import RunStateStore, inputs_hash
+
+STEP_METHODS = {
+    "validate_environment": "validate_environment",
+    "load_configurations": "load_configurations",
+    "check_modules": "check_modules",
+    "test_connectivity": "test_connectivity",
+    "discover_source": "discover_source_structure",
+    "analyze_compatibility": "analyze_scram_compatibility",
+    "capacity_planning": "plan_capacity",
+    "pre_migration_backup": "create_pre_migration_backup",
+    "execute_migration": "execute_main_migration",
+    "validate_migration": "validate_migration_result",
+    "test_connections": "test_post_migration_connections",
+    "generate_report": "generate_final_report",
+}
+
+
+def make_orchestrator(store: RunStateStore, session_id: str, calls: list, failing=()):
+    """Orquestrador sem I/O real: cada passo apenas registra a chamada."""
+    orchestrator = PostgreSQLMigrationOrchestrator.__new__(PostgreSQLMigrationOrchestrator)
+    orchestrator.logger = mock.MagicMock()
+    orchestrator.run_state = store
+    orchestrator.session_id = session_id
+    orchestrator.resumed = True
+    orchestrator.verbose = False
+    orchestrator.step_workers = 4
+    orchestrator.critical_path = []
+    orchestrator._stats_lock = threading.Lock()
+    orchestrator.migration_rules = {'error_handling': {'continue_on_error': True}}
+    orchestrator.source_config = {'server': {'host': 'origem'}}
+    orchestrator.dest_config = {'server': {'host': 'destino'}}
+    orchestrator.stats = {'total_steps': 0, 'completed_steps': 0,
+                          'failed_steps': 0, 'skipped_steps': 0}
+    orchestrator.reports_dir = Path(store.db_path).parent
+    orchestrator.module_manager = mock.MagicMock()
+    orchestrator.module_manager.get_module.return_value = None
+    orchestrator.workload = {}
+    orchestrator.prediction = None
+    orchestrator._initialize_steps()
+
+    for step_name, method in STEP_METHODS.items():
+        def run(step_name=step_name):
+            step = orchestrator._get_step(step_name)
+            orchestrator._start_step(step)
+            calls.append(step_name)
+            step.result_data = {'step': step_name}
+            success = step_name not in failing
+            orchestrator._finish_step(step, success, None if success else "falhou")
+            return success
+        setattr(orchestrator, method, run)
+
+    return orchestrator
+
+
+class TestRunStateStore(unittest.TestCase):
+    """Testes para RunStateStore."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = RunStateStore(Path(self.tmp.name) / "run_state.db")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_completed_requires_success_and_same_inputs(self):
+        """Só reaproveita passo concluído com o mesmo hash de entradas"""
+        self.store.record('s1', 'discover', 'success', inputs_hash='h1',
+                          result_data={'count': 3}, duration=1.5)
+        self.store.record('s1', 'backup', 'failed', inputs_hash='h1')
+
+        state = self.store.completed('s1', 'discover', 'h1')
+        self.assertEqual(state['result_data'], {'count': 3})
+        self.assertIsNone(self.store.completed('s1', 'discover', 'h2'))
+        self.assertIsNone(self.store.completed('s1', 'backup', 'h1'))
+        self.assertIsNone(self.store.completed('s2', 'discover', 'h1'))
+
+    def test_record_replaces_previous_state(self):
+        """Nova gravação substitui o estado do passo"""
+        self.store.record('s1', 'backup', 'failed', inputs_hash='h1')
+        self.store.record('s1', 'backup', 'success', inputs_hash='h1')
+
+        self.assertEqual(self.store.get('s1', 'backup')['status'], 'success')
+        self.assertEqual(len(self.store.steps('s1')), 1)
+
+    def test_latest_session(self):
+        self.assertIsNone(self.store.latest_session())
+        self.store.record('antiga', 'a', 'success')
+        self.store.record('nova', 'a', 'success')
+        self.assertEqual(self.store.latest_session(), 'nova')
+
+    def test_inputs_hash_is_order_independent_for_dicts(self):
+        self.assertEqual(inputs_hash({'a': 1, 'b': 2}), inputs_hash({'b': 2, 'a': 1}))
+        self.assertNotEqual(inputs_hash({'a': 1}), inputs_hash({'a': 2}))
+
+
+class TestOrchestratorResume(unittest.TestCase):
+    """Reexecução da sessão reaproveita passos concluídos."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = RunStateStore(Path(self.tmp.name) / "run_state.db")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_rerun_skips_completed_cacheable_steps(self):
+        first_calls = []
+        first = make_orchestrator(self.store, 's1', first_calls, failing={'test_connections'})
+        first.run_complete_migration(interactive=False)
+        self.assertIn('execute_migration', first_calls)
+
+        calls = []
+        rerun = make_orchestrator(self.store, 's1', calls)
+        self.assertTrue(rerun.run_complete_migration(interactive=False))
+
+        for name in ('discover_source', 'pre_migration_backup', 'execute_migration',
+                     'validate_migration'):
+            self.assertNotIn(name, calls)
+            step = rerun._get_step(name)
+            self.assertTrue(step.cached)
+            self.assertEqual(step.result_data, {'step': name})
+        self.assertIn('test_connections', calls)
+        self.assertIn('load_configurations', calls)
+        self.assertEqual(rerun.overall_status, MigrationStatus.SUCCESS)
+        self.assertEqual(rerun.stats['completed_steps'], rerun.stats['total_steps'])
+
+    def test_changed_configuration_invalidates_steps(self):
+        make_orchestrator(self.store, 's1', []).run_complete_migration(interactive=False)
+
+        calls = []
+        rerun = make_orchestrator(self.store, 's1', calls)
+        rerun.dest_config = {'server': {'host': 'outro-destino'}}
+        rerun.run_complete_migration(interactive=False)
+
+        self.assertIn('discover_source', calls)
+        self.assertIn('execute_migration', calls)
+
+    def test_changed_migrator_destination_invalidates_execute_migration(self):
+        """Trocar o destino em secrets/ invalida o passo, mesmo com config/ igual"""
+        def with_destination(orchestrator, host):
+            migrator = mock.MagicMock()
+            migrator.load_configs.return_value = True
+            migrator.source_config = {'server': {'host': 'wf004', 'port': 5432},
+                                      'authentication': {'user': 'm', 'password': 'a'}}
+            migrator.dest_config = {'server': {'host': host, 'port': 5432},
+                                    'authentication': {'user': 'm', 'password': 'b'}}
+            orchestrator.module_manager.get_module.return_value = migrator
+            return orchestrator
+
+        with_destination(make_orchestrator(self.store, 's1', []),
+                         'wfdb02').run_complete_migration(interactive=False)
+
+        calls = []
+        with_destination(make_orchestrator(self.store, 's1', calls),
+                         'wfdb02').run_complete_migration(interactive=False)
+        self.assertNotIn('execute_migration', calls)
+
+        calls = []
+        rerun = with_destination(make_orchestrator(self.store, 's1', calls), 'outro-destino')
+        rerun.run_complete_migration(interactive=False)
+        self.assertIn('execute_migration', calls)
+        self.assertFalse(rerun._get_step('execute_migration').cached)
+
+    def test_connection_identity_has_no_passwords(self):
+        orchestrator = make_orchestrator(self.store, 's1', [])
+        migrator = mock.MagicMock()
+        migrator.load_configs.return_value = True
+        migrator.source_config = migrator.dest_config = {
+            'server': {'host': 'WF004.vya.digital', 'port_direct': '5433'},
+            'authentication': {'user': 'm', 'password': 'segredo'}}
+        orchestrator.module_manager.get_module.return_value = migrator
+
+        identity = orchestrator._connection_identity()
+
+        self.assertEqual(identity['destination'], {'host': 'wf004.vya.digital', 'port': 5433,
+                                                   'database': 'postgres', 'user': 'm'})
+        self.assertNotIn('segredo', str(identity))
+
+    def test_new_session_runs_everything(self):
+        make_orchestrator(self.store, 's1', []).run_complete_migration(interactive=False)
+
+        calls = []
+        make_orchestrator(self.store, 's2', calls).run_complete_migration(interactive=False)
+
+        self.assertEqual(sorted(calls), sorted(STEP_METHODS))
+
+
+if __name__ == '__main__':
+    unittest.main()
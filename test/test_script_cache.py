@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Testes do cache de scripts gerados (ScriptCache + SQLScriptGenerator).
+
+Execute com:
+  python3 -m pytest test/test_script_cache.py -v
+"""
+
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from app.core.modules.script_cache import ScriptCache
+from app.core.modules.script_generator import SQLScriptGenerator
+
+
+def build_extraction(grants_privileges=("CONNECT",)):
+    """Monta um JSON de extração mínimo no formato do WF004DataExtractor."""
+    return {
+        'extraction_info': {'source_server': 'origem:5432'},
+        'users': [{
+            'rolname': 'app_user', 'rolcanlogin': True, 'rolsuper': False,
+            'rolinherit': True, 'rolcreaterole': False, 'rolcreatedb': False,
+            'rolreplication': False, 'rolconnlimit': -1,
+            'rolpassword': None, 'rolvaliduntil': None
+        }],
+        'databases': [
+            {'datname': 'app_db', 'owner': 'app_user', 'size_mb': 1.0,
+             'datconnlimit': -1, 'is_system': False},
+            {'datname': 'postgres', 'owner': 'postgres', 'size_mb': 1.0,
+             'datconnlimit': -1, 'is_system': True}
+        ],
+        'grants': {
+            'app_db': [{'grantee': 'app_user',
+                        'privileges': list(grants_privileges)}]
+        },
+        'summary': {'total_users': 1, 'total_databases': 2,
+                    'user_databases': 1, 'total_grants': 1}
+    }
+
+
+class TestScriptCache(unittest.TestCase):
+    """Testes para o cache endereçado por conteúdo."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.json_file = os.path.join(self.tmp.name, 'extracted.json')
+        self.output_dir = os.path.join(self.tmp.name, 'scripts')
+        self._write_extraction(build_extraction())
+
+    def _write_extraction(self, data):
+        with open(self.json_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+
+    def _generator(self, config=None):
+        generator = SQLScriptGenerator(self.json_file, generation_config=config)
+        generator.output_dir = self.output_dir
+        return generator
+
+    def test_second_run_reuses_cache(self):
+        """Segunda geração com a mesma entrada não regenera scripts"""
+        first = self._generator().run_generation()
+        self.assertTrue(first)
+        self.assertTrue(os.path.exists(
+            os.path.join(self.output_dir, ScriptCache.MANIFEST_FILE)))
+
+        generator = self._generator()
+        with patch.object(generator, 'generate_users_script') as gen_users:
+            second = generator.run_generation()
+
+        gen_users.assert_not_called()
+        self.assertEqual(sorted(first), sorted(second))
+
+    def test_changed_input_invalidates_cache(self):
+        """Alterar extração ou configuração força regeneração"""
+        self._generator().run_generation()
+
+        self._write_extraction(build_extraction(("CONNECT", "CREATE")))
+        generator = self._generator()
+        with patch.object(generator, 'generate_users_script',
+                          wraps=generator.generate_users_script) as gen_users:
+            generator.run_generation()
+        gen_users.assert_called_once()
+
+        generator = self._generator(config={'locale': 'en_US.UTF-8'})
+        with patch.object(generator, 'generate_users_script',
+                          wraps=generator.generate_users_script) as gen_users:
+            generator.run_generation()
+        gen_users.assert_called_once()
+
+    def test_tampered_script_invalidates_cache(self):
+        """Script editado manualmente invalida o cache"""
+        generator = self._generator()
+        scripts = generator.run_generation()
+        with open(scripts[0], 'a', encoding='utf-8') as f:
+            f.write("-- editado\n")
+
+        input_hash = ScriptCache.compute_input_hash(
+            self.json_file, generator.version, {})
+        self.assertEqual(ScriptCache(self.output_dir).cached_scripts(input_hash), [])
+
+    def test_applied_scripts_per_destination(self):
+        """Registro de aplicados é por destino e pelo hash do conteúdo"""
+        self._generator().run_generation()
+        cache = ScriptCache(self.output_dir)
+        script = "01_create_users.sql"
+
+        self.assertFalse(cache.is_applied("wfdb02:5432", script))
+        cache.mark_applied("wfdb02:5432", script)
+        self.assertTrue(cache.is_applied("wfdb02:5432", script))
+        self.assertFalse(cache.is_applied("outro:5432", script))
+
+        with open(os.path.join(self.output_dir, script), 'a',
+                  encoding='utf-8') as f:
+            f.write("-- novo conteúdo\n")
+        self.assertFalse(cache.is_applied("wfdb02:5432", script))
+
+
+if __name__ == '__main__':
+    unittest.main()
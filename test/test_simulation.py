@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Testes do modo simulação (execução real desfeita com ROLLBACK) da Fase 3.
+
+Execute com:
+  python3 -m pytest test/test_simulation.py -v
+"""
+
+import io
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+from app.core.modules.migration_executor import ControlledMigrationExecutor
+from app.core.modules.simulation import estimate_non_transactional_seconds
+from app.core.modules.sql_lexer import SQLStatement
+
+
+class InvalidCatalogName(Exception):
+    """Imita psycopg2.errors.InvalidCatalogName."""
+    pgcode = '3D000'
+
+
+class SimulationCursor:
+    """Cursor falso: registra comandos e falha conforme o conteúdo."""
+
+    def __init__(self):
+        self.sent = []
+        self.rowcount = -1
+        self.connection = type('Conn', (), {'closed': 0})()
+
+    def execute(self, sql):
+        self.sent.append(sql)
+        if '"dup"' in sql:
+            raise Exception('role "dup" already exists')
+        if 'ON DATABASE "app"' in sql:
+            raise InvalidCatalogName('database "app" does not exist')
+        if 'boom' in sql:
+            raise Exception('syntax error at or near "boom"')
+
+    def fetchall(self):
+        return [(1,)]
+
+    def fetchone(self):
+        return (8 * 1024 * 1024,)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+
+class TestSimulation(unittest.TestCase):
+    """Testes para ControlledMigrationExecutor.simulate_plan."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        scripts = {
+            '01.sql': 'CREATE ROLE "a";\nCREATE ROLE "dup";\n',
+            '02.sql': 'CREATE DATABASE "app" OWNER = postgres;\n',
+            '03.sql': 'GRANT CONNECT ON DATABASE "app" TO "a";\n',
+        }
+        for name, content in scripts.items():
+            with open(os.path.join(self.tmp.name, name), 'w', encoding='utf-8') as f:
+                f.write(content)
+
+        self.plan = [{'name': n, 'scripts': [n], 'depends_on': []}
+                     for n in sorted(scripts)]
+        self.cursor = SimulationCursor()
+        self.executor = ControlledMigrationExecutor()
+        self.executor.scripts_dir = self.tmp.name
+        self.executor.reports_dir = os.path.join(self.tmp.name, 'reports')
+        self.executor.connection = type(
+            'Conn', (), {'cursor': lambda _self: self.cursor})()
+
+    def _simulate(self):
+        with redirect_stdout(io.StringIO()):
+            result = self.executor.simulate_plan(self.plan)
+        report_dir = self.executor.reports_dir
+        with open(os.path.join(report_dir, os.listdir(report_dir)[0]),
+                  encoding='utf-8') as f:
+            return result, json.load(f)
+
+    def test_simulation_rolls_back_and_classifies(self):
+        """Tudo roda em uma transação desfeita; CREATE DATABASE é estimado"""
+        result, report = self._simulate()
+
+        self.assertTrue(result)
+        simulation_sql = [s for s in self.cursor.sent if s != "SELECT 1"]
+        self.assertEqual(simulation_sql[1], "BEGIN")
+        self.assertEqual(self.cursor.sent[-1], "ROLLBACK")
+        self.assertFalse(any('CREATE DATABASE' in s for s in self.cursor.sent))
+
+        self.assertEqual(report['simulated_statements'], 1)
+        self.assertEqual(len(report['tolerated']), 1)
+        self.assertEqual(len(report['blocked_by_non_transactional']), 1)
+        self.assertEqual(report['errors'], [])
+        self.assertEqual(report['non_transactional'][0]['type'], 'CREATE DATABASE')
+        self.assertGreater(report['non_transactional_estimated_seconds'], 0.5)
+
+    def test_unexpected_error_fails_simulation(self):
+        """Erro não tolerado é reportado e a simulação falha"""
+        with open(os.path.join(self.tmp.name, '03.sql'), 'a', encoding='utf-8') as f:
+            f.write('GRANT boom TO "a";\n')
+
+        result, report = self._simulate()
+
+        self.assertFalse(result)
+        self.assertEqual(report['errors'][0]['line'], 2)
+        self.assertEqual(self.cursor.sent[-1], "ROLLBACK")
+
+    def test_create_database_estimate_scales_with_template(self):
+        """Estimativa de CREATE DATABASE cresce com o template"""
+        statement = SQLStatement('CREATE DATABASE "x";', 1, 0)
+        small = estimate_non_transactional_seconds(statement, 0.01, 8 * 1024 ** 2)
+        large = estimate_non_transactional_seconds(statement, 0.01, 800 * 1024 ** 2)
+        self.assertLess(small, large)
+
+
+if __name__ == '__main__':
+    unittest.main()
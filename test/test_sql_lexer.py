@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Testes do lexer incremental de scripts SQL.
+
+Execute com:
+  python3 -m pytest test/test_sql_lexer.py -v
+"""
+
+import io
+import unittest
+
+from app.core.modules.sql_lexer import SQLLexer, SQLLexerError
+
+
+def split(script, chunk_size=64 * 1024):
+    """Retorna apenas o texto dos statements do script."""
+    return [stmt.sql for stmt in SQLLexer(io.StringIO(script), chunk_size)]
+
+
+FUNCTION_SCRIPT = """-- cabeçalho; com ponto e vírgula
+CREATE FUNCTION soma(a int, b int) RETURNS int AS $body$
+BEGIN
+    RAISE NOTICE 'somando; %', a;  -- comentário; interno
+    RETURN a + b;
+END;
+$body$ LANGUAGE plpgsql;
+
+DO $$ BEGIN PERFORM 1; END $$;
+"""
+
+
+class TestSQLLexer(unittest.TestCase):
+    """Testes para o SQLLexer."""
+
+    def test_simple_statements_and_comments(self):
+        """Comentários são descartados e ';' encerra statements"""
+        script = ("-- comentário\nCREATE ROLE \"a\";\n\n"
+                  "/* bloco /* aninhado; */ ainda */ GRANT CONNECT ON DATABASE \"x\" TO \"a\";\n"
+                  "-- fim sem statement")
+        self.assertEqual(split(script), [
+            'CREATE ROLE "a";',
+            'GRANT CONNECT ON DATABASE "x" TO "a";'
+        ])
+
+    def test_dollar_quoted_function_and_do_block(self):
+        """';' dentro de dollar quotes não quebra funções nem blocos DO"""
+        statements = split(FUNCTION_SCRIPT)
+        self.assertEqual(len(statements), 2)
+        self.assertTrue(statements[0].startswith("CREATE FUNCTION soma"))
+        self.assertTrue(statements[0].endswith("$body$ LANGUAGE plpgsql;"))
+        self.assertIn("-- comentário; interno", statements[0])
+        self.assertEqual(statements[1], "DO $$ BEGIN PERFORM 1; END $$;")
+
+    def test_quotes_and_identifiers(self):
+        """Strings, E-strings e identificadores com ';' e aspas escapadas"""
+        script = ("SELECT 'a;''b', E'c\\';d', \"col;\"\"x\" FROM t;"
+                  "SELECT x$1 FROM y")
+        self.assertEqual(split(script), [
+            "SELECT 'a;''b', E'c\\';d', \"col;\"\"x\" FROM t;",
+            "SELECT x$1 FROM y"
+        ])
+
+    def test_chunk_boundaries(self):
+        """Resultado independe do tamanho do bloco lido"""
+        expected = split(FUNCTION_SCRIPT)
+        for chunk_size in (1, 2, 3, 7):
+            self.assertEqual(split(FUNCTION_SCRIPT, chunk_size), expected)
+
+    def test_line_numbers_and_offsets(self):
+        """Linha e posição apontam para o início de cada statement"""
+        script = "\n\n  SELECT 1;\n-- x\nSELECT\n 2;"
+        statements = list(SQLLexer(io.StringIO(script), chunk_size=4))
+        self.assertEqual([(s.line, s.offset) for s in statements],
+                         [(3, 4), (5, 19)])
+        self.assertEqual(script[19:25], "SELECT")
+
+    def test_psql_meta_commands_and_copy(self):
+        """Meta-comandos do psql são ignorados e COPY traz seus dados"""
+        script = ("\\connect app_db\n"
+                  "COPY t (a, b) FROM stdin;\n"
+                  "1\tx;y\n2\tz\n"
+                  "\\.\n"
+                  "SELECT 1;\n")
+        statements = list(SQLLexer(io.StringIO(script), chunk_size=5))
+        self.assertEqual([s.sql for s in statements],
+                         ["COPY t (a, b) FROM stdin;", "SELECT 1;"])
+        self.assertEqual(statements[0].copy_data.read(), "1\tx;y\n2\tz\n")
+        self.assertIsNone(statements[1].copy_data)
+
+    def test_unterminated_literal_raises(self):
+        """Literal ou dollar quote sem fechamento gera SQLLexerError"""
+        for script in ("SELECT 'aberto;", "DO $x$ BEGIN; END;", "/* aberto"):
+            with self.assertRaises(SQLLexerError):
+                split(script)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Testes da aplicação de privilégios com conexões persistentes por worker.
+
+Execute com:
+  python3 -m pytest test/test_sqlalchemy_privileges.py -v
+"""
+
+import io
+import threading
+import unittest
+from contextlib import contextmanager, redirect_stdout
+from types import SimpleNamespace
+from unittest import mock
+
+from sqlalchemy.exc import OperationalError
+
+from app.core.sqlalchemy_migration import SQLAlchemyPostgreSQLMigrator
+
+
+class FakeConnection:
+    """Conexão falsa: registra comandos, savepoints e commits."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.closed = False
+        self.invalidated = False
+
+    def execute(self, query, params=None):
+        sql = str(query)
+        with self.engine.lock:
+            self.engine.sent.append(sql)
+        if 'pg_roles' in sql:
+            self.engine.role_queries += 1
+            return [SimpleNamespace(rolname=name) for name in self.engine.roles]
+        if '"broken"' in sql:
+            raise Exception('permission denied')
+        return []
+
+    @contextmanager
+    def begin(self):
+        yield
+        with self.engine.lock:
+            self.engine.commits += 1
+
+    @contextmanager
+    def begin_nested(self):
+        try:
+            yield
+        except Exception:
+            with self.engine.lock:
+                self.engine.rollbacks += 1
+            raise
+
+    def close(self):
+        self.closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+        return False
+
+
+class FakeEngine:
+    def __init__(self, roles):
+        self.roles = roles
+        self.lock = threading.Lock()
+        self.sent = []
+        self.connects = 0
+        self.role_queries = 0
+        self.commits = 0
+        self.rollbacks = 0
+
+    def connect(self):
+        with self.lock:
+            self.connects += 1
+        return FakeConnection(self)
+
+
+class TestApplyDatabasePrivileges(unittest.TestCase):
+    """Testes para SQLAlchemyPostgreSQLMigrator.apply_database_privileges."""
+
+    def setUp(self):
+        self.engine = FakeEngine(['postgres', 'app', 'broken'])
+        self.migrator = SQLAlchemyPostgreSQLMigrator()
+        self.migrator.dest_engine = self.engine
+        self.migrator.privilege_workers = 2
+        self.migrator._privilege_index = {}
+        self.migrator.get_database_privileges = lambda db_name: [
+            {'username': 'app', 'privileges': ['CONNECT']},
+            {'username': 'broken', 'privileges': ['CONNECT']},
+            {'username': 'ghost', 'privileges': ['CONNECT']},
+        ]
+        self.databases = [{'datname': f'db{i}', 'owner': 'app'} for i in range(6)]
+
+    def _apply(self):
+        with redirect_stdout(io.StringIO()):
+            return self.migrator.apply_database_privileges(self.databases)
+
+    def test_connections_per_worker_and_single_role_snapshot(self):
+        """Uma conexão por worker e pg_roles lido uma única vez"""
+        applied = self._apply()
+
+        # snapshot + 2 workers
+        self.assertEqual(self.engine.connects, 3)
+        self.assertEqual(self.engine.role_queries, 1)
+        self.assertEqual(self.engine.commits, len(self.databases))
+        # PUBLIC CONNECT/TEMPORARY + ALL owner + CONNECT app por banco
+        self.assertEqual(applied, 4 * len(self.databases))
+
+    def test_failing_grant_is_isolated_by_savepoint(self):
+        """GRANT com erro é desfeito no savepoint sem afetar os demais"""
+        applied = self._apply()
+
+        self.assertEqual(self.engine.rollbacks, len(self.databases))
+        self.assertEqual(applied, 4 * len(self.databases))
+        self.assertFalse(any('"ghost"' in sql for sql in self.engine.sent))
+
+    def test_snapshot_updated_with_created_roles(self):
+        """Roles criados na execução entram no snapshot sem reconsulta"""
+        self.migrator.load_role_snapshot()
+        self.migrator.remember_role('ghost')
+
+        applied = self._apply()
+
+        self.assertEqual(self.engine.role_queries, 1)
+        self.assertEqual(applied, 5 * len(self.databases))
+
+
+class FakeSourceEngine:
+    """Origem falsa: devolve as linhas do aclexplode e conta as queries."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = []
+
+    @contextmanager
+    def connect(self):
+        engine = self
+
+        class Conn:
+            def execute(self, query, params=None):
+                engine.queries.append(str(query))
+                return engine.rows
+
+        yield Conn()
+
+
+class TestPrefetchDatabasePrivileges(unittest.TestCase):
+    """Testes para a coleta única de ACLs da origem."""
+
+    def setUp(self):
+        acl = lambda db, grantee, *privs: SimpleNamespace(
+            datname=db, grantee=grantee, privileges=list(privs))
+        self.source = FakeSourceEngine([
+            acl('app', 'owner', 'CONNECT', 'CREATE', 'TEMPORARY'),
+            acl('app', 'public', 'CONNECT'),
+            acl('app', 'reader', 'CONNECT', 'TEMPORARY'),
+            acl('logs', 'postgres', 'CONNECT', 'CREATE', 'TEMPORARY'),
+        ])
+        self.migrator = SQLAlchemyPostgreSQLMigrator()
+        self.migrator.source_engine = self.source
+
+    def test_single_query_indexed_by_database(self):
+        """Uma query para todos os bancos, consultas seguintes vêm do índice"""
+        with redirect_stdout(io.StringIO()):
+            app_privs = self.migrator.get_database_privileges('app')
+            logs_privs = self.migrator.get_database_privileges('logs')
+            missing = self.migrator.get_database_privileges('other')
+
+        self.assertEqual(len(self.source.queries), 1)
+        self.assertIn('aclexplode', self.source.queries[0])
+        self.assertEqual(app_privs, [
+            {'username': 'owner', 'privileges': ['ALL']},
+            {'username': 'public', 'privileges': ['CONNECT']},
+            {'username': 'reader', 'privileges': ['CONNECT', 'TEMPORARY']},
+        ])
+        self.assertEqual(logs_privs, [])
+        self.assertEqual(missing, [])
+
+    def test_prefetch_happens_before_destination_writes(self):
+        """ACLs lidas da origem antes da primeira conexão ao destino"""
+        events = []
+        destination = FakeEngine(['owner', 'reader'])
+        original_connect = destination.connect
+        destination.connect = lambda: events.append('dest') or original_connect()
+        original_source_connect = self.source.connect
+
+        @contextmanager
+        def source_connect():
+            events.append('source')
+            with original_source_connect() as conn:
+                yield conn
+
+        self.source.connect = source_connect
+        self.migrator.dest_engine = destination
+
+        with redirect_stdout(io.StringIO()):
+            self.migrator.apply_database_privileges(
+                [{'datname': 'app', 'owner': 'owner'}])
+
+        self.assertEqual(events[0], 'source')
+        self.assertEqual(events.count('source'), 1)
+
+    def test_source_error_is_not_cached(self):
+        """Falha na leitura das ACLs propaga e não deixa um índice vazio"""
+        error = OperationalError("SELECT", {}, Exception("conexão perdida"))
+        self.source.connect = mock.Mock(side_effect=error)
+
+        with redirect_stdout(io.StringIO()), self.assertRaises(OperationalError):
+            self.migrator.prefetch_database_privileges()
+
+        self.assertIsNone(self.migrator._privilege_index)
+
+
+class TestMigrateAllUsersPrefetch(unittest.TestCase):
+    """ACLs lidas antes da fase 1 e renovadas a cada execução."""
+
+    def setUp(self):
+        self.migrator = SQLAlchemyPostgreSQLMigrator()
+        self.events = []
+        self.migrator.load_configs = lambda: True
+        self.migrator.create_engines = lambda: True
+        self.migrator.get_users_from_source = lambda: [{'rolname': 'app'}]
+        self.migrator.get_databases_with_owners = lambda: [{'datname': 'app', 'owner': 'app'}]
+        self.migrator.filter_protected_users = lambda users: users
+        self.migrator.filter_protected_databases = lambda databases: databases
+        self.migrator.create_users_in_destination = (
+            lambda users: self.events.append('users') or len(users))
+        self.migrator.create_databases_with_postgres_owner = lambda databases: len(databases)
+        self.migrator.apply_database_privileges = lambda databases: 0
+
+    def test_prefetch_runs_before_phase_1_on_every_run(self):
+        def prefetch():
+            self.events.append('acls')
+            self.migrator._privilege_index = {'app': []}
+            return self.migrator._privilege_index
+
+        self.migrator._privilege_index = {'stale': []}
+        self.migrator.prefetch_database_privileges = prefetch
+
+        with redirect_stdout(io.StringIO()):
+            self.assertTrue(self.migrator.migrate_all_users())
+            self.assertTrue(self.migrator.migrate_all_users())
+
+        self.assertEqual(self.events, ['acls', 'users', 'acls', 'users'])
+        self.assertEqual(self.migrator._privilege_index, {'app': []})
+
+    def test_role_snapshot_is_reloaded_on_every_run(self):
+        self.migrator.prefetch_database_privileges = lambda: {}
+        self.migrator._role_snapshot = {'removido_entre_execucoes'}
+
+        with redirect_stdout(io.StringIO()):
+            self.assertTrue(self.migrator.migrate_all_users())
+
+        self.assertIsNone(self.migrator._role_snapshot)
+
+    def test_prefetch_failure_fails_before_any_write(self):
+        error = OperationalError("SELECT", {}, Exception("conexão perdida"))
+        self.migrator.prefetch_database_privileges = mock.Mock(side_effect=error)
+
+        with redirect_stdout(io.StringIO()):
+            self.assertFalse(self.migrator.migrate_all_users())
+
+        self.assertEqual(self.events, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
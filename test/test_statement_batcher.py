@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Testes dos modos pipeline e savepoint (lotes de statements) do executor.
+
+Execute com:
+  python3 -m pytest test/test_statement_batcher.py -v
+"""
+
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+from app.core.modules.migration_executor import ControlledMigrationExecutor
+from app.core.modules.sql_lexer import SQLStatement
+from app.core.modules.statement_batcher import is_batchable, iter_batches
+
+
+class FakeCursor:
+    """Cursor que simula a transação implícita de uma query com lote."""
+
+    def __init__(self, errors):
+        self.errors = errors
+        self.round_trips = 0
+        self.applied = []
+        self.connection = type('Conn', (), {'closed': 0})()
+
+    def execute(self, sql):
+        self.round_trips += 1
+        statements = [s for s in sql.split('\n') if s]
+        for statement in statements:
+            for marker, message in self.errors.items():
+                if marker in statement:
+                    raise Exception(message)
+        self.applied.extend(statements)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+
+def stmt(sql, line=1):
+    return SQLStatement(sql, line, 0)
+
+
+class TestStatementBatcher(unittest.TestCase):
+    """Testes para agrupamento e execução em lote."""
+
+    def setUp(self):
+        self.executor = ControlledMigrationExecutor()
+        self.executor.execution_mode = "pipeline"
+
+    def test_non_transactional_statements_run_alone(self):
+        """CREATE DATABASE e controle de transação não entram em lotes"""
+        statements = [stmt('CREATE ROLE "a";'), stmt('CREATE ROLE "b";'),
+                      stmt('CREATE DATABASE "x";'), stmt('GRANT x TO a;'),
+                      stmt('commit;'), stmt('GRANT y TO b;')]
+        batches = [[s.sql for s in b] for b in iter_batches(statements, 10)]
+        self.assertEqual(batches, [
+            ['CREATE ROLE "a";', 'CREATE ROLE "b";'],
+            ['CREATE DATABASE "x";'],
+            ['GRANT x TO a;'],
+            ['commit;'],
+            ['GRANT y TO b;']
+        ])
+        self.assertFalse(is_batchable(stmt('CREATE UNIQUE INDEX CONCURRENTLY i ON t (a);')))
+        self.assertTrue(is_batchable(stmt('CREATE INDEX i ON t (a);')))
+
+    def test_batch_size_limit(self):
+        """Lotes respeitam o número máximo de statements"""
+        statements = [stmt(f"GRANT g{i} TO u;") for i in range(7)]
+        sizes = [len(b) for b in iter_batches(statements, batch_size=3)]
+        self.assertEqual(sizes, [3, 3, 1])
+
+    def test_failed_batch_falls_back_to_statements(self):
+        """Erro tolerado desfaz o lote, que é reexecutado statement a statement"""
+        batch = [stmt(f"GRANT g{i} TO u;", line=i + 1) for i in range(64)]
+        batch[41] = stmt("CREATE ROLE dup;", line=42)
+        cursor = FakeCursor({'dup': 'role "dup" already exists'})
+
+        output = StringIO()
+        with redirect_stdout(output):
+            executed = self.executor._execute_batch(cursor, batch)
+
+        self.assertEqual(executed, 63)
+        self.assertEqual(len(cursor.applied), 63)
+        self.assertEqual(cursor.round_trips, 65)
+        self.assertIn("linha 42", output.getvalue())
+
+    def test_rerun_with_everything_existing_costs_n_plus_one(self):
+        """Reexecução em que tudo já existe: uma ida pelo lote e uma por statement"""
+        batch = [stmt(f"CREATE ROLE dup{i};", line=i + 1) for i in range(64)]
+        cursor = FakeCursor({'dup': 'already exists'})
+
+        with redirect_stdout(StringIO()):
+            self.executor._execute_batch(cursor, batch)
+
+        self.assertEqual(cursor.round_trips, 65)
+        self.assertEqual(cursor.applied, [])
+
+    def test_fatal_error_is_attributed_and_raised(self):
+        """Erro não tolerado aponta a linha do statement e interrompe"""
+        batch = [stmt("GRANT a TO u;", 1), stmt("GRANT boom TO u;", 2),
+                 stmt("GRANT c TO u;", 3)]
+        cursor = FakeCursor({'boom': 'role "boom" does not exist'})
+
+        output = StringIO()
+        with redirect_stdout(output), self.assertRaises(Exception):
+            self.executor._execute_batch(cursor, batch)
+        self.assertIn("linha 2: GRANT boom TO u;", output.getvalue())
+
+    def test_execute_script_pipeline_mode(self):
+        """execute_script no modo pipeline usa poucas idas ao servidor"""
+        with tempfile.TemporaryDirectory() as tmp:
+            with open(os.path.join(tmp, '03.sql'), 'w', encoding='utf-8') as f:
+                f.write("\n".join(f"GRANT g{i} TO u;" for i in range(1000)))
+            self.executor.scripts_dir = tmp
+            self.executor.batch_size = 250
+            cursor = FakeCursor({})
+            connection = type('Conn', (), {'cursor': lambda self: cursor})()
+
+            with redirect_stdout(StringIO()):
+                self.assertTrue(self.executor.execute_script(
+                    '03.sql', connection=connection))
+
+        self.assertEqual(cursor.round_trips, 4)
+        self.assertEqual(len(cursor.applied), 1000)
+
+
+class RecordingCursor:
+    """Cursor que registra os comandos enviados e falha por marcador."""
+
+    def __init__(self, errors):
+        self.errors = errors
+        self.sent = []
+        self.connection = type('Conn', (), {'closed': 0})()
+
+    def execute(self, sql):
+        self.sent.append(sql)
+        for marker, message in self.errors.items():
+            if marker in sql and sql.startswith("SAVEPOINT"):
+                raise Exception(message)
+
+
+class TestSavepointBatches(unittest.TestCase):
+    """Testes para o modo transacional com savepoints."""
+
+    def setUp(self):
+        self.executor = ControlledMigrationExecutor()
+        self.executor.execution_mode = "savepoint"
+
+    def test_tolerated_error_rolls_back_only_its_savepoint(self):
+        """Erro tolerado desfaz o savepoint e o lote faz um único COMMIT"""
+        batch = [stmt('CREATE ROLE "a";'), stmt('CREATE ROLE "dup";', 2),
+                 stmt('CREATE ROLE "b";')]
+        cursor = RecordingCursor({'dup': 'role "dup" already exists'})
+
+        with redirect_stdout(StringIO()):
+            executed = self.executor._execute_savepoint_batch(cursor, batch)
+
+        self.assertEqual(executed, 2)
+        self.assertEqual(cursor.sent[0], "BEGIN")
+        self.assertEqual(cursor.sent[-1], "COMMIT")
+        self.assertEqual(cursor.sent.count("COMMIT"), 1)
+        self.assertTrue(cursor.sent[3].startswith("ROLLBACK TO SAVEPOINT"))
+        self.assertIn('CREATE ROLE "b"', cursor.sent[4])
+
+    def test_fatal_error_rolls_back_whole_batch(self):
+        """Erro não tolerado desfaz o lote inteiro, sem COMMIT"""
+        batch = [stmt('GRANT a TO u;'), stmt('GRANT boom TO u;', 2)]
+        cursor = RecordingCursor({'boom': 'role "boom" does not exist'})
+
+        with redirect_stdout(StringIO()), self.assertRaises(Exception):
+            self.executor._execute_savepoint_batch(cursor, batch)
+
+        self.assertEqual(cursor.sent[-1], "ROLLBACK")
+        self.assertNotIn("COMMIT", cursor.sent)
+
+    def test_non_transactional_statement_runs_outside_transaction(self):
+        """CREATE DATABASE não é envolvido em BEGIN/SAVEPOINT"""
+        cursor = RecordingCursor({})
+        executed = self.executor._execute_savepoint_batch(
+            cursor, [stmt('CREATE DATABASE "x";')])
+
+        self.assertEqual(executed, 1)
+        self.assertEqual(cursor.sent, ['CREATE DATABASE "x";'])
+
+
+if __name__ == '__main__':
+    unittest.main()
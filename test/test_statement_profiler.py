@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Testes do profiler de latência por statement da Fase 3.
+
+Execute com:
+  python3 -m pytest test/test_statement_profiler.py -v
+"""
+
+import io
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+from app.core.modules.migration_executor import ControlledMigrationExecutor
+from app.core.modules.sql_lexer import SQLStatement
+from app.core.modules.statement_profiler import (StatementProfiler,
+                                                 statement_type)
+
+
+class DuplicateObject(Exception):
+    """Imita psycopg2.errors.DuplicateObject (com SQLSTATE)."""
+    pgcode = '42710'
+
+
+def stmt(sql, line=1):
+    return SQLStatement(sql, line, 0)
+
+
+class TestStatementProfiler(unittest.TestCase):
+    """Testes para StatementProfiler."""
+
+    def test_statement_type(self):
+        """Tipos agrupados por comando e objeto"""
+        self.assertEqual(statement_type('CREATE ROLE "a" WITH LOGIN;'), 'CREATE ROLE')
+        self.assertEqual(statement_type('create database "x"'), 'CREATE DATABASE')
+        self.assertEqual(statement_type('CREATE UNIQUE INDEX i ON t (a);'), 'CREATE INDEX')
+        self.assertEqual(statement_type('GRANT CONNECT ON DATABASE "x" TO "a";'), 'GRANT')
+
+    def test_summary_top_n_histogram_and_network_split(self):
+        """Top-N, histograma por tipo e separação rede/servidor"""
+        profiler = StatementProfiler(top_n=2)
+        profiler.rtt = 0.040
+
+        profiler.record([stmt('GRANT a TO u;', 1)], 0.041, rowcount=None)
+        profiler.record([stmt('GRANT b TO u;', 2)], 0.300)
+        profiler.record([stmt('CREATE DATABASE "x";', 3)], 2.0)
+        profiler.record([stmt('CREATE ROLE "r";', 4)], 0.045,
+                        error=DuplicateObject('already exists'))
+        profiler.record([stmt('GRANT c TO u;', 5), stmt('GRANT d TO u;', 6)], 0.050)
+
+        summary = profiler.summary()
+        self.assertEqual(summary['statements'], 6)
+        self.assertEqual(summary['round_trips'], 5)
+        self.assertEqual([e['line'] for e in summary['slowest']], [3, 2])
+        self.assertEqual(summary['by_type']['GRANT']['count'], 4)
+        self.assertEqual(summary['by_type']['GRANT']['histogram']['<=500ms'], 1)
+        self.assertEqual(summary['by_type']['CREATE DATABASE']['histogram']['<=5000ms'], 1)
+        self.assertEqual(summary['errors'], {'DuplicateObject (42710)': 1})
+        self.assertAlmostEqual(summary['network_seconds'], 0.2, places=3)
+        self.assertAlmostEqual(summary['server_seconds'], 2.236, places=3)
+
+    def test_executor_writes_report(self):
+        """Execução real grava relatório em reports/"""
+        with tempfile.TemporaryDirectory() as tmp:
+            with open(os.path.join(tmp, '01.sql'), 'w', encoding='utf-8') as f:
+                f.write('CREATE ROLE "a";\nGRANT x TO "a";\n')
+
+            executor = ControlledMigrationExecutor()
+            executor.scripts_dir = tmp
+            executor.reports_dir = os.path.join(tmp, 'reports')
+            executor.profiler = StatementProfiler()
+
+            class Cursor:
+                rowcount = -1
+
+                def execute(self, sql):
+                    pass
+
+                def __enter__(self):
+                    return self
+
+                def __exit__(self, *args):
+                    return False
+
+            connection = type('Conn', (), {'cursor': lambda self: Cursor()})()
+            with redirect_stdout(io.StringIO()):
+                self.assertTrue(executor.execute_script('01.sql', connection=connection))
+                report_file = executor.profiler.write_report(executor.reports_dir)
+
+            with open(report_file, encoding='utf-8') as f:
+                report = json.load(f)
+
+        self.assertEqual(report['statements'], 2)
+        self.assertEqual(report['slowest'][0]['script'], '01.sql')
+        self.assertIsNone(report['slowest'][0]['rowcount'])
+        self.assertEqual(set(report['by_type']), {'CREATE ROLE', 'GRANT'})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Testes do agendador de passos em DAG do orquestrador.
+
+Execute com:
+  python3 -m pytest test/test_step_scheduler.py -v
+"""
+
+import time
+import unittest
+
+from app.orchestrators.orchestrator_pure_python import PostgreSQLMigrationOrchestrator
+from app.orchestrators.step_scheduler import StepScheduler
+
+
+def sleeper(seconds, result=True, log=None, name=None):
+    def step():
+        if log is not None:
+            log.append(('start', name))
+        time.sleep(seconds)
+        if log is not None:
+            log.append(('end', name))
+        return result
+    return step
+
+
+class TestStepScheduler(unittest.TestCase):
+    """Testes para StepScheduler."""
+
+    def test_independent_steps_run_in_parallel(self):
+        """Passos sem dependência entre si executam ao mesmo tempo"""
+        scheduler = StepScheduler(max_workers=4)
+        scheduler.add('config', sleeper(0.01))
+        for name in ('source', 'dest', 'scram'):
+            scheduler.add(name, sleeper(0.2), depends_on=['config'])
+        scheduler.add('migrate', sleeper(0.01), depends_on=['source', 'dest', 'scram'])
+
+        start = time.perf_counter()
+        results = scheduler.run(lambda name, error: False)
+        elapsed = time.perf_counter() - start
+
+        self.assertTrue(all(results.values()))
+        self.assertLess(elapsed, 0.45)
+        self.assertGreaterEqual(scheduler.timings['migrate'][0],
+                                max(scheduler.timings[n][1] for n in ('source', 'dest', 'scram')))
+
+    def test_failure_stops_unstarted_steps(self):
+        """Falha sem continuar: dependentes não iniciam"""
+        scheduler = StepScheduler()
+        scheduler.add('a', sleeper(0, result=False))
+        scheduler.add('b', sleeper(0), depends_on=['a'])
+
+        failures = []
+        results = scheduler.run(lambda name, error: failures.append(name) or False)
+
+        self.assertEqual(results, {'a': False, 'b': None})
+        self.assertEqual(failures, ['a'])
+
+    def test_continue_on_error_runs_dependents(self):
+        """on_failure=True mantém a execução dos dependentes"""
+        scheduler = StepScheduler()
+        scheduler.add('a', sleeper(0, result=False))
+        scheduler.add('b', sleeper(0), depends_on=['a'])
+
+        self.assertEqual(scheduler.run(lambda name, error: True), {'a': False, 'b': True})
+
+    def test_exception_is_reported_to_on_failure(self):
+        """Exceção no passo chega ao on_failure"""
+        def boom():
+            raise RuntimeError('falhou')
+
+        scheduler = StepScheduler()
+        scheduler.add('a', boom)
+        seen = []
+        scheduler.run(lambda name, error: seen.append(error) or False)
+
+        self.assertIsInstance(seen[0], RuntimeError)
+        self.assertIs(scheduler.errors['a'], seen[0])
+
+    def test_unknown_dependency_and_cycle(self):
+        """Dependência inexistente ou circular gera ValueError"""
+        scheduler = StepScheduler()
+        scheduler.add('a', sleeper(0), depends_on=['x'])
+        with self.assertRaises(ValueError):
+            scheduler.order()
+
+        scheduler = StepScheduler()
+        scheduler.add('a', sleeper(0), depends_on=['b'])
+        scheduler.add('b', sleeper(0), depends_on=['a'])
+        with self.assertRaises(ValueError):
+            scheduler.order()
+
+    def test_critical_path(self):
+        """Caminho crítico segue a dependência que terminou por último"""
+        scheduler = StepScheduler(max_workers=4)
+        scheduler.add('config', sleeper(0.02))
+        scheduler.add('fast', sleeper(0.02), depends_on=['config'])
+        scheduler.add('slow', sleeper(0.15), depends_on=['config'])
+        scheduler.add('migrate', sleeper(0.05), depends_on=['fast', 'slow'])
+        scheduler.run(lambda name, error: False)
+
+        path = scheduler.critical_path()
+
+        self.assertEqual([entry['name'] for entry in path], ['config', 'slow', 'migrate'])
+        self.assertGreater(path[1]['share'], 0.5)
+
+
+class TestOrchestratorSteps(unittest.TestCase):
+    """Dependências declaradas nos passos do orquestrador."""
+
+    def test_orchestrator_steps_form_valid_dag(self):
+        orchestrator = PostgreSQLMigrationOrchestrator.__new__(PostgreSQLMigrationOrchestrator)
+        orchestrator.stats = {}
+        orchestrator._initialize_steps()
+
+        scheduler = StepScheduler()
+        for step in orchestrator.steps:
+            scheduler.add(step.name, lambda: True, step.depends_on)
+        order = scheduler.order()
+
+        self.assertEqual(order[-1], 'generate_report')
+        self.assertLess(order.index('pre_migration_backup'), order.index('execute_migration'))
+        connectivity = next(s for s in orchestrator.steps if s.name == 'test_connectivity')
+        self.assertNotIn('validate_environment', connectivity.depends_on)
+
+
+if __name__ == '__main__':
+    unittest.main()
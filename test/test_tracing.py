@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Testes dos spans de tracing (formato Chrome trace).
+
+Execute com:
+  python3 -m pytest test/test_tracing.py -v
+"""
+
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from sqlalchemy import create_engine, text
+
+from app.monitoring.tracing import (Tracer, active_tracer, span, start_tracing,
+                                    stop_tracing, trace_engine)
+from app.orchestrators.run_state import RunStateStore
+from app.orchestrators.step_scheduler import StepScheduler
+from test_run_state import make_orchestrator
+
+
+def spans_by_name(tracer: Tracer):
+    return {event['name']: event for event in tracer.events() if event['ph'] == 'X'}
+
+
+class TestTracer(unittest.TestCase):
+    """Testes para Tracer."""
+
+    def test_nested_spans_and_export(self):
+        tracer = Tracer()
+        with tracer.span("phase_1_extraction", "phase"):
+            with tracer.span("SELECT", "sql", statement="SELECT 1"):
+                pass
+
+        spans = spans_by_name(tracer)
+        phase, query = spans['phase_1_extraction'], spans['SELECT']
+        self.assertEqual(query['args']['parent_id'], phase['args']['span_id'])
+        self.assertNotIn('parent_id', phase['args'])
+        self.assertGreaterEqual(query['ts'], phase['ts'])
+        self.assertLessEqual(query['ts'] + query['dur'], phase['ts'] + phase['dur'])
+
+        with tempfile.TemporaryDirectory() as tmp:
+            trace_file = tracer.export(Path(tmp) / "trace.json")
+            with open(trace_file, encoding='utf-8') as f:
+                exported = json.load(f)
+        self.assertEqual(exported['displayTimeUnit'], 'ms')
+        self.assertIn('thread_name', {event['name'] for event in exported['traceEvents']})
+
+    def test_error_is_recorded(self):
+        tracer = Tracer()
+        with self.assertRaises(RuntimeError):
+            with tracer.span("execute_migration", "step"):
+                raise RuntimeError("falhou")
+        self.assertEqual(spans_by_name(tracer)['execute_migration']['args']['error'],
+                         "RuntimeError: falhou")
+
+    def test_disabled_span_is_noop(self):
+        self.assertIsNone(active_tracer())
+        with span("nada"):
+            pass
+        self.assertIsNone(stop_tracing("nao_gravado.json"))
+
+
+class TestTracingIntegration(unittest.TestCase):
+    """Spans das threads de passos e de um engine SQLAlchemy."""
+
+    def setUp(self):
+        self.tracer = start_tracing()
+        self.addCleanup(stop_tracing)
+
+    def test_scheduler_steps_inherit_parent_span(self):
+        scheduler = StepScheduler(max_workers=2)
+        for name in ('a', 'b'):
+            def run(name=name):
+                with span(name, "step"):
+                    return True
+            scheduler.add(name, run)
+
+        with span("pipeline", "pipeline"):
+            scheduler.run(lambda name, error: False)
+
+        spans = spans_by_name(self.tracer)
+        root = spans['pipeline']['args']['span_id']
+        self.assertEqual(spans['a']['args']['parent_id'], root)
+        self.assertEqual(spans['b']['args']['parent_id'], root)
+        # Filhos em outra thread ganham seta (flow) a partir do pai
+        flows = [event for event in self.tracer.events() if event['ph'] in ('s', 'f')]
+        self.assertEqual(len(flows), 4)
+
+    def test_engine_connect_and_statements(self):
+        engine = create_engine("sqlite://")
+        trace_engine(engine)
+
+        with span("discover_source", "step"):
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+
+        spans = spans_by_name(self.tracer)
+        step = spans['discover_source']['args']['span_id']
+        self.assertEqual(spans['connect']['args']['parent_id'], step)
+        self.assertEqual(spans['SELECT']['args']['parent_id'], step)
+        self.assertEqual(spans['SELECT']['cat'], 'sql')
+        engine.dispose()
+
+    def test_orchestrator_steps_are_spans(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            store = RunStateStore(Path(tmp) / "run_state.db")
+            orchestrator = make_orchestrator(store, 's1', [])
+            orchestrator.reports_dir = Path(tmp)
+            orchestrator.run_complete_migration(interactive=False)
+
+            with open(Path(tmp) / "trace_s1.json", encoding='utf-8') as f:
+                events = json.load(f)['traceEvents']
+
+        spans = {event['name']: event for event in events if event['ph'] == 'X'}
+        root = spans['run_complete_migration']['args']['span_id']
+        for name in ('validate_environment', 'execute_migration', 'generate_report'):
+            self.assertEqual(spans[name]['cat'], 'step')
+            self.assertEqual(spans[name]['args']['parent_id'], root)
+
+
+if __name__ == '__main__':
+    unittest.main()